@@ -16,7 +16,7 @@ import streamlit as st
 from src.ingestion.youtube import get_video_info
 from src.processing.summarize import summarize_text
 from src.retrieval.rag import build_vector_store, generate_answer
-from config import AUDIO_CACHE_DIR
+from config import AUDIO_CACHE_DIR, SLO_TIERS
 from src.pipeline import process_youtube_pipeline, process_audio_pipeline
 import pandas as pd
 import plotly.graph_objects as go
@@ -25,6 +25,9 @@ import tempfile
 from src.processing.tts import generate_tts_audio
 import base64
 
+# Session-state suffix for each model's summary (the latency router may pick any of them)
+SESSION_KEYS = {"bart-large-cnn": "bart", "t5-base": "t5", "distilbart-cnn": "distilbart"}
+
 def update_session_state(text, summary, metrics, source, model="bart-large-cnn"):
     """Helper to commit a new transcript to session state and clear old caches."""
     st.session_state["transcript"] = text
@@ -33,20 +36,31 @@ def update_session_state(text, summary, metrics, source, model="bart-large-cnn")
     for key in ["rag_index", "rag_chunks", "qa_history"]:
         if key in st.session_state:
             del st.session_state[key]
+    
+    # Clear every model's summary from the previous transcript
+    for suffix in SESSION_KEYS.values():
+        for key in [f"summary_{suffix}", f"summary_metrics_{suffix}"]:
+            if key in st.session_state:
+                del st.session_state[key]
             
-    # Save isolated memory states for the active model
-    st.session_state[f"summary_bart"] = summary
-    st.session_state[f"summary_metrics_bart"] = metrics
+    # Save isolated memory states for the model that produced this summary
+    st.session_state[f"summary_{SESSION_KEYS[model]}"] = summary
+    st.session_state[f"summary_metrics_{SESSION_KEYS[model]}"] = metrics
     
     # Set active views
     st.session_state["summary"] = summary
     st.session_state["summary_metrics"] = metrics
     st.session_state["source"] = source
     st.session_state["current_model"] = model
-    
-    # Clear alternative model data when regenerating
-    if "summary_t5" in st.session_state: del st.session_state["summary_t5"]
-    if "summary_metrics_t5" in st.session_state: del st.session_state["summary_metrics_t5"]
+
+def partial_summary_callback(placeholder):
+    """Progress callback that shows chunk summaries in `placeholder` as they arrive."""
+    partials = []
+    def on_progress(event):
+        if event["stage"] == "chunk" and event["summaries"]:
+            partials.extend(event["summaries"])
+            placeholder.markdown("**Summary so far (draft)**\n\n" + " ".join(partials))
+    return on_progress
 
 # Page Config
 st.set_page_config(
@@ -85,6 +99,12 @@ with st.sidebar:
         value="medium",
         help="Brief: ~75% compression | Medium: ~70% compression | Detailed: ~65% compression"
     )
+    slo_tier = st.selectbox(
+        "Latency target",
+        options=[None, "interactive", "standard", "batch"],
+        format_func=lambda tier: "Best quality" if tier is None else f"{tier.capitalize()} ({SLO_TIERS[tier]:.0f}s)" if SLO_TIERS[tier] else tier.capitalize(),
+        help="Long inputs switch to faster models or greedy decoding to finish within the target"
+    )
     
     st.divider()
     
@@ -166,14 +186,18 @@ with left_col:
             else:
                 try:
                     status_placeholder = st.empty()
+                    partial_placeholder = st.empty()
                     def ui_callback(msg):
                         status_placeholder.info(msg)
+                    ui_progress = partial_summary_callback(partial_placeholder)
                         
                     # Process entire pipeline purely from facade
                     with st.spinner("Processing..."):
-                        text, source, summary, metrics = process_youtube_pipeline(url, detail_level, ui_callback)
+                        text, source, summary, metrics = process_youtube_pipeline(url, detail_level, ui_callback, ui_progress,
+                                                                                  slo_tier=slo_tier)
                     
                     status_placeholder.empty()
+                    partial_placeholder.empty()
                     
                     if show_stats:
                         word_count = len(text.split())
@@ -181,7 +205,7 @@ with left_col:
                         
 
                     # Use centralized commit function
-                    update_session_state(text, summary, metrics, source)
+                    update_session_state(text, summary, metrics, source, model=metrics["model"])
                     st.success("Processing complete")
                     
                 except Exception as e:
@@ -208,21 +232,25 @@ with left_col:
                     st.success("File uploaded successfully")
 
                     status_placeholder = st.empty()
+                    partial_placeholder = st.empty()
                     def ui_callback(msg):
                         status_placeholder.info(msg)
+                    ui_progress = partial_summary_callback(partial_placeholder)
 
                     # Process via facade
                     with st.spinner("Processing..."):
-                        text, source, summary, metrics = process_audio_pipeline(file_path, detail_level, ui_callback)
+                        text, source, summary, metrics = process_audio_pipeline(file_path, detail_level, ui_callback, ui_progress,
+                                                                                slo_tier=slo_tier)
                     
                     status_placeholder.empty()
+                    partial_placeholder.empty()
 
                     if show_stats:
                         word_count = len(text.split())
                         st.markdown(f'<div class="stats-box">Transcript: {word_count:,} words</div>', unsafe_allow_html=True)
 
                     # Use centralized commit function
-                    update_session_state(text, summary, metrics, source)
+                    update_session_state(text, summary, metrics, source, model=metrics["model"])
                     st.success("Processing complete")
                     
                 except Exception as e:
@@ -313,11 +341,29 @@ with right_col:
                             st.success("Summary generated with T5-base")
                             st.rerun()
                 else:
-                    if st.button("Switch to BART", use_container_width=True, type="secondary"):
-                        with st.spinner("Switching to BART..."):
-                            st.session_state["summary"] = st.session_state["summary_bart"]
-                            st.session_state["summary_metrics"] = st.session_state["summary_metrics_bart"]
-                            st.session_state["current_model"] = "bart-large-cnn"
+                    bart_cached = "summary_bart" in st.session_state
+                    btn_label = "Switch to BART" if bart_cached else "Regenerate with BART"
+                    if st.button(btn_label, use_container_width=True, type="secondary"):
+                        if bart_cached:
+                            with st.spinner("Switching to BART..."):
+                                st.session_state["summary"] = st.session_state["summary_bart"]
+                                st.session_state["summary_metrics"] = st.session_state["summary_metrics_bart"]
+                                st.session_state["current_model"] = "bart-large-cnn"
+                        else:
+                            # The latency router picked a faster model; generate the real BART summary
+                            with st.spinner("Generating summary with BART-large-CNN..."):
+                                summary_bart, metrics_bart = summarize_text(
+                                    st.session_state["transcript"],
+                                    detail_level=detail_level,
+                                    model_name="bart-large-cnn",
+                                    return_metrics=True
+                                )
+                                st.session_state["summary_bart"] = summary_bart
+                                st.session_state["summary_metrics_bart"] = metrics_bart
+                                st.session_state["summary"] = summary_bart
+                                st.session_state["summary_metrics"] = metrics_bart
+                                st.session_state["current_model"] = "bart-large-cnn"
+                            st.success("Summary generated with BART-large-CNN")
                         st.rerun()
             
             # NEW: Audio Player (if audio exists for current model)
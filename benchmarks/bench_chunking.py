@@ -0,0 +1,143 @@
+"""
+Benchmark split_text against the previous sentence-list implementation.
+
+Generates punctuated (Whisper-style) and unpunctuated (auto-caption style)
+transcripts, checks both chunkers agree, and times them.
+
+    python benchmarks/bench_chunking.py --words 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.processing.chunking import split_text  # noqa: E402
+
+WORDS = ("podcast episode today we talk about models data memory caching latency "
+         "pipeline audio caption summary question answer really think people thing").split()
+
+
+def make_transcript(n_words, punctuated=True, seed=0):
+    """Random words; with `punctuated`, sentences of 5-30 words ending in . ! or ?"""
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    if punctuated:
+        i = rng.randint(5, 30)
+        while i < n_words:
+            words[i - 1] += rng.choice(".!?")
+            i += rng.randint(5, 30)
+    return " ".join(words)
+
+
+def legacy_split_text(text, max_words=200, overlap=40):
+    """The original split_text (re-splits sentences and chunks while packing)."""
+    # Fallback for empty text
+    if not text or not text.strip():
+        return []
+
+    # 1. Split text into sentences using regex
+    # Looks for punctuation (. ! ?) followed by whitespace
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+
+    chunks = []
+    current_chunk_sentences = []
+    current_word_count = 0
+
+    for sentence in sentences:
+        words = sentence.split()
+        word_count = len(words)
+
+        # SAFETY FALLBACK: For YouTube auto-captions without punctuation.
+        # If a single "sentence" is larger than our max limit, we MUST slice it by words.
+        if word_count > max_words:
+            # Save any existing sentences we've collected
+            if current_chunk_sentences:
+                chunks.append(" ".join(current_chunk_sentences))
+                current_chunk_sentences = []
+                current_word_count = 0
+
+            # Brutally slice the massive unpunctuated block to prevent token crashes
+            i = 0
+            while i < word_count:
+                chunk_slice = words[i:i + max_words]
+                chunks.append(" ".join(chunk_slice))
+                i += max_words - overlap
+
+            # Set up the last slice as the start of the next potential chunk
+            if chunks:
+                last_chunk_words = chunks[-1].split()
+                current_chunk_sentences = [" ".join(last_chunk_words[-overlap:])] if overlap > 0 else []
+                current_word_count = len(current_chunk_sentences[0].split()) if current_chunk_sentences else 0
+            continue
+
+        # NORMAL FLOW: Add sentence to chunk if it fits
+        if current_word_count + word_count <= max_words:
+            current_chunk_sentences.append(sentence)
+            current_word_count += word_count
+        else:
+            # Chunk is full! Save it.
+            if current_chunk_sentences:
+                chunks.append(" ".join(current_chunk_sentences))
+
+            # Create the overlap for the next chunk using FULL SENTENCES
+            overlap_sentences = []
+            overlap_words = 0
+
+            # Work backwards through the current chunk to grab sentences for overlap
+            for s in reversed(current_chunk_sentences):
+                s_words = len(s.split())
+                if overlap_words + s_words <= overlap:
+                    overlap_sentences.insert(0, s)
+                    overlap_words += s_words
+                else:
+                    break
+
+            # If a single sentence was larger than the overlap, just keep that last sentence
+            if not overlap_sentences and current_chunk_sentences:
+                overlap_sentences = [current_chunk_sentences[-1]]
+
+            # Start the new chunk with the overlap + the new sentence
+            current_chunk_sentences = overlap_sentences + [sentence]
+            current_word_count = sum(len(s.split()) for s in current_chunk_sentences)
+
+    # Append the final chunk if anything is leftover
+    if current_chunk_sentences:
+        final_chunk = " ".join(current_chunk_sentences)
+        # Avoid appending a duplicate if the text ended perfectly on a chunk boundary
+        if not chunks or final_chunk != chunks[-1]:
+            chunks.append(final_chunk)
+
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-words", type=int, default=200)
+    parser.add_argument("--overlap", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'words':>9} {'style':<12} {'chunks':>7} {'new (s)':>8} {'legacy (s)':>11} {'speedup':>8}")
+    for n_words in args.words:
+        for punctuated in (True, False):
+            text = make_transcript(n_words, punctuated)
+
+            start = time.perf_counter()
+            chunks = split_text(text, args.max_words, args.overlap)
+            new = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = legacy_split_text(text, args.max_words, args.overlap)
+            legacy = time.perf_counter() - start
+
+            assert chunks == expected, "chunkers disagree"
+            style = "punctuated" if punctuated else "unpunctuated"
+            print(f"{n_words:>9} {style:<12} {len(chunks):>7} {new:>8.3f} {legacy:>11.3f} {legacy / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
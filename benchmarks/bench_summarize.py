@@ -0,0 +1,53 @@
+"""
+Time level-1 summarization one chunk at a time against batched generation.
+
+Chunks a synthetic transcript with the model's detail config and summarizes
+the chunks with each batch size (0 = auto-sized from available RAM). Needs
+the model weights (downloaded on first run).
+
+    python benchmarks/bench_summarize.py --model bart-large-cnn --words 6000 --batch-sizes 1 0
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Every batch size must generate every chunk
+os.environ["SUMMARY_CACHE"] = "0"
+
+from benchmarks.bench_chunking import make_transcript  # noqa: E402
+from src.processing.chunking import split_text  # noqa: E402
+from src.processing.summarize import DETAIL_CONFIGS, get_summarizer, summarize_chunks, summary_batch_size  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="bart-large-cnn", choices=sorted(DETAIL_CONFIGS))
+    parser.add_argument("--detail", default="medium", choices=["brief", "medium", "detailed"])
+    parser.add_argument("--words", type=int, default=6000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 0])
+    args = parser.parse_args()
+
+    config = DETAIL_CONFIGS[args.model][args.detail]
+    chunks = split_text(make_transcript(args.words), max_words=config["chunk_size"], overlap=config["chunk_overlap"])
+    summarizer = get_summarizer(args.model)
+    # Warm-up so the first timed run does not pay for lazy initialisation
+    summarize_chunks(chunks[:1], summarizer, config["chunk_max_length"], config["chunk_min_length"], args.model)
+
+    print(f"{len(chunks)} chunks of up to {config['chunk_size']} words")
+    print(f"{'batch size':>10} {'time (s)':>9} {'chunks/s':>9} {'speedup':>8}")
+    baseline = None
+    for requested in args.batch_sizes:
+        size = requested or summary_batch_size(summarizer, int(config["chunk_size"] * 1.3))
+        start = time.perf_counter()
+        summarize_chunks(chunks, summarizer, config["chunk_max_length"], config["chunk_min_length"], args.model,
+                         batch_size=size)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        label = f"{size}" + (" (auto)" if not requested else "")
+        print(f"{label:>10} {elapsed:>9.1f} {len(chunks) / elapsed:>9.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
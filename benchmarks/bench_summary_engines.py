@@ -0,0 +1,152 @@
+"""
+Compare summarization engines against the fp32 PyTorch baseline.
+
+Each engine runs in a fresh subprocess so load time and peak RSS are
+measured in isolation. Summaries of the same fixed transcripts are scored
+against the baseline's with ROUGE-1/2/L F1, so the table shows how far a
+quantized engine drifts from fp32 output. Without --transcripts, fixed
+transcripts are built from the sentences below (same text on every run),
+with near-duplicate chunk skipping off so every chunk reaches the engine.
+Needs the model weights; the onnx engine also needs optimum[onnxruntime].
+
+    python benchmarks/bench_summary_engines.py --engines torch torch-int8 onnx --transcripts talk.txt
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+SENTENCES = [
+    "Welcome back to the show, today we are looking at how speech models run on ordinary servers.",
+    "Most of our latency after transcription comes from the summarization model running on the processor.",
+    "Quantization stores weights as eight bit integers instead of thirty two bit floats.",
+    "That cuts memory roughly in four and usually speeds up matrix multiplication on modern chips.",
+    "The catch is that outputs can drift a little, so we measure how similar the summaries stay.",
+    "An exported graph can also reuse cached keys and values so each new token only runs one position.",
+    "Our guest has spent years tuning inference services for podcasts and long lectures.",
+    "Our guest says the biggest wins usually come from batching and from not repeating work at all.",
+    "Later in the episode we answer listener questions about caching transcripts and audio files.",
+    "Thanks for listening, and see you next week for a deep dive on retrieval.",
+]
+
+
+def fixed_transcripts(count=3, sentences=120):
+    """Deterministic transcripts: shuffled runs of SENTENCES with a fixed seed per transcript."""
+    texts = []
+    for seed in range(count):
+        rng = random.Random(seed)
+        texts.append(" ".join(rng.choice(SENTENCES) for _ in range(sentences)))
+    return texts
+
+
+def _ngrams(words, n):
+    return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate_total, overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge(candidate, reference):
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 over lowercased whitespace tokens."""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    scores = {}
+    for n in (1, 2):
+        c, r = _ngrams(cand, n), _ngrams(ref, n)
+        scores[f"rouge{n}"] = _f1(sum((c & r).values()), max(1, sum(c.values())), max(1, sum(r.values())))
+    # Longest common subsequence, one row at a time
+    prev = [0] * (len(ref) + 1)
+    for word in cand:
+        row = [0]
+        for j, other in enumerate(ref):
+            row.append(prev[j] + 1 if word == other else max(prev[j + 1], row[j]))
+        prev = row
+    scores["rougeL"] = _f1(prev[-1], max(1, len(cand)), max(1, len(ref)))
+    return scores
+
+
+def _child(engine, model_name, detail_level, paths):
+    # Select the engine before config is imported, and never answer from the summary cache or skip
+    # chunks as near-duplicates: the fixed transcripts reuse ten sentences, so most chunks would be
+    os.environ["SUMMARIZER_ENGINE"] = engine
+    os.environ.pop("BART_SUMMARIZER_ENGINE", None)
+    os.environ.pop("T5_SUMMARIZER_ENGINE", None)
+    os.environ.pop("DISTILBART_SUMMARIZER_ENGINE", None)
+    os.environ["SUMMARY_CACHE"] = "0"
+    os.environ["DEDUPE_THRESHOLD"] = "0"
+    from src.processing.summarize import get_summarizer, summarize_text
+
+    texts = fixed_transcripts() if not paths else [open(p, encoding="utf-8").read() for p in paths]
+
+    start = time.perf_counter()
+    get_summarizer(model_name)
+    load_s = time.perf_counter() - start
+
+    summaries, times = [], []
+    for text in texts:
+        start = time.perf_counter()
+        summaries.append(summarize_text(text, detail_level=detail_level, model_name=model_name))
+        times.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "load_s": load_s,
+        "summarize_s": times,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "summaries": summaries,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--model", default="bart-large-cnn")
+    parser.add_argument("--detail", default="medium", choices=["brief", "medium", "detailed"])
+    parser.add_argument("--transcripts", nargs="*", help="Text files to summarize (default: fixed built-in transcripts)")
+    parser.add_argument("--child", nargs=1, metavar="ENGINE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.model, args.detail, args.transcripts)
+        return
+
+    engines = ["torch"] + [e for e in args.engines if e != "torch"]
+    results = {}
+    print(f"{'engine':<12} {'load (s)':>9} {'mean (s)':>9} {'speedup':>8} {'peak RSS (MB)':>14} "
+          f"{'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8}")
+    for engine in engines:
+        cmd = [sys.executable, __file__, "--child", engine, "--model", args.model, "--detail", args.detail]
+        if args.transcripts:
+            cmd += ["--transcripts", *args.transcripts]
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+            print(f"{engine:<12} error: {reason}")
+            continue
+        r = results[engine] = json.loads(proc.stdout.strip().splitlines()[-1])
+        mean_s = sum(r["summarize_s"]) / len(r["summarize_s"])
+        baseline = results.get("torch")
+        if baseline is None:
+            print(f"{engine:<12} {r['load_s']:>9.1f} {mean_s:>9.1f} {'-':>8} {r['peak_rss_mb']:>14.0f} "
+                  f"{'-':>8} {'-':>8} {'-':>8}")
+            continue
+        base_mean = sum(baseline["summarize_s"]) / len(baseline["summarize_s"])
+        scores = [rouge(c, ref) for c, ref in zip(r["summaries"], baseline["summaries"])]
+        mean = {k: sum(s[k] for s in scores) / len(scores) for k in ("rouge1", "rouge2", "rougeL")}
+        print(f"{engine:<12} {r['load_s']:>9.1f} {mean_s:>9.1f} {base_mean / mean_s:>7.2f}x "
+              f"{r['peak_rss_mb']:>14.0f} {mean['rouge1']:>8.3f} {mean['rouge2']:>8.3f} {mean['rougeL']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare transcription backends by real-time factor and peak memory.
+
+Each engine/file pair runs in a fresh subprocess so load time and peak RSS
+are measured in isolation. Without --audio, a short English sample is
+synthesized with gTTS (network required) since the repo ships no audio.
+
+    python benchmarks/bench_transcribe.py --engines whisper faster-whisper --audio talk.mp3
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+SAMPLE_TEXT = (
+    "Welcome back to the show. Today we are talking about how speech recognition models run on ordinary "
+    "servers without a graphics card, and what it costs to keep several large models in memory at once. "
+    "Quantization stores weights as eight bit integers instead of thirty two bit floats, which cuts memory "
+    "and usually speeds up matrix multiplication on modern processors. "
+)
+
+
+def _child(engine, audio_path):
+    # Imported here so the parent process never loads a model
+    from src.ingestion.audio import SAMPLE_RATE
+    from src.ingestion.backends import get_backend
+    from src.ingestion.pcm import decode_to_pcm, load_pcm
+
+    audio = load_pcm(decode_to_pcm(audio_path))
+    backend = get_backend(engine)
+
+    start = time.perf_counter()
+    backend.get_model()
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = backend.transcribe(audio)
+    transcribe_s = time.perf_counter() - start
+
+    print(json.dumps({
+        "duration": len(audio) / SAMPLE_RATE,
+        "load_s": load_s,
+        "transcribe_s": transcribe_s,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "words": len(result["text"].split()),
+    }))
+
+
+def synthesize_sample(directory, repeats=4):
+    from gtts import gTTS
+    path = os.path.join(directory, "sample.mp3")
+    gTTS(text=SAMPLE_TEXT * repeats, lang="en").save(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["whisper", "faster-whisper"])
+    parser.add_argument("--audio", nargs="*", help="Audio files to transcribe (default: synthesized sample)")
+    parser.add_argument("--child", nargs=2, metavar=("ENGINE", "AUDIO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.audio or [synthesize_sample(tmp)]
+        print(f"{'engine':<16} {'file':<24} {'audio (s)':>9} {'load (s)':>9} {'RTF':>6} {'peak RSS (MB)':>14} {'words':>6}")
+        for path in files:
+            for engine in args.engines:
+                proc = subprocess.run([sys.executable, __file__, "--child", engine, path],
+                                      capture_output=True, text=True, cwd=ROOT)
+                if proc.returncode != 0:
+                    reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+                    print(f"{engine:<16} {os.path.basename(path):<24} error: {reason}")
+                    continue
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                rtf = r["transcribe_s"] / r["duration"] if r["duration"] else float("nan")
+                print(f"{engine:<16} {os.path.basename(path)[:24]:<24} {r['duration']:>9.1f} {r['load_s']:>9.1f} "
+                      f"{rtf:>6.2f} {r['peak_rss_mb']:>14.0f} {r['words']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the streaming VTT parser against the previous list-membership loop.
+
+Generates synthetic YouTube-style auto-captions (rolling two-line cues with
+inline word timestamps) and times both parsers.
+
+    python benchmarks/bench_vtt.py --hours 5
+"""
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ingestion.vtt import parse_vtt  # noqa: E402
+
+WORDS = ("podcast episode today we talk about models data memory caching latency "
+         "pipeline audio caption summary question answer really think people thing").split()
+
+
+def _ts(seconds):
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+def make_auto_captions(hours, seed=0):
+    """Rolling auto-caption VTT: each cue repeats the previous line above a new one."""
+    rng = random.Random(seed)
+    out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    t = 0.0
+    previous = ""
+    while t < hours * 3600:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 10))]
+        tagged = words[0] + "".join(f"<{_ts(t + 0.3 * (i + 1))}><c> {w}</c>" for i, w in enumerate(words[1:]))
+        out += [f"{_ts(t)} --> {_ts(t + 2.0)} align:start position:0%", previous, tagged, ""]
+        # Transition cue with the finished line only, as YouTube emits
+        previous = " ".join(words)
+        out += [f"{_ts(t + 2.0)} --> {_ts(t + 2.01)} align:start position:0%", previous, ""]
+        t += 2.01
+    return "\n".join(out).encode("utf-8")
+
+
+def legacy_parse(vtt_content):
+    """The original loop from fetch_youtube_transcript (quadratic dedupe)."""
+    text_parts = []
+    for line in vtt_content.split('\n'):
+        line = line.strip()
+        if (line and
+            not line.startswith('WEBVTT') and
+            not line.startswith('Kind:') and
+            not line.startswith('Language:') and
+            '-->' not in line and
+            not line.isdigit()):
+            cleaned = re.sub(r'<[^>]+>', '', line)
+            cleaned = cleaned.replace('\n', ' ').strip()
+            if cleaned and cleaned not in text_parts:
+                text_parts.append(cleaned)
+    full_text = ' '.join(text_parts)
+    return ' '.join(full_text.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 5])
+    parser.add_argument("--legacy-max-hours", type=float, default=5.0,
+                        help="skip the quadratic legacy parser above this length")
+    args = parser.parse_args()
+
+    print(f"{'hours':>6} {'MB':>7} {'cues':>8} {'streaming (s)':>14} {'legacy (s)':>11}")
+    for hours in args.hours:
+        data = make_auto_captions(hours)
+
+        start = time.perf_counter()
+        _, segments = parse_vtt(io.BytesIO(data))
+        streaming = time.perf_counter() - start
+
+        legacy = "skipped"
+        if hours <= args.legacy_max_hours:
+            start = time.perf_counter()
+            legacy_parse(data.decode("utf-8"))
+            legacy = f"{time.perf_counter() - start:.3f}"
+
+        print(f"{hours:>6} {len(data) / 1e6:>7.1f} {len(segments):>8} {streaming:>14.3f} {legacy:>11}")
+
+
+if __name__ == "__main__":
+    main()
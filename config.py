@@ -63,3 +63,121 @@ RAG_CHUNK_OVERLAP = 60
 # Summarizer Limits
 BART_MAX_INPUT_TOKENS = 1024
 T5_MAX_INPUT_TOKENS = 512
+
+# Model Registry (used in src/model_registry.py)
+# Models load on first use; least recently used ones are evicted above this budget (0 disables eviction)
+MODEL_RAM_BUDGET_MB = int(os.getenv("MODEL_RAM_BUDGET_MB", 3072))
+# Models unused for this many seconds are evicted by a background sweep (0 keeps them until the budget needs room)
+MODEL_IDLE_TIMEOUT_S = int(os.getenv("MODEL_IDLE_TIMEOUT_S", 1800))
+
+# Parallel Transcription (used in src/ingestion/transcribe.py)
+# Files longer than 1.5 windows are cut at silences and transcribed across this many processes (1 disables)
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", min(4, os.cpu_count() or 1)))
+TRANSCRIBE_WINDOW_SECONDS = int(os.getenv("TRANSCRIBE_WINDOW_SECONDS", 300))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", 2.0))
+
+# Transcript Cache (used in src/ingestion/transcript_cache.py)
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join(DATA_DIR, "transcripts"))
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", 512))
+
+# YouTube Audio Store (used in src/ingestion/audio_store.py)
+# Downloads are named by video ID and reused; evicted by age, then oldest-first above the size bound
+YOUTUBE_AUDIO_DIR = os.getenv("YOUTUBE_AUDIO_DIR", os.path.join(AUDIO_CACHE_DIR, "youtube"))
+AUDIO_STORE_MAX_MB = int(os.getenv("AUDIO_STORE_MAX_MB", 2048))
+AUDIO_STORE_MAX_AGE_HOURS = float(os.getenv("AUDIO_STORE_MAX_AGE_HOURS", 24))
+os.makedirs(YOUTUBE_AUDIO_DIR, exist_ok=True)
+
+# YouTube metadata (used in src/ingestion/youtube.py)
+# One yt-dlp extraction per video is shared by captions, downloads and video info for this long
+VIDEO_INFO_TTL_SECONDS = int(os.getenv("VIDEO_INFO_TTL_SECONDS", 600))
+
+# Bulk Ingestion (used in src/bulk.py)
+BULK_IO_WORKERS = int(os.getenv("BULK_IO_WORKERS", 8))
+BULK_CPU_WORKERS = int(os.getenv("BULK_CPU_WORKERS", max(1, (os.cpu_count() or 1) // 4)))
+# Videos fetched (or fetching) beyond the busy CPU workers before fetch threads block
+BULK_MAX_PENDING = int(os.getenv("BULK_MAX_PENDING", 4))
+BULK_MANIFEST_PATH = os.getenv("BULK_MANIFEST_PATH", os.path.join(DATA_DIR, "bulk_manifest.jsonl"))
+
+# Decoded PCM Cache (used in src/ingestion/pcm.py)
+# Audio is decoded once to 16 kHz float32 (~230 MB per hour) and memory-mapped for Whisper
+PCM_CACHE_DIR = os.getenv("PCM_CACHE_DIR", os.path.join(AUDIO_CACHE_DIR, "pcm"))
+PCM_CACHE_MAX_MB = int(os.getenv("PCM_CACHE_MAX_MB", 4096))
+
+# Transcription Backend (used in src/ingestion/backends.py)
+# "whisper" (openai-whisper, fp32) or "faster-whisper" (CTranslate2, needs `pip install faster-whisper`)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper")
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+
+# Streaming pipeline (used in src/pipeline.py)
+# Summarize finished chunks while later audio windows are still transcribing
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "1") == "1"
+
+# Async ingestion (used in src/ingestion/async_youtube.py)
+# Concurrent yt-dlp calls per event loop; each runs on a worker thread
+ASYNC_INGEST_CONCURRENCY = int(os.getenv("ASYNC_INGEST_CONCURRENCY", 16))
+
+# Chunk packing (used in src/processing/summarize.py)
+# "words" packs DETAIL_CONFIGS word counts; "tokens" measures sentences with the model's tokenizer
+# and packs each chunk up to TOKEN_PACK_FILL of its input window (BART/T5_MAX_INPUT_TOKENS)
+CHUNK_PACKING = os.getenv("CHUNK_PACKING", "words")
+TOKEN_PACK_FILL = float(os.getenv("TOKEN_PACK_FILL", 0.9))
+
+# Chunk windows (used in src/processing/summarize.py and src/retrieval/rag.py)
+# Chunks are generated lazily and summarized / embedded this many at a time
+CHUNK_WINDOW = int(os.getenv("CHUNK_WINDOW", 32))
+
+# Batched Summarization (used in src/processing/summarize.py)
+# Chunks per generate() call; 0 sizes batches from available RAM, up to SUMMARY_MAX_BATCH_SIZE
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 0))
+SUMMARY_MAX_BATCH_SIZE = int(os.getenv("SUMMARY_MAX_BATCH_SIZE", 16))
+
+# Map-Reduce Summarization (used in src/processing/summarize.py)
+# Processes summarizing chunks and reduce levels in parallel (1 = in-process); each holds its own model copy
+SUMMARIZE_WORKERS = int(os.getenv("SUMMARIZE_WORKERS", 1))
+
+# Summary Cache (used in src/processing/summary_cache.py)
+# Chunk summaries keyed by chunk text, model and generation settings; repeat work only runs uncached chunks
+SUMMARY_CACHE = os.getenv("SUMMARY_CACHE", "1") == "1"
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", os.path.join(DATA_DIR, "summaries"))
+SUMMARY_CACHE_MAX_MB = int(os.getenv("SUMMARY_CACHE_MAX_MB", 256))
+
+# Summarization Engines (used in src/processing/summary_engines.py)
+# "torch" (fp32), "torch-int8" (dynamically quantized, CPU) or "onnx" (ONNX Runtime, needs optimum[onnxruntime])
+SUMMARIZER_ENGINE = os.getenv("SUMMARIZER_ENGINE", "torch")
+SUMMARIZER_ENGINES = {
+    "bart-large-cnn": os.getenv("BART_SUMMARIZER_ENGINE", SUMMARIZER_ENGINE),
+    "t5-base": os.getenv("T5_SUMMARIZER_ENGINE", SUMMARIZER_ENGINE),
+    "distilbart-cnn": os.getenv("DISTILBART_SUMMARIZER_ENGINE", SUMMARIZER_ENGINE),
+}
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", os.path.join(DATA_DIR, "onnx"))
+
+# Latency Router (used in src/processing/router.py)
+# Per-request summarization deadline in seconds (0 = no budget: always BART-large with beam search)
+SUMMARY_LATENCY_BUDGET = float(os.getenv("SUMMARY_LATENCY_BUDGET", 0))
+SLO_TIERS = {"interactive": 20.0, "standard": 90.0, "batch": 0.0}
+# Measured seconds per input word for each route, learned from completed requests
+ROUTER_STATS_DIR = os.getenv("ROUTER_STATS_DIR", os.path.join(DATA_DIR, "router"))
+
+# Extractive Pre-filter (used in src/processing/extractive.py)
+# Share of sentences kept before abstractive summarization (1 = off); only inputs of at least EXTRACTIVE_MIN_WORDS
+EXTRACTIVE_RATIO = float(os.getenv("EXTRACTIVE_RATIO", 1.0))
+EXTRACTIVE_MIN_WORDS = int(os.getenv("EXTRACTIVE_MIN_WORDS", 3000))
+# "centrality" (similarity to the transcript's mean embedding) or "textrank" (PageRank over sentence similarities)
+EXTRACTIVE_METHOD = os.getenv("EXTRACTIVE_METHOD", "centrality")
+
+# Near-Duplicate Chunks (used in src/processing/dedupe.py)
+# Estimated Jaccard similarity (of 5-word shingles) above which a chunk repeats an earlier one (0 = keep all)
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", 0.85))
+DEDUPE_NUM_PERM = int(os.getenv("DEDUPE_NUM_PERM", 64))
+
+# Model Host (used in src/model_host.py)
+# Serve the summarizers and the embedding model from one shared process (python -m src.model_host)
+# instead of loading them in every app/worker process; clients start it on first use if MODEL_HOST_AUTOSTART
+MODEL_HOST = os.getenv("MODEL_HOST", "0") == "1"
+MODEL_HOST_ADDRESS = os.getenv("MODEL_HOST_ADDRESS", "127.0.0.1:6010")
+MODEL_HOST_KEY_PATH = os.getenv("MODEL_HOST_KEY_PATH", os.path.join(DATA_DIR, "model_host.key"))
+MODEL_HOST_AUTOSTART = os.getenv("MODEL_HOST_AUTOSTART", "1") == "1"
+MODEL_HOST_START_TIMEOUT = float(os.getenv("MODEL_HOST_START_TIMEOUT", 60))
+# Requests for the same model and settings arriving within MAX_WAIT_MS are run as one batch of up to MAX_BATCH inputs
+MODEL_HOST_MAX_BATCH = int(os.getenv("MODEL_HOST_MAX_BATCH", 16))
+MODEL_HOST_MAX_WAIT_MS = float(os.getenv("MODEL_HOST_MAX_WAIT_MS", 20))
@@ -0,0 +1,267 @@
+"""
+Bulk ingestion of playlists, channels and URL lists.
+
+Network-bound work (caption fetch, audio download) runs on a thread pool;
+Whisper and summarization run on a separate process pool. A fetch only starts
+while fewer than cpu_workers + BULK_MAX_PENDING videos are in flight, so every
+CPU worker stays busy while fast downloads never pile up unbounded audio on disk. Every finished video is
+appended to a JSONL manifest, which is also what a resumed run skips over.
+
+    python -m src.bulk "https://www.youtube.com/playlist?list=..." --detail brief
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+from config import BULK_IO_WORKERS, BULK_CPU_WORKERS, BULK_MAX_PENDING, BULK_MANIFEST_PATH
+from src.ingestion.youtube import fetch_youtube_transcript, download_audio, extract_video_id
+from src.ingestion import transcript_cache
+from src.model_registry import worker_pool
+from src.processing.transcript import Transcript
+
+
+def expand_urls(url):
+    """
+    Expand a playlist or channel URL into its videos without visiting each one.
+    A single-video URL expands to itself.
+
+    Returns:
+        list: dicts with 'video_id', 'url' and 'title'
+    """
+    opts = {'skip_download': True, 'quiet': True, 'no_warnings': True, 'extract_flat': 'in_playlist'}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    if 'entries' not in info:
+        return [{'video_id': info.get('id'), 'url': url, 'title': info.get('title')}]
+
+    videos = []
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        # Channels list their tabs (Videos, Shorts, ...) as nested playlists
+        if entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab':
+            videos.extend(expand_urls(entry.get('url') or entry.get('webpage_url')))
+            continue
+        video_id = entry.get('id')
+        video_url = entry.get('url') or f"https://www.youtube.com/watch?v={video_id}"
+        if not video_url.startswith('http'):
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+        videos.append({'video_id': video_id, 'url': video_url, 'title': entry.get('title')})
+    return videos
+
+
+def load_manifest(path):
+    """
+    Read a manifest written by `ingest`.
+
+    Returns:
+        dict: video_id -> latest record for that video
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves at most one truncated trailing line
+                continue
+            records[record['video_id']] = record
+    return records
+
+
+def _terminate_last_line(path):
+    # Make sure new records never get appended onto a line truncated by a crash
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            f.write(b'\n')
+
+
+def _fetch_video(video):
+    """I/O stage: cached transcript, captions, or downloaded audio for one video."""
+    start = time.time()
+    video_id = video['video_id'] or extract_video_id(video['url'])
+    payload = {'video': dict(video, video_id=video_id), 'text': None, 'source_type': None, 'audio_path': None}
+
+    text, source_type = transcript_cache.get_youtube_transcript(video_id) if video_id else (None, None)
+    if text is None:
+        text, segments, source_type = fetch_youtube_transcript(video['url'], with_segments=True)
+        if text is not None:
+            text = Transcript.from_segments(segments)
+            if video_id:
+                transcript_cache.put_youtube_transcript(video_id, source_type, text)
+        else:
+            payload['audio_path'] = download_audio(video['url'])
+            if not payload['audio_path']:
+                raise ValueError("Failed to download audio")
+
+    payload['text'] = text
+    payload['source_type'] = source_type
+    payload['fetch_time'] = time.time() - start
+    return payload
+
+
+def _process_video(payload, detail_level, model_name):
+    """CPU stage, run in a worker process: Whisper if needed, then summarization."""
+    from src.ingestion.transcribe import transcribe_audio
+    from src.processing.summarize import summarize_text
+
+    video = payload['video']
+    text = payload['text']
+    source_type = payload['source_type']
+    transcribe_time = 0.0
+
+    if text is None:
+        start = time.time()
+        # Parallelism here is across videos, so each video is a single Whisper pass
+        text = transcribe_audio(payload['audio_path'], workers=1)
+        transcribe_time = time.time() - start
+        source_type = 'whisper'
+        if video['video_id']:
+            transcript_cache.put_youtube_transcript(video['video_id'], source_type, text)
+
+    start = time.time()
+    summary, metrics = summarize_text(text, detail_level=detail_level, model_name=model_name, return_metrics=True)
+    summarize_time = time.time() - start
+
+    return {
+        'video_id': video['video_id'],
+        'url': video['url'],
+        'title': video.get('title'),
+        'status': 'ok',
+        'source_type': source_type,
+        'words': len(text.split()),
+        'summary': summary,
+        'metrics': metrics,
+        'timings': {
+            'fetch': payload['fetch_time'],
+            'transcribe': transcribe_time,
+            'summarize': summarize_time,
+            'total': payload['fetch_time'] + transcribe_time + summarize_time,
+        },
+    }
+
+
+def ingest(urls, manifest_path=BULK_MANIFEST_PATH, detail_level="medium", model_name="bart-large-cnn",
+           io_workers=BULK_IO_WORKERS, cpu_workers=BULK_CPU_WORKERS, max_pending=BULK_MAX_PENDING,
+           resume=True, status_cb=None):
+    """
+    Ingest every video behind `urls` (videos, playlists or channels).
+
+    Args:
+        urls: List of YouTube URLs
+        manifest_path: JSONL file that receives one record per finished video
+        detail_level: Summary detail level passed to `summarize_text`
+        io_workers: Threads for caption fetches and audio downloads
+        cpu_workers: Processes for Whisper and summarization
+        max_pending: Videos allowed to be fetched, or fetching, while every CPU worker is busy
+        resume: Skip videos already recorded as 'ok' in the manifest
+        status_cb: Optional callable receiving progress messages
+
+    Returns:
+        dict: Counts of 'ok', 'error' and 'skipped' videos
+    """
+    videos = []
+    seen = set()
+    for url in urls:
+        for video in expand_urls(url):
+            key = video['video_id'] or video['url']
+            if key not in seen:
+                seen.add(key)
+                videos.append(video)
+
+    done = load_manifest(manifest_path) if resume else {}
+    todo = [v for v in videos if done.get(v['video_id'], {}).get('status') != 'ok']
+    counts = {'ok': 0, 'error': 0, 'skipped': len(videos) - len(todo)}
+    if status_cb: status_cb(f"{len(videos)} videos, {counts['skipped']} already done, {len(todo)} to process")
+
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    _terminate_last_line(manifest_path)
+    manifest_lock = threading.Lock()
+    # One slot per video between the start of its fetch and the end of its processing: every CPU worker
+    # can be busy while at most `max_pending` fetched (or fetching) videos wait behind them
+    cpu_slots = threading.BoundedSemaphore(max(1, cpu_workers) + max(0, max_pending))
+
+    def record(entry):
+        with manifest_lock:
+            with open(manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            counts[entry['status']] += 1
+        if status_cb:
+            finished = counts['ok'] + counts['error']
+            status_cb(f"[{finished}/{len(todo)}] {entry['status']}: {entry.get('title') or entry['url']}")
+
+    def failure(video, stage, error):
+        return {'video_id': video['video_id'], 'url': video['url'], 'title': video.get('title'),
+                'status': 'error', 'stage': stage, 'error': str(error)}
+
+    with worker_pool(max(1, cpu_workers)) as cpu_pool:
+
+        def on_processed(video, future):
+            cpu_slots.release()
+            try:
+                record(future.result())
+            except Exception as e:
+                record(failure(video, 'process', e))
+
+        def fetch_then_submit(video):
+            # Backpressure: wait here until a slot is free, so downloads cannot outrun the CPU stage
+            cpu_slots.acquire()
+            try:
+                payload = _fetch_video(video)
+            except Exception as e:
+                cpu_slots.release()
+                record(failure(video, 'fetch', e))
+                return None
+            future = cpu_pool.submit(_process_video, payload, detail_level, model_name)
+            future.add_done_callback(lambda f: on_processed(video, f))
+            return future
+
+        with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+            submitted = list(io_pool.map(fetch_then_submit, todo))
+
+        for future in submitted:
+            if future is not None:
+                try:
+                    future.result()
+                except Exception:
+                    pass  # already recorded by on_processed
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest YouTube videos, playlists or channels.")
+    parser.add_argument("urls", nargs="+", help="Video, playlist or channel URLs")
+    parser.add_argument("--manifest", default=BULK_MANIFEST_PATH, help="JSONL manifest path")
+    parser.add_argument("--detail", default="medium", choices=["brief", "medium", "detailed", "all"],
+                        help="Detail level, or 'all' for every level from one shared pass")
+    parser.add_argument("--model", default="bart-large-cnn")
+    parser.add_argument("--io-workers", type=int, default=BULK_IO_WORKERS)
+    parser.add_argument("--cpu-workers", type=int, default=BULK_CPU_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=BULK_MAX_PENDING)
+    parser.add_argument("--no-resume", action="store_true", help="Reprocess videos already in the manifest")
+    args = parser.parse_args(argv)
+
+    counts = ingest(args.urls, manifest_path=args.manifest, detail_level=args.detail, model_name=args.model,
+                    io_workers=args.io_workers, cpu_workers=args.cpu_workers, max_pending=args.max_pending,
+                    resume=not args.no_resume, status_cb=print)
+    print(f"Done: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} skipped")
+    return 0 if counts['error'] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
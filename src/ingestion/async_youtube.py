@@ -0,0 +1,95 @@
+"""
+Asyncio counterparts of the blocking calls in `src.ingestion.youtube`.
+
+yt-dlp has no async API, so each call runs on a shared worker thread while the
+event loop stays free. At most ASYNC_INGEST_CONCURRENCY calls per loop hold a
+thread at once; the rest wait on a semaphore, and a call's `timeout` only
+starts counting once it has a slot. Cancelling a call (directly, via
+`asyncio.wait_for`, or through `timeout`) releases its slot immediately and
+aborts an audio download at its next progress update; metadata and caption
+requests already on the wire finish in the background and their result is
+discarded.
+
+    infos = await gather_urls(get_video_info, urls, timeout=30)
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from config import ASYNC_INGEST_CONCURRENCY
+from src.ingestion import youtube
+
+_executor = None
+_executor_lock = threading.Lock()
+# One semaphore per running loop: asyncio primitives cannot be shared across loops
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_INGEST_CONCURRENCY, thread_name_prefix="yt-async")
+        return _executor
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(ASYNC_INGEST_CONCURRENCY)
+    return semaphore
+
+
+async def _run(call, timeout=None, on_cancel=None):
+    """Run a zero-argument blocking call on the worker pool under the concurrency limit."""
+    async with _get_semaphore():
+        future = asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if on_cancel is not None:
+                on_cancel()
+            raise
+
+
+async def get_video_info(url, timeout=None):
+    """Async `youtube.get_video_info`. Raises `asyncio.TimeoutError` after `timeout` seconds."""
+    return await _run(functools.partial(youtube.get_video_info, url), timeout=timeout)
+
+
+async def fetch_youtube_transcript(url, with_segments=False, timeout=None):
+    """Async `youtube.fetch_youtube_transcript`; same return values."""
+    call = functools.partial(youtube.fetch_youtube_transcript, url, with_segments=with_segments)
+    return await _run(call, timeout=timeout)
+
+
+async def download_audio(url, timeout=None):
+    """
+    Async `youtube.download_audio`.
+
+    On cancellation or timeout the download is aborted and its partial files
+    removed. Other callers sharing the same in-flight download receive the
+    cancellation error too.
+    """
+    cancel_event = threading.Event()
+    call = functools.partial(youtube.download_audio, url, cancel_event=cancel_event)
+    return await _run(call, timeout=timeout, on_cancel=cancel_event.set)
+
+
+async def gather_urls(fn, urls, timeout=None, return_exceptions=True):
+    """
+    Run one of this module's coroutines for many URLs concurrently.
+
+    Args:
+        fn: e.g. `get_video_info` or `fetch_youtube_transcript`
+        urls: Iterable of YouTube URLs
+        timeout: Per-URL timeout in seconds
+        return_exceptions: Put each URL's exception in its result slot
+            instead of failing the whole batch on the first error
+
+    Returns:
+        list: Results in the same order as `urls`
+    """
+    return await asyncio.gather(*(fn(url, timeout=timeout) for url in urls), return_exceptions=return_exceptions)
@@ -0,0 +1,99 @@
+import re
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+_WORD_STRIP = re.compile(r"[^\w']+")
+
+
+def detect_silences(samples, sr=SAMPLE_RATE, noise_db=-35, min_silence=0.5,
+                    frame_seconds=0.05, block_seconds=600):
+    """
+    Find silent stretches in mono PCM by frame RMS.
+
+    `samples` may be a memory-mapped array: it is read `block_seconds` at a
+    time, so only one block is resident while the whole file is scanned.
+
+    Returns:
+        list: (start, end) tuples in seconds
+    """
+    frame = max(1, int(sr * frame_seconds))
+    block = frame * max(1, int(block_seconds / frame_seconds))
+    threshold = 10 ** (noise_db / 20)
+
+    quiet_blocks = []
+    for i in range(0, len(samples) - frame + 1, block):
+        chunk = np.asarray(samples[i:i + block], dtype=np.float32)
+        n = len(chunk) // frame
+        frames = chunk[:n * frame].reshape(n, frame)
+        quiet_blocks.append(np.sqrt(np.mean(frames * frames, axis=1)) < threshold)
+    if not quiet_blocks:
+        return []
+
+    quiet = np.concatenate(quiet_blocks).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], quiet, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    min_frames = min_silence / frame_seconds
+    return [(s * frame_seconds, e * frame_seconds) for s, e in zip(starts, ends) if e - s >= min_frames]
+
+
+def plan_windows(duration, silences, window_seconds=300, overlap_seconds=2.0, search_fraction=0.25):
+    """
+    Cut [0, duration] into windows of roughly `window_seconds`, aligned to silences.
+
+    Each cut is moved back to the middle of the closest silence within the last
+    `search_fraction` of the window. When no silence is available the cut stays
+    at the target and the next window starts `overlap_seconds` earlier so no
+    word is lost; the repeated words are dropped again with `overlap_length`.
+
+    Returns:
+        list: (start, end) tuples in seconds, in order
+    """
+    if duration <= 0:
+        return []
+
+    mids = sorted((s + e) / 2 for s, e in silences)
+    windows = []
+    start = 0.0
+    while start < duration:
+        target = start + window_seconds
+        if target >= duration:
+            windows.append((start, duration))
+            break
+
+        lower = target - window_seconds * search_fraction
+        candidates = [m for m in mids if lower <= m <= target]
+        if candidates:
+            cut = candidates[-1]
+            windows.append((start, cut))
+            start = cut
+        else:
+            windows.append((start, target))
+            start = target - overlap_seconds
+
+    # Fold a tiny trailing window into its predecessor
+    if len(windows) > 1 and windows[-1][1] - windows[-1][0] < window_seconds * 0.1:
+        last_start, last_end = windows.pop()
+        prev_start, _ = windows.pop()
+        windows.append((prev_start, last_end))
+    return windows
+
+
+def _normalize_word(word):
+    return _WORD_STRIP.sub("", word).lower()
+
+
+def overlap_length(tail_words, words, max_overlap_words=30):
+    """
+    Number of leading `words` that repeat the end of `tail_words`: the longest
+    such run, compared case- and punctuation-insensitively (0 if none).
+    """
+    limit = min(max_overlap_words, len(tail_words), len(words))
+    tail = [_normalize_word(w) for w in tail_words[-limit:]]
+    head = [_normalize_word(w) for w in words[:limit]]
+    for k in range(limit, 0, -1):
+        if tail[-k:] == head[:k]:
+            return k
+    return 0
+
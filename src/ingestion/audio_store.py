@@ -0,0 +1,142 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import Future
+from config import YOUTUBE_AUDIO_DIR, AUDIO_STORE_MAX_MB, AUDIO_STORE_MAX_AGE_HOURS
+
+# Suffixes yt-dlp uses for files that are still being written
+PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp", ".tmp")
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _is_partial(path):
+    return path.endswith(PARTIAL_SUFFIXES) or ".part-Frag" in path
+
+
+def find_audio(video_id, directory=YOUTUBE_AUDIO_DIR):
+    """
+    Return the path of a complete downloaded file for `video_id`, or None.
+    A hit refreshes the file's mtime so age-based eviction keeps it.
+    """
+    for path in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(video_id)}.*")):
+        if not _is_partial(path):
+            os.utime(path)
+            return path
+    return None
+
+
+def remove_partials(video_id, directory=YOUTUBE_AUDIO_DIR):
+    """Delete leftovers of an interrupted download for `video_id`."""
+    for path in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(video_id)}.*")):
+        if _is_partial(path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def get_or_download(video_id, download_fn, directory=YOUTUBE_AUDIO_DIR):
+    """
+    Return a local audio file for `video_id`, downloading it at most once.
+
+    A complete file already on disk is reused. Concurrent callers asking for
+    the same video share one `download_fn()` call and all receive its result
+    (or its exception). Partial files are removed when a download fails.
+
+    Args:
+        video_id: Canonical YouTube video ID, used as the file name
+        download_fn: Zero-argument callable that downloads into `directory`
+            and returns the final file path
+
+    Returns:
+        str: Path to the audio file
+    """
+    path = find_audio(video_id, directory)
+    if path:
+        return path
+
+    with _inflight_lock:
+        future = _inflight.get(video_id)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[video_id] = future
+
+    if not owner:
+        return future.result()
+
+    try:
+        path = find_audio(video_id, directory) or download_fn()
+        future.set_result(path)
+    except BaseException as e:
+        remove_partials(video_id, directory)
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(video_id, None)
+
+    prune_audio_store(directory, keep=(path,))
+    return path
+
+
+def prune_audio_store(directory=YOUTUBE_AUDIO_DIR, max_bytes=AUDIO_STORE_MAX_MB * 1024 * 1024,
+                      max_age_seconds=AUDIO_STORE_MAX_AGE_HOURS * 3600, keep=()):
+    """
+    Evict downloaded audio by age, then oldest-first until under `max_bytes`.
+
+    Files of downloads that are currently in flight, partial files (which may
+    be written by another process), and the paths in `keep` (e.g. a file just
+    written for the caller) are never evicted; they still count towards
+    `max_bytes`. Abandoned partial files are removed once they are older than
+    an hour.
+
+    Returns:
+        list: Paths that were removed
+    """
+    with _inflight_lock:
+        busy = set(_inflight)
+
+    keep = {os.path.abspath(path) for path in keep}
+    now = time.time()
+    files = []
+    pinned = 0
+    for entry in os.scandir(directory):
+        if not entry.is_file() or entry.name.split(".", 1)[0] in busy:
+            continue
+        stat = entry.stat()
+        if os.path.abspath(entry.path) in keep:
+            pinned += stat.st_size
+            continue
+        files.append((entry.path, stat.st_mtime, stat.st_size))
+
+    removed = []
+    survivors = []
+    for path, mtime, size in files:
+        age = now - mtime
+        if _is_partial(path):
+            if age > 3600:
+                removed.append(path)
+            else:
+                pinned += size
+        elif max_age_seconds and age > max_age_seconds:
+            removed.append(path)
+        else:
+            survivors.append((path, mtime, size))
+
+    total = pinned + sum(size for _, _, size in survivors)
+    for path, _, size in sorted(survivors, key=lambda f: f[1]):
+        if not max_bytes or total <= max_bytes:
+            break
+        removed.append(path)
+        total -= size
+
+    for path in removed:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    return removed
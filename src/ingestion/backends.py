@@ -0,0 +1,109 @@
+import os
+import warnings
+from config import WHISPER_MODEL, TRANSCRIBE_BACKEND, FASTER_WHISPER_COMPUTE_TYPE
+from src.model_registry import registry
+
+
+class TranscriptionBackend:
+    """
+    Interface for speech-to-text engines behind `transcribe_audio`.
+
+    `transcribe` takes 16 kHz mono float32 samples and returns
+    {"text": str, "segments": [(start_seconds, end_seconds, text), ...]}.
+    """
+
+    name = None
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper in fp32 on CPU (the original engine)."""
+
+    name = "whisper"
+
+    def __init__(self, model_size=WHISPER_MODEL):
+        self.model_size = model_size
+        self.key = f"whisper:{model_size}"
+        if not registry.is_registered(self.key):
+            registry.register(self.key, self._load)
+
+    def _load(self):
+        import whisper
+        print(f"Loading Whisper model: {self.model_size}...")
+        return whisper.load_model(self.model_size)
+
+    def get_model(self):
+        return registry.get(self.key)
+
+    def transcribe(self, audio):
+        with warnings.catch_warnings():
+            # torch warns when wrapping a read-only memory map; Whisper never writes to it
+            warnings.filterwarnings("ignore", message=".*not writable.*")
+            result = self.get_model().transcribe(audio)
+        segments = [(seg["start"], seg["end"], seg["text"]) for seg in result.get("segments") or []]
+        return {"text": result["text"].strip(), "segments": segments}
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    CTranslate2 Whisper (faster-whisper) with int8-quantized weights on CPU.
+    Requires the optional `faster-whisper` package.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size=WHISPER_MODEL, compute_type=FASTER_WHISPER_COMPUTE_TYPE):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.key = f"faster-whisper:{model_size}:{compute_type}"
+        if not registry.is_registered(self.key):
+            registry.register(self.key, self._load)
+
+    def _load(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "TRANSCRIBE_BACKEND=faster-whisper requires the faster-whisper package "
+                "(pip install faster-whisper)"
+            ) from e
+        print(f"Loading faster-whisper model: {self.model_size} ({self.compute_type})...")
+        return WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type,
+                            cpu_threads=_torch_threads())
+
+    def get_model(self):
+        return registry.get(self.key)
+
+    def transcribe(self, audio):
+        segments_iter, _ = self.get_model().transcribe(audio)
+        # The generator decodes lazily; consuming it is what runs the model
+        segments = [(seg.start, seg.end, seg.text) for seg in segments_iter]
+        return {"text": " ".join(t.strip() for _, _, t in segments), "segments": segments}
+
+
+def _torch_threads():
+    # Match the per-process thread share set by the transcription worker initializer
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name=TRANSCRIBE_BACKEND):
+    """Return the (shared) transcription backend registered under `name`."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import tempfile
+import numpy as np
+from config import PCM_CACHE_DIR, PCM_CACHE_MAX_MB
+from src.cache import hash_file
+from src.ingestion.audio import SAMPLE_RATE
+from src.ingestion.audio_store import prune_audio_store
+
+
+def pcm_path_for(audio_hash):
+    return os.path.join(PCM_CACHE_DIR, f"{audio_hash}.f32")
+
+
+def decode_to_pcm(audio_path, audio_hash=None):
+    """
+    Decode an audio file once to raw 16 kHz mono float32 PCM, keyed by its content hash.
+
+    Repeat calls for the same bytes (re-runs, another Whisper model size,
+    parallel workers) reuse the decoded file instead of running ffmpeg again.
+
+    Args:
+        audio_path: Source audio file
+        audio_hash: SHA-256 of the source bytes, if the caller already has it
+
+    Returns:
+        str: Path to the raw PCM file
+    """
+    audio_hash = audio_hash or hash_file(audio_path)
+    pcm_path = pcm_path_for(audio_hash)
+    if os.path.exists(pcm_path):
+        os.utime(pcm_path)
+        return pcm_path
+
+    os.makedirs(PCM_CACHE_DIR, exist_ok=True)
+    for attempt in range(2):
+        fd, tmp_path = tempfile.mkstemp(dir=PCM_CACHE_DIR, suffix=".part")
+        os.close(fd)
+        cmd = [
+            "ffmpeg", "-nostdin", "-y", "-threads", "0",
+            "-i", audio_path,
+            "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(SAMPLE_RATE),
+            tmp_path,
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+            os.replace(tmp_path, pcm_path)
+            break
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+        except OSError:
+            # The temp file was removed under us (e.g. by another process's cleanup): decode once more
+            if attempt:
+                raise
+            print("Decoded PCM disappeared before it was moved into place; decoding again...")
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    prune_audio_store(PCM_CACHE_DIR, max_bytes=PCM_CACHE_MAX_MB * 1024 * 1024, max_age_seconds=0,
+                      keep=(pcm_path,))
+    return pcm_path
+
+
+def load_pcm(pcm_path):
+    """
+    Memory-map a decoded PCM file as a read-only float32 array.
+    Processes mapping the same file share its pages through the OS page cache.
+    """
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(pcm_path, dtype=np.float32, mode="r")
@@ -1,8 +1,154 @@
-import whisper
-from config import WHISPER_MODEL
+import threading
+import numpy as np
+from config import TRANSCRIBE_BACKEND, TRANSCRIBE_WORKERS, TRANSCRIBE_WINDOW_SECONDS, TRANSCRIBE_OVERLAP_SECONDS
+from src.cache import hash_file
+from src.model_registry import worker_pool
+from src.ingestion.backends import get_backend
+from src.ingestion.audio import SAMPLE_RATE, detect_silences, plan_windows, overlap_length
+from src.ingestion.pcm import decode_to_pcm, load_pcm
+from src.processing.transcript import Transcript
 
-model = whisper.load_model(WHISPER_MODEL)
 
-def transcribe_audio(audio_path):
-    result = model.transcribe(audio_path)
-    return result["text"]
+def get_whisper_model():
+    """Lazy load the openai-whisper model through the shared registry"""
+    return get_backend("whisper").get_model()
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_transcribe_pool(workers):
+    """
+    Shared process pool for windowed transcription. Workers load the speech
+    model on their first window and keep it for later files; asking for a
+    different worker count replaces the pool.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = worker_pool(workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _transcribe_window(args):
+    pcm_path, start, end, backend_name = args
+    # Copy just this window out of the shared mapping; other workers map the same pages
+    audio = np.array(load_pcm(pcm_path)[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+    result = get_backend(backend_name).transcribe(audio)
+    result["segments"] = [(start + s, start + e, t) for s, e, t in result["segments"]]
+    return result
+
+
+def _drop_leading_words(segments, n):
+    """Remove the first `n` words from a list of (start, end, text) segments."""
+    kept = []
+    for start, end, text in segments:
+        words = text.split()
+        if n >= len(words):
+            n -= len(words)
+            continue
+        kept.append((start, end, " ".join(words[n:])))
+        n = 0
+    return kept
+
+
+def iter_transcript_segments(audio_path, workers=TRANSCRIBE_WORKERS, audio_hash=None,
+                             backend=TRANSCRIBE_BACKEND,
+                             window_seconds=TRANSCRIBE_WINDOW_SECONDS,
+                             overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS):
+    """
+    Transcribe silence-aligned windows and yield segments as each window completes.
+
+    The file is decoded once to cached PCM; silence detection and every window
+    read it through a memory map, so memory is bounded by the window length
+    rather than the file length. Windows run across the shared process pool
+    (see `get_transcribe_pool`) when `workers > 1`, otherwise one after another in this process. Results are
+    yielded in window order with words repeated across overlapping cuts removed,
+    so downstream stages can start on the first window while later ones decode.
+
+    Yields:
+        tuple: (start_seconds, end_seconds, text) segments in transcript order
+    """
+    pcm_path = decode_to_pcm(audio_path, audio_hash)
+    samples = load_pcm(pcm_path)
+    duration = len(samples) / SAMPLE_RATE
+    windows = plan_windows(duration, detect_silences(samples), window_seconds, overlap_seconds)
+    del samples
+    overlaps = [nxt[0] < cur[1] for cur, nxt in zip(windows, windows[1:])]
+    tasks = [(pcm_path, s, e, backend) for s, e in windows]
+
+    workers = max(1, min(workers, len(windows)))
+    print(f"Transcribing {len(windows)} windows on {workers} workers...")
+
+    futures = []
+    if workers > 1:
+        pool = get_transcribe_pool(workers)
+        futures = [pool.submit(_transcribe_window, task) for task in tasks]
+        results = (future.result() for future in futures)
+    else:
+        results = map(_transcribe_window, tasks)
+
+    try:
+        tail_words = []
+        for i, result in enumerate(results):
+            words = result["text"].split()
+            repeated = overlap_length(tail_words, words) if i > 0 and overlaps[i - 1] else 0
+            # Words removed as overlap come off the front of the window's segments
+            yield from _drop_leading_words(result["segments"], repeated)
+            if words[repeated:]:
+                tail_words = words[repeated:][-30:]
+    finally:
+        # The pool is shared: drop only this file's windows that have not started
+        for future in futures:
+            future.cancel()
+
+
+def transcribe_audio_parallel(audio_path, workers=TRANSCRIBE_WORKERS, audio_hash=None,
+                              backend=TRANSCRIBE_BACKEND,
+                              window_seconds=TRANSCRIBE_WINDOW_SECONDS,
+                              overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS):
+    """
+    Transcribe a long file as silence-aligned windows across a process pool.
+
+    Returns:
+        Transcript: Full transcript text with segment timing
+    """
+    return Transcript.from_segments(iter_transcript_segments(
+        audio_path, workers=workers, audio_hash=audio_hash, backend=backend,
+        window_seconds=window_seconds, overlap_seconds=overlap_seconds,
+    ))
+
+
+def transcribe_audio(audio_path, workers=TRANSCRIBE_WORKERS, audio_hash=None, backend=TRANSCRIBE_BACKEND):
+    """
+    Transcribe an audio file with the configured speech-to-text backend.
+
+    The audio is decoded once into the PCM cache and handed to the engine as a
+    memory-mapped array, so re-runs skip ffmpeg entirely.
+
+    Args:
+        audio_path: Path to the audio file
+        workers: Processes for windowed transcription of long files (1 = single pass)
+        audio_hash: SHA-256 of the file, if the caller already computed it
+        backend: Engine name from `src.ingestion.backends.BACKENDS`
+
+    Returns:
+        Transcript: The transcript text (a `str`) with the engine's segment timing
+    """
+    audio_hash = audio_hash or hash_file(audio_path)
+    audio = load_pcm(decode_to_pcm(audio_path, audio_hash))
+
+    # Long files go through the windowed process pool when more than one worker is configured
+    if workers > 1 and len(audio) > TRANSCRIBE_WINDOW_SECONDS * 1.5 * SAMPLE_RATE:
+        return transcribe_audio_parallel(audio_path, workers=workers, audio_hash=audio_hash, backend=backend)
+
+    result = get_backend(backend).transcribe(audio)
+    if not result["segments"]:
+        return Transcript(result["text"])
+    return Transcript.from_segments(result["segments"])
@@ -0,0 +1,65 @@
+from src.cache import DiskCache
+from src.processing.transcript import Transcript
+from config import TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB, WHISPER_MODEL, TRANSCRIBE_BACKEND
+
+# Priority order when several transcripts exist for one video
+YOUTUBE_SOURCES = ("manual", "auto-generated", "whisper")
+
+_cache = None
+
+
+def get_transcript_cache():
+    """Lazily open the on-disk transcript cache"""
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def youtube_key(video_id, source_type):
+    # Whisper transcripts depend on the engine and model that produced them
+    if source_type == "whisper":
+        return f"youtube:{video_id}:whisper:{TRANSCRIBE_BACKEND}:{WHISPER_MODEL}"
+    return f"youtube:{video_id}:{source_type}"
+
+
+def audio_key(audio_hash):
+    return f"audio:{audio_hash}:whisper:{TRANSCRIBE_BACKEND}:{WHISPER_MODEL}"
+
+
+def get_youtube_transcript(video_id):
+    """
+    Look up a cached transcript for a YouTube video.
+
+    Returns:
+        tuple: (Transcript, source_type) or (None, None) on a miss
+        source_type: 'manual', 'auto-generated' or 'whisper'
+    """
+    cache = get_transcript_cache()
+    for source_type in YOUTUBE_SOURCES:
+        entry = cache.get(youtube_key(video_id, source_type))
+        if entry is not None:
+            return Transcript.from_dict(entry), source_type
+    return None, None
+
+
+def _entry(text, source_type):
+    # Segment timing columns are stored alongside the text when available
+    entry = text.to_dict() if isinstance(text, Transcript) else {"text": text}
+    entry["source_type"] = source_type
+    return entry
+
+
+def put_youtube_transcript(video_id, source_type, text):
+    get_transcript_cache().set(youtube_key(video_id, source_type), _entry(text, source_type))
+
+
+def get_audio_transcript(audio_hash):
+    """Look up a cached Whisper transcript by the SHA-256 of the audio bytes"""
+    entry = get_transcript_cache().get(audio_key(audio_hash))
+    return Transcript.from_dict(entry) if entry is not None else None
+
+
+def put_audio_transcript(audio_hash, text):
+    get_transcript_cache().set(audio_key(audio_hash), _entry(text, "whisper"))
+
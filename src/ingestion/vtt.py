@@ -0,0 +1,108 @@
+import codecs
+import re
+from collections import deque
+
+_CUE_TIMING = re.compile(
+    r'^((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})'
+)
+_INLINE_TAG = re.compile(r'<[^>]*>')
+_ENTITIES = {'&amp;': '&', '&lt;': '<', '&gt;': '>', '&nbsp;': ' '}
+_ENTITY = re.compile('|'.join(map(re.escape, _ENTITIES)))
+
+# Auto-captions repeat a line across the next couple of rolling cues;
+# a short window catches that without suppressing genuine later repeats.
+DEDUPE_WINDOW = 8
+
+
+def parse_timestamp(value):
+    """Convert a VTT timestamp ('01:02:03.456' or '02:03.456') to seconds."""
+    parts = value.replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    if len(parts) > 1:
+        seconds += int(parts[-2]) * 60
+    if len(parts) > 2:
+        seconds += int(parts[-3]) * 3600
+    return seconds
+
+
+def iter_lines(stream, encoding='utf-8', block_size=64 * 1024):
+    """
+    Yield decoded lines from a binary file-like object without reading it all.
+    Plain iterables of str lines are passed through unchanged.
+    """
+    if not hasattr(stream, 'read'):
+        yield from stream
+        return
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    pending = ''
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        pending += decoder.decode(block) if isinstance(block, bytes) else block
+        lines = pending.split('\n')
+        pending = lines.pop()
+        yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def iter_cues(lines, window=DEDUPE_WINDOW):
+    """
+    Stream (start, end, text) caption lines out of VTT content.
+
+    Inline tags are stripped, and a line already seen among the last `window`
+    emitted lines is skipped, so each step is O(1) however long the file is.
+    """
+    recent = deque()
+    recent_set = set()
+    start = end = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            # Blocks are blank-line separated; text only counts after a cue timing line
+            start = None
+            continue
+
+        timing = _CUE_TIMING.match(line)
+        if timing:
+            start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+            continue
+
+        if start is None:
+            # Header, NOTE/STYLE/REGION blocks or a cue identifier
+            continue
+
+        cleaned = _INLINE_TAG.sub('', line)
+        if '&' in cleaned:
+            cleaned = _ENTITY.sub(lambda m: _ENTITIES[m.group(0)], cleaned)
+        cleaned = ' '.join(cleaned.split())
+        if not cleaned or cleaned in recent_set:
+            continue
+
+        recent.append(cleaned)
+        recent_set.add(cleaned)
+        if len(recent) > window:
+            recent_set.discard(recent.popleft())
+        yield start, end, cleaned
+
+
+def parse_vtt(source, window=DEDUPE_WINDOW):
+    """
+    Parse VTT content into plain text plus timestamped segments.
+
+    Args:
+        source: A binary file-like object (e.g. an HTTP response), or an
+            iterable of str lines
+        window: Rolling dedupe window, in caption lines
+
+    Returns:
+        tuple: (text, segments) where segments is a list of
+            (start_seconds, end_seconds, text) tuples in order
+    """
+    segments = list(iter_cues(iter_lines(source), window=window))
+    text = ' '.join(seg[2] for seg in segments)
+    return text, segments
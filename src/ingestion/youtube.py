@@ -1,179 +1,219 @@
 import yt_dlp
 import os
-import tempfile
 import re
-from config import AUDIO_CACHE_DIR
+import threading
+import time
+from config import YOUTUBE_AUDIO_DIR, VIDEO_INFO_TTL_SECONDS
+from src.ingestion.audio_store import get_or_download
+from src.ingestion.vtt import parse_vtt
 
-def fetch_youtube_transcript(url):
+_VIDEO_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com|youtube-nocookie\.com)/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)([A-Za-z0-9_-]{11})'),
+    re.compile(r'youtu\.be/([A-Za-z0-9_-]{11})'),
+]
+
+CAPTION_LANGS = ['en', 'en-US', 'en-GB']
+
+_BASE_OPTS = {
+    'skip_download': True,
+    'quiet': True,
+    'no_warnings': True,
+}
+
+# Short-lived info dicts keyed by video ID: {key: (fetched_at, info)}
+_info_cache = {}
+_info_lock = threading.Lock()
+
+
+def extract_video_id(url):
+    """
+    Extract the canonical 11-character YouTube video ID from a URL.
+
+    Returns:
+        str: The video ID, or None if the URL is not a recognised video link
+    """
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _info_cache_key(url):
+    video_id = extract_video_id(url)
+    return f"id:{video_id}" if video_id else f"url:{url}"
+
+
+def extract_video_metadata(url):
+    """
+    Fetch the yt-dlp info dict for a URL, shared by every caller for a short TTL.
+
+    Caption selection, subtitle download, audio download and `get_video_info`
+    all read from this one extraction instead of each hitting YouTube.
+
+    Returns:
+        dict: The yt-dlp info dict (raises on extraction failure)
+    """
+    key = _info_cache_key(url)
+    now = time.time()
+    with _info_lock:
+        cached = _info_cache.get(key)
+        if cached and now - cached[0] < VIDEO_INFO_TTL_SECONDS:
+            return cached[1]
+
+    with yt_dlp.YoutubeDL(_BASE_OPTS) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    with _info_lock:
+        # Drop expired entries while we hold the lock
+        for k in [k for k, (ts, _) in _info_cache.items() if now - ts >= VIDEO_INFO_TTL_SECONDS]:
+            del _info_cache[k]
+        _info_cache[key] = (now, info)
+    return info
+
+
+def clear_video_metadata_cache():
+    with _info_lock:
+        _info_cache.clear()
+
+
+def _select_caption_track(info):
+    """
+    Pick the best English caption track from an info dict.
+    Priority: manual subs > auto-generated subs, in CAPTION_LANGS order.
+
+    Returns:
+        tuple: (vtt_url, is_auto) or (None, None) if no usable track exists
+    """
+    subtitles = info.get('subtitles') or {}
+    automatic_captions = info.get('automatic_captions') or {}
+
+    for tracks, is_auto in ((subtitles, False), (automatic_captions, True)):
+        for lang in CAPTION_LANGS:
+            for fmt in tracks.get(lang) or []:
+                if fmt.get('ext') == 'vtt' and fmt.get('url'):
+                    return fmt['url'], is_auto
+    return None, None
+
+
+def fetch_youtube_transcript(url, with_segments=False):
     """
     Attempt to extract subtitles/captions using yt-dlp.
     Tries in order: manual English subs -> auto-generated English -> any English variant.
-    
+
+    The caption track is fetched straight from the URL in the (cached) info
+    dict, without a second extraction or a temp-directory round trip, and is
+    parsed as it streams in.
+
+    Args:
+        url: YouTube video URL
+        with_segments: Also return the (start, end, text) caption segments
+
     Returns:
         tuple: (transcript_text, source_type) or (None, None) if failed
         source_type: 'manual', 'auto-generated', or None
+        With `with_segments=True`: (transcript_text, segments, source_type)
     """
-    
-    # Use a temporary directory for subtitle files
-    with tempfile.TemporaryDirectory() as temp_dir:
-        subtitle_path = os.path.join(temp_dir, 'subtitle')
-        
-        ydl_opts = {
-            'skip_download': True,
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitleslangs': ['en', 'en-US', 'en-GB'],
-            'subtitlesformat': 'vtt',  # VTT is simpler to parse than json3
-            'outtmpl': subtitle_path,
-            'quiet': True,
-            'no_warnings': True,
-        }
-        
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                # Check what subtitles are available
-                subtitles = info.get('subtitles', {})
-                automatic_captions = info.get('automatic_captions', {})
-                
-                # Priority: manual subs > auto-generated subs
-                selected_lang = None
-                is_auto = False
-                
-                # Try manual English subtitles first
-                for lang in ['en', 'en-US', 'en-GB']:
-                    if lang in subtitles:
-                        selected_lang = lang
-                        is_auto = False
-                        break
-                
-                # Fallback to auto-generated
-                if not selected_lang:
-                    for lang in ['en', 'en-US', 'en-GB']:
-                        if lang in automatic_captions:
-                            selected_lang = lang
-                            is_auto = True
-                            break
-                
-                if not selected_lang:
-                    return None, None
-                
-                # Download the subtitle file
-                ydl_opts['subtitleslangs'] = [selected_lang]
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl_download:
-                    ydl_download.download([url])
-                
-                # Find and read the subtitle file
-                subtitle_file = None
-                for file in os.listdir(temp_dir):
-                    if file.endswith('.vtt'):
-                        subtitle_file = os.path.join(temp_dir, file)
-                        break
-                
-                if not subtitle_file or not os.path.exists(subtitle_file):
-                    return None, None
-                
-                # Parse VTT file
-                with open(subtitle_file, 'r', encoding='utf-8') as f:
-                    vtt_content = f.read()
-                
-                # Extract text from VTT (skip WEBVTT header and timestamps)
-                text_parts = []
-                for line in vtt_content.split('\n'):
-                    line = line.strip()
-                    # Skip WEBVTT header, timestamps, and empty lines
-                    if (line and 
-                        not line.startswith('WEBVTT') and 
-                        not line.startswith('Kind:') and
-                        not line.startswith('Language:') and
-                        '-->' not in line and
-                        not line.isdigit()):
-                        
-                        # CRITICAL FIX: Strip inline VTT tags (<c>, timestamps, etc.)
-                        cleaned = re.sub(r'<[^>]+>', '', line)
-                        cleaned = cleaned.replace('\n', ' ').strip()
-                        
-                        if cleaned and cleaned not in text_parts:  # Avoid duplicates
-                            text_parts.append(cleaned)
-                
-                full_text = ' '.join(text_parts)
-                full_text = ' '.join(full_text.split())  # Normalize whitespace
-                
-                source_type = 'auto-generated' if is_auto else 'manual'
-                
-                return full_text if full_text else None, source_type
-                
-        except Exception as e:
-            print(f"Subtitle extraction failed: {e}")
-            return None, None
-
-
-def download_audio(url):
+    failed = (None, None, None) if with_segments else (None, None)
+    try:
+        info = extract_video_metadata(url)
+        vtt_url, is_auto = _select_caption_track(info)
+        if not vtt_url:
+            return failed
+
+        with yt_dlp.YoutubeDL(_BASE_OPTS) as ydl, ydl.urlopen(vtt_url) as resp:
+            full_text, segments = parse_vtt(resp)
+
+        if not full_text:
+            return failed
+
+        source_type = 'auto-generated' if is_auto else 'manual'
+        return (full_text, segments, source_type) if with_segments else (full_text, source_type)
+
+    except Exception as e:
+        print(f"Subtitle extraction failed: {e}")
+        return failed
+
+
+def _cancel_hook(cancel_event):
+    def hook(progress):
+        if cancel_event.is_set():
+            raise yt_dlp.utils.DownloadCancelled("Download cancelled")
+    return hook
+
+
+def download_audio(url, cancel_event=None):
     """
     Download audio from YouTube video.
-    
+
+    Files are stored as `YOUTUBE_AUDIO_DIR/<video_id>.<ext>`, so concurrent
+    sessions never overwrite each other and a video already on disk is reused.
+    Concurrent requests for the same video share a single download, which
+    reuses the info dict from `extract_video_metadata`.
+
+    Args:
+        url: YouTube video URL
+        cancel_event: Optional `threading.Event`; setting it aborts the
+            download at the next progress update (partial files are removed)
+
     Returns:
         str: Path to downloaded audio file
     """
-    output_path = f"{AUDIO_CACHE_DIR}/yt_audio.%(ext)s"
-    
-    # Ensure directory exists
-    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
-    
-    ydl_opts = {
-        "format": "bestaudio/best",
-        "outtmpl": output_path,
-        "quiet": True,
-        "no_warnings": True,
-    }
-    
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
-        filename = ydl.prepare_filename(info)
-    
-    return filename
+    video_id = extract_video_id(url)
+    if video_id is None:
+        # Non-canonical URL: take the ID from the shared metadata fetch
+        video_id = extract_video_metadata(url)["id"]
+
+    def _download():
+        info = extract_video_metadata(url)
+        ydl_opts = {
+            "format": "bestaudio/best",
+            "outtmpl": os.path.join(YOUTUBE_AUDIO_DIR, f"{video_id}.%(ext)s"),
+            "quiet": True,
+            "no_warnings": True,
+        }
+        if cancel_event is not None:
+            ydl_opts["progress_hooks"] = [_cancel_hook(cancel_event)]
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # Select the audio format from the shared info dict instead of extracting again;
+            # sanitize_info copies it, since processing writes download details into the dict
+            info = ydl.process_ie_result(ydl.sanitize_info(info), download=True)
+            return ydl.prepare_filename(info)
+
+    return get_or_download(video_id, _download)
 
 
 def get_video_info(url):
     """
     Get basic video information without downloading.
     Useful for debugging and showing video details to user.
-    
+
     Returns:
         dict: Video metadata (title, duration, has_subs, etc.)
     """
-    ydl_opts = {
-        'skip_download': True,
-        'quiet': True,
-        'no_warnings': True,
-    }
-    
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            # Check for subtitle availability
-            has_manual = False
-            has_auto = False
-            
-            subtitles = info.get('subtitles', {})
-            automatic_captions = info.get('automatic_captions', {})
-            
-            for lang in ['en', 'en-US', 'en-GB']:
-                if lang in subtitles:
-                    has_manual = True
-                if lang in automatic_captions:
-                    has_auto = True
-            
-            return {
-                'title': info.get('title'),
-                'duration': info.get('duration'),
-                'channel': info.get('channel'),
-                'has_manual_subs': has_manual,
-                'has_auto_subs': has_auto,
-            }
+        info = extract_video_metadata(url)
+
+        # Check for subtitle availability
+        has_manual = False
+        has_auto = False
+
+        subtitles = info.get('subtitles') or {}
+        automatic_captions = info.get('automatic_captions') or {}
+
+        for lang in CAPTION_LANGS:
+            if lang in subtitles:
+                has_manual = True
+            if lang in automatic_captions:
+                has_auto = True
+
+        return {
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'channel': info.get('channel'),
+            'has_manual_subs': has_manual,
+            'has_auto_subs': has_auto,
+        }
     except Exception as e:
         print(f"Failed to get video info: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,358 @@
+"""
+Shared model host: one process owns the summarizers and the embedding model,
+and app sessions, pool workers and bulk workers use them over a local socket.
+
+The weights are then resident once per machine instead of once per process.
+Requests for the same model and settings that arrive within
+MODEL_HOST_MAX_WAIT_MS of each other are coalesced into a single batched
+call, so concurrent sessions share each forward pass instead of queueing
+for one model copy each.
+
+With MODEL_HOST=1, `get_summarizer` and `get_embedding_model` return thin
+clients (`RemoteSummarizer`, `RemoteEmbedder`) that start the host on first
+use if it is not already running. To run it yourself:
+
+    python -m src.model_host --preload bart-large-cnn
+"""
+import argparse
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from types import SimpleNamespace
+from config import (MODEL_HOST, MODEL_HOST_ADDRESS, MODEL_HOST_KEY_PATH, MODEL_HOST_AUTOSTART,
+                    MODEL_HOST_START_TIMEOUT, MODEL_HOST_MAX_BATCH, MODEL_HOST_MAX_WAIT_MS)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Set in the host process, which must load models itself rather than ask itself for them
+_serving = False
+
+
+def use_model_host():
+    """Whether models should come from the shared host instead of being loaded in this process."""
+    return MODEL_HOST and not _serving
+
+
+def parse_address(address=None):
+    host, _, port = (address or MODEL_HOST_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _authkey(create=False):
+    """Shared secret from MODEL_HOST_KEY_PATH, readable only by this user; created by the host on first run."""
+    try:
+        with open(MODEL_HOST_KEY_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        if not create:
+            return None
+    os.makedirs(os.path.dirname(os.path.abspath(MODEL_HOST_KEY_PATH)), exist_ok=True)
+    try:
+        fd = os.open(MODEL_HOST_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return _authkey()
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(32))
+    return _authkey()
+
+
+def _settings_key(kwargs):
+    return tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+
+
+class DynamicBatcher:
+    """
+    Coalesces requests for one model into batches.
+
+    `submit(inputs, kwargs)` blocks until its inputs have run. A worker thread
+    takes the oldest request, then keeps adding requests with the same
+    kwargs until the batch holds `max_batch` inputs or `max_wait` seconds
+    have passed, and runs them as one `run(inputs, kwargs)` call. Requests
+    with other kwargs wait for a later batch, in arrival order.
+    """
+
+    def __init__(self, run, max_batch=None, max_wait=None, name="batcher"):
+        self._run = run
+        self.max_batch = max_batch or MODEL_HOST_MAX_BATCH
+        self.max_wait = MODEL_HOST_MAX_WAIT_MS / 1000 if max_wait is None else max_wait
+        self._queue = queue.Queue()
+        self._deferred = []
+        self.batches = 0
+        threading.Thread(target=self._loop, name=name, daemon=True).start()
+
+    def submit(self, inputs, kwargs=None):
+        request = {"inputs": list(inputs), "kwargs": kwargs or {}, "done": threading.Event()}
+        request["key"] = _settings_key(request["kwargs"])
+        self._queue.put(request)
+        request["done"].wait()
+        if "error" in request:
+            raise request["error"]
+        return request["result"]
+
+    def _next_batch(self):
+        first = self._deferred.pop(0) if self._deferred else self._queue.get()
+        batch, size = [first], len(first["inputs"])
+
+        def fits(request):
+            return request["key"] == first["key"] and size + len(request["inputs"]) <= self.max_batch
+
+        for request in list(self._deferred):
+            if fits(request):
+                self._deferred.remove(request)
+                batch.append(request)
+                size += len(request["inputs"])
+
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if fits(request):
+                batch.append(request)
+                size += len(request["inputs"])
+            else:
+                self._deferred.append(request)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            inputs = [item for request in batch for item in request["inputs"]]
+            try:
+                results = self._run(inputs, batch[0]["kwargs"])
+            except Exception as e:
+                for request in batch:
+                    request["error"] = e
+            else:
+                offset = 0
+                for request in batch:
+                    request["result"] = results[offset:offset + len(request["inputs"])]
+                    offset += len(request["inputs"])
+            self.batches += 1
+            for request in batch:
+                request["done"].set()
+
+
+# ---------------------------------------------------------------- host side
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def _summarize_batch(model_name):
+    def run(texts, kwargs):
+        from src.processing.summarize import get_summarizer, summary_batch_size
+        summarizer = get_summarizer(model_name)
+        longest = max(len(text.split()) for text in texts)
+        batch_size = min(len(texts), summary_batch_size(summarizer, int(longest * 1.3),
+                                                        num_beams=kwargs.get("num_beams")))
+        return list(summarizer(texts, batch_size=batch_size, **kwargs))
+    return run
+
+
+def _embed_batch(texts, kwargs):
+    from src.retrieval.rag import get_embedding_model
+    return get_embedding_model().encode(texts, **kwargs)
+
+
+def _batcher(kind, model_name=None):
+    with _batchers_lock:
+        key = (kind, model_name)
+        if key not in _batchers:
+            run = _summarize_batch(model_name) if kind == "summarize" else _embed_batch
+            _batchers[key] = DynamicBatcher(run, name=f"batch-{kind}-{model_name or 'embedding'}")
+        return _batchers[key]
+
+
+def _describe_summarizer(model_name):
+    from src.processing.summarize import get_summarizer
+    summarizer = get_summarizer(model_name)
+    return summarizer.tokenizer, summarizer.model.config, getattr(summarizer.model, "generation_config", None)
+
+
+def _summarizer_loaded(model_name):
+    from src.processing.summarize import is_summarizer_loaded
+    return is_summarizer_loaded(model_name)
+
+
+OPS = {
+    "ping": lambda: True,
+    "describe_summarizer": _describe_summarizer,
+    "summarizer_loaded": _summarizer_loaded,
+    "summarize": lambda model_name, texts, kwargs: _batcher("summarize", model_name).submit(texts, kwargs),
+    "embed": lambda texts, kwargs: _batcher("embed").submit(texts, kwargs),
+}
+
+
+def _handle(conn):
+    """Serve one client connection: requests are (op, args) and replies ("ok", result) or ("error", exception)."""
+    with conn:
+        while True:
+            try:
+                op, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                reply = ("ok", OPS[op](*args))
+            except Exception as e:
+                reply = ("error", e)
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+            except Exception as e:
+                # The exception itself could not be pickled
+                conn.send(("error", RuntimeError(repr(reply[1]) if reply[0] == "error" else repr(e))))
+
+
+def serve(address=None, preload=()):
+    """Run the model host until interrupted. Models in `preload` are loaded before accepting requests."""
+    global _serving
+    _serving = True
+    for model_name in preload:
+        _describe_summarizer(model_name)
+    listener = Listener(parse_address(address), authkey=_authkey(create=True))
+    print(f"Model host listening on {address or MODEL_HOST_ADDRESS}")
+    with listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError) as e:
+                # A client with the wrong key, or one that hung up during the handshake
+                print(f"Model host: rejected connection ({e})")
+                continue
+            threading.Thread(target=_handle, args=(conn,), name="model-host-conn", daemon=True).start()
+
+
+# ---------------------------------------------------------------- client side
+
+_local = threading.local()
+_start_lock = threading.Lock()
+
+
+def _connect():
+    authkey = _authkey()
+    if authkey is None:
+        raise ConnectionRefusedError(f"No model host key at {MODEL_HOST_KEY_PATH}")
+    return Client(parse_address(), authkey=authkey)
+
+
+def _start_host():
+    """Start a host in the background and wait until it accepts connections."""
+    with _start_lock:
+        try:
+            return _connect()
+        except OSError:
+            pass
+        print("Starting model host...")
+        subprocess.Popen([sys.executable, "-m", "src.model_host"], cwd=ROOT, start_new_session=True,
+                         env={**os.environ, "MODEL_HOST": "0"},
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + MODEL_HOST_START_TIMEOUT
+        while True:
+            try:
+                return _connect()
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+
+def request(op, *args):
+    """
+    Run `op` on the host. Each thread keeps its own connection, so requests
+    from concurrent sessions reach the host together and can share a batch.
+    """
+    for attempt in range(2):
+        conn = getattr(_local, "conn", None)
+        if conn is None:
+            try:
+                conn = _connect()
+            except OSError:
+                if not MODEL_HOST_AUTOSTART:
+                    raise
+                conn = _start_host()
+            _local.conn = conn
+        try:
+            conn.send((op, args))
+            status, result = conn.recv()
+            break
+        except (EOFError, OSError):
+            # The host restarted since this connection was opened: reconnect once
+            _local.conn = None
+            conn.close()
+            if attempt:
+                raise
+    if status == "error":
+        raise result
+    return result
+
+
+class RemoteSummarizer:
+    """
+    Summarization-pipeline stand-in that runs generation on the model host.
+
+    Callable like a transformers summarization pipeline, with the host
+    model's `.tokenizer`, `.model.config` and `.model.generation_config`,
+    so chunking, batching and caching code works unchanged.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        tokenizer, config, generation_config = request("describe_summarizer", model_name)
+        self.tokenizer = tokenizer
+        self.model = SimpleNamespace(config=config, generation_config=generation_config)
+
+    def __call__(self, text, batch_size=None, **kwargs):
+        # The host sizes batches itself, across requests
+        texts = [text] if isinstance(text, str) else list(text)
+        return request("summarize", self.model_name, texts, kwargs)
+
+
+class RemoteEmbedder:
+    """SentenceTransformer stand-in whose `encode` runs on the model host."""
+
+    def encode(self, sentences, batch_size=None, **kwargs):
+        single = isinstance(sentences, str)
+        result = request("embed", [sentences] if single else list(sentences), kwargs)
+        return result[0] if single else result
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def remote_summarizer(model_name):
+    with _clients_lock:
+        if model_name not in _clients:
+            _clients[model_name] = RemoteSummarizer(model_name)
+        return _clients[model_name]
+
+
+def remote_embedder():
+    return RemoteEmbedder()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve summarization and embedding models to local clients.")
+    parser.add_argument("--address", default=MODEL_HOST_ADDRESS, help="host:port to listen on")
+    parser.add_argument("--preload", nargs="*", default=[], help="Summarizer models to load before serving")
+    args = parser.parse_args(argv)
+    try:
+        serve(args.address, args.preload)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    # `python -m` runs this file as __main__, a second copy of the module: serve from the copy that
+    # summarize.py and rag.py import, so they see `_serving` and load models here instead of asking the host
+    from src.model_host import main as _main
+    raise SystemExit(_main())
@@ -0,0 +1,216 @@
+import gc
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from config import MODEL_RAM_BUDGET_MB, MODEL_IDLE_TIMEOUT_S
+
+
+def estimate_model_bytes(model):
+    """
+    Estimate the resident size of a loaded model from its tensors.
+
+    Works for torch modules directly and for wrappers that expose one
+    (Hugging Face pipelines via `.model`). Returns 0 when nothing can be measured.
+    """
+    module = getattr(model, "model", model)
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(module, attr, None)
+        if not callable(tensors):
+            continue
+        try:
+            for t in tensors():
+                total += t.numel() * t.element_size()
+        except Exception:
+            return 0
+    return total
+
+
+def resident_set_bytes():
+    """Current RSS of this process (Linux /proc), or 0 where unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def available_memory_bytes():
+    """
+    RAM this process can still allocate (Linux /proc), or 0 where unavailable.
+
+    Takes the smaller of the host's MemAvailable and the headroom left under a
+    cgroup v2 memory limit, so containers are not sized from the host's RAM.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            available = next(int(line.split()[1]) * 1024 for line in f if line.startswith("MemAvailable:"))
+    except (OSError, ValueError, IndexError, StopIteration):
+        return 0
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        with open("/sys/fs/cgroup/memory.current") as f:
+            current = int(f.read())
+        if limit != "max":
+            available = min(available, max(0, int(limit) - current))
+    except (OSError, ValueError):
+        pass
+    return available
+
+
+def _init_worker(torch_threads, initializer, initargs):
+    # Each worker gets an equal share of the cores instead of torch's default of all of them
+    import torch
+    torch.set_num_threads(torch_threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def worker_pool(workers, initializer=None, initargs=()):
+    """
+    Process pool for model work (Whisper, summarization).
+
+    Each of the `workers` processes limits torch to an equal share of the
+    cores, then runs `initializer(*initargs)` if given.
+    """
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn: forking a process that already holds torch/OpenMP state can deadlock
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(torch_threads, initializer, initargs))
+
+
+class ModelRegistry:
+    """
+    Loads models on first use and keeps the set of resident models under a RAM budget.
+
+    Each model is registered with a loader callable. `get()` loads it on demand,
+    records its estimated size and last-use time, and evicts the least recently
+    used models when the total exceeds the budget. The model being returned is
+    never evicted by its own load. With an idle timeout, a background thread
+    started by the first `get()` also evicts models unused for that long.
+    """
+
+    def __init__(self, budget_mb=MODEL_RAM_BUDGET_MB, idle_timeout=MODEL_IDLE_TIMEOUT_S):
+        self.budget_bytes = int(budget_mb * 1024 * 1024) if budget_mb else 0
+        self.idle_timeout = idle_timeout or 0
+        self._sweeper = None
+        self._loaders = {}
+        self._models = OrderedDict()  # name -> {"model", "bytes", "last_used"}
+        self._lock = threading.RLock()
+        self._load_locks = {}
+
+    def register(self, name, loader, size_fn=estimate_model_bytes):
+        """Register a zero-argument loader for `name`. Re-registering replaces the loader."""
+        with self._lock:
+            self._loaders[name] = (loader, size_fn)
+
+    def is_registered(self, name):
+        return name in self._loaders
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        """Return the model registered as `name`, loading it if needed."""
+        with self._lock:
+            if self.idle_timeout and self._sweeper is None:
+                self._start_sweeper()
+            entry = self._models.get(name)
+            if entry is not None:
+                entry["last_used"] = time.time()
+                self._models.move_to_end(name)
+                return entry["model"]
+            if name not in self._loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the registry lock so other models stay usable meanwhile;
+        # the per-name lock stops two threads from loading the same weights.
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    entry["last_used"] = time.time()
+                    self._models.move_to_end(name)
+                    return entry["model"]
+                loader, size_fn = self._loaders[name]
+
+            rss_before = resident_set_bytes()
+            model = loader()
+            size = size_fn(model) if size_fn else 0
+            if not size:
+                # Non-torch engines (e.g. CTranslate2): fall back to the RSS growth during load
+                size = max(0, resident_set_bytes() - rss_before)
+
+            with self._lock:
+                self._models[name] = {"model": model, "bytes": size, "last_used": time.time()}
+                self._enforce_budget(keep=name)
+            return model
+
+    def evict(self, name):
+        """Drop a resident model. Returns True if it was loaded."""
+        with self._lock:
+            entry = self._models.pop(name, None)
+        if entry is None:
+            return False
+        print(f"Evicting model: {name} ({entry['bytes'] / 1e6:.0f} MB)")
+        del entry
+        gc.collect()
+        return True
+
+    def evict_idle(self, max_idle_seconds):
+        """Evict every model that has not been used for `max_idle_seconds`."""
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            idle = [n for n, e in self._models.items() if e["last_used"] < cutoff]
+        for name in idle:
+            self.evict(name)
+        return idle
+
+    def _start_sweeper(self):
+        # The thread holds only a weak reference, so a discarded registry is not kept alive by it
+        ref = weakref.ref(self)
+        interval = min(60, max(1, self.idle_timeout / 2))
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                registry = ref()
+                if registry is None:
+                    return
+                registry.evict_idle(registry.idle_timeout)
+                del registry
+
+        self._sweeper = threading.Thread(target=sweep, name="model-idle-sweep", daemon=True)
+        self._sweeper.start()
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(e["bytes"] for e in self._models.values())
+
+    def stats(self):
+        """Snapshot of resident models for diagnostics."""
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": sum(e["bytes"] for e in self._models.values()),
+                "models": {n: {"bytes": e["bytes"], "last_used": e["last_used"]} for n, e in self._models.items()},
+            }
+
+    def _enforce_budget(self, keep):
+        if not self.budget_bytes:
+            return
+        while self.resident_bytes() > self.budget_bytes:
+            # OrderedDict is kept in LRU order by get()
+            victim = next((n for n in self._models if n != keep), None)
+            if victim is None:
+                break
+            self.evict(victim)
+
+
+registry = ModelRegistry()
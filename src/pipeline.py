@@ -1,53 +1,226 @@
+import queue
+import threading
 from typing import Tuple, Dict, Any, Callable, Optional
-from src.ingestion.youtube import fetch_youtube_transcript, download_audio
-from src.ingestion.transcribe import transcribe_audio
-from src.processing.summarize import summarize_text
+from config import PIPELINE_STREAMING, EXTRACTIVE_RATIO, CHUNK_PACKING
+from src.ingestion.youtube import fetch_youtube_transcript, download_audio, extract_video_id
+from src.ingestion.transcribe import transcribe_audio, iter_transcript_segments
+from src.ingestion import transcript_cache
+from src.cache import hash_file
+from src.processing.summarize import (summarize_stream, summarize_progressive, summarize_all_levels,
+                                      is_summarizer_loaded)
+from src.processing.router import choose_route, record_route, SPEECH_WORDS_PER_SECOND
+from src.ingestion.audio import SAMPLE_RATE
+from src.ingestion.pcm import decode_to_pcm, load_pcm
+from src.processing.transcript import Transcript
 
-def process_youtube_pipeline(url: str, detail_level: str, status_cb: Optional[Callable[[str], None]] = None) -> Tuple[str, str, str, Dict[str, Any]]:
+SOURCE_LABELS = {
+    "manual": "YouTube Captions (Manual)",
+    "auto-generated": "YouTube Captions (Auto-generated)",
+    "whisper": "Whisper Transcription",
+}
+
+_DONE = object()
+
+def _progress_message(event):
+    """One-line status for a summarization progress event."""
+    if event["stage"] == "reduce":
+        return f"Summarized {event['chunks_done']} chunks. Combining into the final summary..."
+    if event["chunks_total"]:
+        eta = f", about {event['eta']:.0f}s left" if event["eta"] is not None else ""
+        return f"Summarized {event['chunks_done']}/{event['chunks_total']} chunks{eta}..."
+    return f"Summarized {event['chunks_done']} chunks so far..."
+
+def _forward_progress(status_cb, progress_cb):
+    """Callback passing progress events to `progress_cb` and a status line to `status_cb`, or None if neither is set."""
+    if not status_cb and not progress_cb:
+        return None
+
+    def forward(event):
+        if progress_cb: progress_cb(event)
+        if status_cb: status_cb(_progress_message(event))
+    return forward
+
+def _can_stream(detail_level):
+    """
+    Whether audio can be summarized while it is transcribed. All detail levels
+    share one level-1 pass over the full transcript, and the extractive
+    pre-filter scores sentences against the whole transcript, so neither streams;
+    nor does token packing, since the streaming chunker packs by word count.
+    """
+    return (PIPELINE_STREAMING and detail_level != "all" and EXTRACTIVE_RATIO >= 1
+            and CHUNK_PACKING != "tokens")
+
+def _summarize(text, detail_level, status_cb=None, progress_cb=None, latency_budget=None, slo_tier=None):
+    """
+    Summarize on the route chosen for the latency budget, reporting level-1
+    progress as chunk summaries complete. For detail_level "all" the summary
+    and metrics are dicts by level (see `summarize_all_levels`).
+    """
+    route = choose_route(len(text.split()), latency_budget, slo_tier)
+    if status_cb: status_cb(f"Generating summary with {route['route']}...")
+    if detail_level == "all":
+        summaries, metrics = summarize_all_levels(text, model_name=route["model_name"], return_metrics=True,
+                                                  generation_kwargs=route["generation_kwargs"])
+        # Reported per level, but a three-level run's time says nothing about one level's cost
+        for level_metrics in metrics.values():
+            record_route(route, level_metrics, learn=False)
+        return summaries, metrics
+    forward = _forward_progress(status_cb, progress_cb)
+    was_loaded = is_summarizer_loaded(route["model_name"])
+    for event in summarize_progressive(text, detail_level=detail_level, model_name=route["model_name"],
+                                       generation_kwargs=route["generation_kwargs"]):
+        if event["stage"] != "final" and forward:
+            forward(event)
+    return event["summary"], record_route(route, event["metrics"], learn=was_loaded)
+
+def _route_audio(audio_path, audio_hash, latency_budget, slo_tier):
+    """Route by the audio's duration, since the transcript does not exist yet (the PCM decode is cached for transcription)."""
+    duration = len(load_pcm(decode_to_pcm(audio_path, audio_hash))) / SAMPLE_RATE
+    return choose_route(int(duration * SPEECH_WORDS_PER_SECOND), latency_budget, slo_tier)
+
+def transcribe_and_summarize(audio_path: str, detail_level: str, audio_hash: Optional[str] = None,
+                             model_name: str = "bart-large-cnn",
+                             progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             generation_kwargs: Optional[Dict[str, Any]] = None
+                             ) -> Tuple[Transcript, str, Dict[str, Any]]:
+    """
+    Transcribe and summarize as overlapping stages.
+
+    Transcription runs on a background thread and hands each window's segments
+    over a queue; the calling thread chunks them as they arrive and summarizes
+    every finished chunk immediately. Only the final reduce waits for the last
+    window, so end-to-end time approaches the slower of the two stages instead
+    of their sum. `progress_cb` receives each chunk summary as it completes
+    (see `summarize_stream`).
+    """
+    segments = []
+    handoff = queue.Queue()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for segment in iter_transcript_segments(audio_path, audio_hash=audio_hash):
+                if stop.is_set():
+                    break
+                handoff.put(segment)
+        except BaseException as e:
+            handoff.put(e)
+        finally:
+            handoff.put(_DONE)
+
+    def pieces():
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            segments.append(item)
+            yield item[2]
+
+    producer = threading.Thread(target=produce, name="transcribe-stream", daemon=True)
+    producer.start()
+    try:
+        summary, metrics = summarize_stream(pieces(), detail_level=detail_level, model_name=model_name,
+                                            return_metrics=True, progress_cb=progress_cb,
+                                            generation_kwargs=generation_kwargs)
+    finally:
+        # Lets the producer wind down (and cancel its pending windows) if summarization failed
+        stop.set()
+    producer.join()
+    return Transcript.from_segments(segments), summary, metrics
+
+def process_youtube_pipeline(url: str, detail_level: str, status_cb: Optional[Callable[[str], None]] = None,
+                             progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             latency_budget: Optional[float] = None,
+                             slo_tier: Optional[str] = None) -> Tuple[str, str, str, Dict[str, Any]]:
     """
     Facade for the entire YouTube processing pipeline.
     Handles extraction, fallback transcription, and initial summarization.
+    Transcripts are cached on disk by video ID, so repeat URLs skip extraction entirely.
+    While summarizing, `status_cb` gets chunk progress and ETA lines and
+    `progress_cb` gets the progress events themselves, including each partial
+    chunk summary (see `summarize_progressive`).
+    The summarization model and decoding profile are routed to fit
+    `latency_budget` seconds or an `slo_tier` from SLO_TIERS (default
+    SUMMARY_LATENCY_BUDGET); the route and predicted vs. actual time are
+    recorded in the metrics. `detail_level` "all" returns every level as a
+    dict (see `summarize_all_levels`).
     """
-    if status_cb: status_cb("Extracting transcript from YouTube...")
-    text, source_type = fetch_youtube_transcript(url)
-
-    if text is not None:
-        source = "YouTube Captions (Manual)" if source_type == "manual" else "YouTube Captions (Auto-generated)"
-    else:
-        if status_cb: status_cb("No captions found. Downloading audio...")
-        audio_path = download_audio(url)
-        
-        if not audio_path:
-            raise ValueError("Failed to download audio. Please verify the URL.")
-            
-        if status_cb: status_cb("Transcribing audio with Whisper (this may take several minutes)...")
-        text = transcribe_audio(audio_path)
-        source = "Whisper Transcription"
-
-    if status_cb: status_cb("Generating summary with BART-large-CNN...")
-    summary, metrics = summarize_text(
-        text, 
-        detail_level=detail_level,
-        model_name="bart-large-cnn",
-        return_metrics=True
-    )
-    
+    video_id = extract_video_id(url)
+    summary = None
+    text, source_type = transcript_cache.get_youtube_transcript(video_id) if video_id else (None, None)
+
+    if text is None:
+        if status_cb: status_cb("Extracting transcript from YouTube...")
+        text, segments, source_type = fetch_youtube_transcript(url, with_segments=True)
+
+        if text is not None:
+            text = Transcript.from_segments(segments)
+        else:
+            if status_cb: status_cb("No captions found. Downloading audio...")
+            audio_path = download_audio(url)
+
+            if not audio_path:
+                raise ValueError("Failed to download audio. Please verify the URL.")
+
+            if _can_stream(detail_level):
+                if status_cb: status_cb("Transcribing and summarizing audio (this may take several minutes)...")
+                route = _route_audio(audio_path, None, latency_budget, slo_tier)
+                was_loaded = is_summarizer_loaded(route["model_name"])
+                text, summary, metrics = transcribe_and_summarize(
+                    audio_path, detail_level, model_name=route["model_name"],
+                    progress_cb=_forward_progress(status_cb, progress_cb),
+                    generation_kwargs=route["generation_kwargs"])
+                record_route(route, metrics, learn=was_loaded)
+            else:
+                if status_cb: status_cb("Transcribing audio with Whisper (this may take several minutes)...")
+                text = transcribe_audio(audio_path)
+            source_type = "whisper"
+
+        if video_id:
+            transcript_cache.put_youtube_transcript(video_id, source_type, text)
+    elif status_cb:
+        status_cb("Loaded cached transcript.")
+
+    source = SOURCE_LABELS[source_type]
+
+    if summary is None:
+        summary, metrics = _summarize(text, detail_level, status_cb, progress_cb, latency_budget, slo_tier)
+
     return text, source, summary, metrics
 
-def process_audio_pipeline(file_path: str, detail_level: str, status_cb: Optional[Callable[[str], None]] = None) -> Tuple[str, str, str, Dict[str, Any]]:
+def process_audio_pipeline(file_path: str, detail_level: str, status_cb: Optional[Callable[[str], None]] = None,
+                           progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           latency_budget: Optional[float] = None,
+                           slo_tier: Optional[str] = None) -> Tuple[str, str, str, Dict[str, Any]]:
     """
     Facade for processing raw audio files.
+    Transcripts are cached on disk by a hash of the audio bytes and the Whisper model.
+    Progress reporting and latency routing work as in `process_youtube_pipeline`.
     """
-    if status_cb: status_cb("Transcribing audio with Whisper (this may take several minutes)...")
-    text = transcribe_audio(file_path)
-    source = "Whisper Transcription"
-
-    if status_cb: status_cb("Generating summary with BART-large-CNN...")
-    summary, metrics = summarize_text(
-        text,
-        detail_level=detail_level,
-        model_name="bart-large-cnn",
-        return_metrics=True
-    )
+    audio_hash = hash_file(file_path)
+    summary = None
+    text = transcript_cache.get_audio_transcript(audio_hash)
+
+    if text is None:
+        if _can_stream(detail_level):
+            if status_cb: status_cb("Transcribing and summarizing audio (this may take several minutes)...")
+            route = _route_audio(file_path, audio_hash, latency_budget, slo_tier)
+            was_loaded = is_summarizer_loaded(route["model_name"])
+            text, summary, metrics = transcribe_and_summarize(
+                file_path, detail_level, audio_hash=audio_hash, model_name=route["model_name"],
+                progress_cb=_forward_progress(status_cb, progress_cb), generation_kwargs=route["generation_kwargs"])
+            record_route(route, metrics, learn=was_loaded)
+        else:
+            if status_cb: status_cb("Transcribing audio with Whisper (this may take several minutes)...")
+            text = transcribe_audio(file_path, audio_hash=audio_hash)
+        transcript_cache.put_audio_transcript(audio_hash, text)
+    elif status_cb:
+        status_cb("Loaded cached transcript.")
+    source = SOURCE_LABELS["whisper"]
+
+    if summary is None:
+        summary, metrics = _summarize(text, detail_level, status_cb, progress_cb, latency_budget, slo_tier)
 
     return text, source, summary, metrics
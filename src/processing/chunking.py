@@ -1,84 +1,430 @@
-import re
+from bisect import bisect_left, bisect_right
+import numpy as np
+from src.processing.transcript import TextSpan
+
+# Code points str.split() treats as whitespace: a lookup table for Latin-1,
+# plus the few Unicode spaces above it
+_WHITESPACE_LATIN1 = np.array([chr(c).isspace() for c in range(256)])
+_WHITESPACE_HIGH = np.array([c for c in range(256, 0x3100) if chr(c).isspace()], dtype=np.uint32)
+# Sentences end at punctuation (. ! ?) followed by whitespace
+_SENTENCE_END = ('.', '!', '?')
+_SENTENCE_END_CODES = np.array([ord(c) for c in _SENTENCE_END], dtype=np.uint32)
+
+
+def _index_words(text):
+    """
+    Tokenize `text` exactly like `str.split()`, but into index arrays.
+
+    Returns:
+        tuple: (starts, ends, sentence_ends, normalized) where `starts`/`ends`
+        are the character bounds of every word, `sentence_ends` the word
+        indices just past each sentence that is followed by more text, and
+        `normalized` whether words are separated by single spaces only (so a
+        run of words is a plain slice of `text`).
+    """
+    if text.isascii():
+        # One byte per character: a quarter of the memory and no wide-char decode
+        codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    else:
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    top = int(codes.max()) if codes.size else 0
+    whitespace = _WHITESPACE_LATIN1[codes if top < 256 else np.minimum(codes, 255)]
+    if top >= _WHITESPACE_HIGH[0]:
+        whitespace |= np.isin(codes, _WHITESPACE_HIGH)
+
+    # +1 where whitespace begins, -1 where a word begins (text is padded with whitespace)
+    flags = whitespace.view(np.int8)
+    edges = np.empty(len(flags) + 1, dtype=np.int8)
+    np.subtract(flags[1:], flags[:-1], out=edges[1:-1])
+    edges[0] = flags[0] - 1 if len(flags) else 0
+    edges[-1] = 1 - flags[-1] if len(flags) else 0
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+
+    # A word ending in . ! or ? is followed by whitespace unless it is the last word
+    sentence_ends = np.flatnonzero(np.isin(codes[ends[:-1] - 1], _SENTENCE_END_CODES)) + 1
+    normalized = bool(np.all(starts[1:] - ends[:-1] == 1) and np.all(codes[ends[:-1]] == 32))
+    return starts, ends, sentence_ends.tolist(), normalized
+
+
+def _sentence_ends(words, start=0):
+    """Word indices just past each word in `words[start:]` that ends a sentence."""
+    return [i + 1 for i in range(start, len(words)) if words[i].endswith(_SENTENCE_END)]
+
+
+class _ChunkBuilder:
+    """
+    The sentence-packing state machine behind `split_text`.
+
+    Works purely on word indices: sentences and chunks are (start, end) word
+    ranges and sizes are index differences, so nothing is re-split or
+    re-joined while packing. With `costs` (cumulative per-word sizes, e.g.
+    token counts, where `costs[i]` covers `words[:i]`) the same rules pack by
+    that size instead of by word count. `render(start, end)` is only used to
+    compare the final chunk with the previous one. Finished chunk ranges
+    collect in `pending` until drained, which lets `StreamingChunker` run the
+    same logic over text that is still arriving.
+    """
+
+    def __init__(self, max_words, overlap, render, costs=None):
+        self.max_words = max_words
+        self.overlap = overlap
+        self.render = render
+        self.costs = costs
+        self.pending = []
+        self.last_chunk = None
+        self.sentences = []   # (start, end, size) of each sentence in the current chunk
+        self.word_count = 0
+
+    def _emit(self, chunk):
+        self.pending.append(chunk)
+        self.last_chunk = chunk
+
+    def drain(self):
+        chunks, self.pending = self.pending, []
+        return chunks
+
+    def add(self, start, end):
+        """Add the complete sentence `words[start:end]`."""
+        word_count = end - start if self.costs is None else self.costs[end] - self.costs[start]
+
+        # SAFETY FALLBACK: For YouTube auto-captions without punctuation.
+        # If a single "sentence" is larger than our max limit, we MUST slice it by words.
+        if word_count > self.max_words:
+            self.start_long()
+            self.finish_long(self.slice_long(start, end), end)
+            return
+
+        # NORMAL FLOW: Add sentence to chunk if it fits
+        if self.word_count + word_count <= self.max_words:
+            self.sentences.append((start, end, word_count))
+            self.word_count += word_count
+            return
+
+        # Chunk is full! Save it.
+        sentences = self.sentences
+        if sentences:
+            self._emit((sentences[0][0], sentences[-1][1]))
+
+        # Create the overlap for the next chunk using FULL SENTENCES,
+        # working backwards through the current chunk
+        keep = len(sentences)
+        overlap_words = 0
+        while keep and overlap_words + sentences[keep - 1][2] <= self.overlap:
+            keep -= 1
+            overlap_words += sentences[keep][2]
+
+        # If a single sentence was larger than the overlap, just keep that last sentence
+        if keep == len(sentences) and sentences:
+            keep -= 1
+            overlap_words = sentences[keep][2]
+
+        # Start the new chunk with the overlap + the new sentence
+        self.sentences = sentences[keep:] + [(start, end, word_count)]
+        self.word_count = overlap_words + word_count
+
+    def start_long(self):
+        """Begin an over-long sentence: save any existing sentences we've collected."""
+        if self.sentences:
+            self._emit((self.sentences[0][0], self.sentences[-1][1]))
+            self.sentences = []
+            self.word_count = 0
+
+    def _slice_end(self, i, end):
+        # Last word index of a slice from `i`: as many words as fit, at least one
+        costs = self.costs
+        return max(i + 1, bisect_right(costs, costs[i] + self.max_words, i + 1, end + 1) - 1)
+
+    def _next_slice(self, i):
+        # Slices advance by `max - overlap` worth of words (at least one word)
+        costs = self.costs
+        return bisect_left(costs, costs[i] + self.max_words - self.overlap, i + 1)
+
+    def slice_long(self, i, end):
+        """
+        Emit the slices of an over-long sentence that lie fully before `end`.
+        Returns the start of the next slice.
+        """
+        if self.costs is None:
+            step = self.max_words - self.overlap
+            while i + self.max_words <= end:
+                self._emit((i, i + self.max_words))
+                i += step
+            return i
+
+        while self.costs[end] - self.costs[i] >= self.max_words:
+            self._emit((i, self._slice_end(i, end)))
+            i = self._next_slice(i)
+        return i
+
+    def finish_long(self, i, end):
+        """Emit the remaining slices of an over-long sentence ending at `end`."""
+        # Brutally slice the massive unpunctuated block to prevent token crashes
+        if self.costs is None:
+            step = self.max_words - self.overlap
+            while i < end:
+                self._emit((i, min(i + self.max_words, end)))
+                i += step
+        else:
+            while i < end:
+                self._emit((i, self._slice_end(i, end)))
+                i = self._next_slice(i)
+
+        # Set up the tail of the last slice as the start of the next potential chunk
+        if self.last_chunk is not None and self.overlap > 0:
+            last_start, last_end = self.last_chunk
+            if self.costs is None:
+                tail_start = max(last_start, last_end - self.overlap)
+                size = last_end - tail_start
+            else:
+                tail_start = bisect_left(self.costs, self.costs[last_end] - self.overlap, last_start, last_end)
+                size = self.costs[last_end] - self.costs[tail_start]
+            self.sentences = [(tail_start, last_end, size)]
+            self.word_count = size
+        else:
+            self.sentences = []
+            self.word_count = 0
+
+    def finish(self):
+        """Emit the final chunk if anything is leftover."""
+        if self.sentences:
+            final_chunk = (self.sentences[0][0], self.sentences[-1][1])
+            # Avoid appending a duplicate if the text ended perfectly on a chunk boundary
+            if self.last_chunk is None or self.render(*final_chunk) != self.render(*self.last_chunk):
+                self._emit(final_chunk)
+
+
+def _iter_chunk_ranges(sentence_ends, n_words, max_words, overlap, render, costs=None):
+    """Yield the (start, end) word ranges `split_text` packs from these sentences, as each is finished."""
+    builder = _ChunkBuilder(max_words, overlap, render, costs)
+    start = 0
+    for end in sentence_ends:
+        builder.add(start, end)
+        start = end
+        if builder.pending:
+            yield from builder.drain()
+    builder.add(start, n_words)
+    builder.finish()
+    yield from builder.drain()
+
+
+def _chunk_ranges(sentence_ends, n_words, max_words, overlap, render, costs=None):
+    return list(_iter_chunk_ranges(sentence_ends, n_words, max_words, overlap, render, costs))
+
+
+def _renderer(text, starts, ends, normalized):
+    """Chunk text for a word range: a slice of `text`, or re-joined words if its spacing is irregular."""
+    if normalized:
+        def render(start, end):
+            return text[starts[start]:ends[end - 1]]
+    else:
+        words = text.split()
+
+        def render(start, end):
+            return " ".join(words[start:end])
+    return render
+
 
 def split_text(text, max_words=200, overlap=40):
     """
     Intelligently chunks text by sentence boundaries to preserve context,
     while strictly respecting maximum word limits.
+
+    Words and sentence boundaries are indexed once; for whitespace-normalised
+    text each chunk is then a single slice of `text`. Otherwise words are
+    joined with single spaces, so whitespace runs inside a chunk collapse.
     """
     # Fallback for empty text
-    if not text or not text.strip():
+    if not text or text.isspace():
         return []
 
-    # 1. Split text into sentences using regex
-    # Looks for punctuation (. ! ?) followed by whitespace
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-    
-    chunks = []
-    current_chunk_sentences = []
-    current_word_count = 0
-    
-    for sentence in sentences:
-        words = sentence.split()
-        word_count = len(words)
-        
-        # SAFETY FALLBACK: For YouTube auto-captions without punctuation.
-        # If a single "sentence" is larger than our max limit, we MUST slice it by words.
-        if word_count > max_words:
-            # Save any existing sentences we've collected
-            if current_chunk_sentences:
-                chunks.append(" ".join(current_chunk_sentences))
-                current_chunk_sentences = []
-                current_word_count = 0
-            
-            # Brutally slice the massive unpunctuated block to prevent token crashes
-            i = 0
-            while i < word_count:
-                chunk_slice = words[i:i + max_words]
-                chunks.append(" ".join(chunk_slice))
-                i += max_words - overlap
-            
-            # Set up the last slice as the start of the next potential chunk
-            if chunks:
-                last_chunk_words = chunks[-1].split()
-                current_chunk_sentences = [" ".join(last_chunk_words[-overlap:])] if overlap > 0 else []
-                current_word_count = len(current_chunk_sentences[0].split()) if current_chunk_sentences else 0
-            continue
+    starts, ends, sentence_ends, normalized = _index_words(text)
+    render = _renderer(text, starts, ends, normalized)
+    ranges = _chunk_ranges(sentence_ends, len(starts), max_words, overlap, render)
+    return [render(start, end) for start, end in ranges]
 
-        # NORMAL FLOW: Add sentence to chunk if it fits
-        if current_word_count + word_count <= max_words:
-            current_chunk_sentences.append(sentence)
-            current_word_count += word_count
+
+class StreamingChunker:
+    """
+    Incremental `split_text`: feed text as it arrives and get back every chunk
+    that can no longer change.
+
+    Feeding a text in pieces and calling `finish()` yields exactly the chunks
+    `split_text` returns for the whole text (pieces are joined with a space).
+    Over-long unpunctuated stretches are sliced as soon as each slice is full,
+    so auto-caption style input streams too. Words are dropped once no chunk
+    can include them again, so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, max_words=200, overlap=40):
+        self._words = []
+        self._base = 0            # global index of self._words[0] once old words are dropped
+        self._builder = _ChunkBuilder(max_words, overlap, self._render)
+        self._sentence_start = 0  # global index of the first word of the unfinished sentence
+        self._slice_pos = None    # next slice start while that sentence is over-long
+
+    def feed(self, text):
+        """Add more text. Returns the list of chunks completed by it."""
+        first = len(self._words)
+        self._words.extend(text.split())
+        for end in _sentence_ends(self._words, first):
+            self._complete(end + self._base)
+        self._advance_long()
+        return self._drain()
+
+    def finish(self):
+        """Flush the remaining text. Returns the final chunks."""
+        end = self._base + len(self._words)
+        if end > self._sentence_start:
+            self._complete(end)
+        self._builder.finish()
+        return self._drain()
+
+    def _complete(self, end):
+        if self._slice_pos is None:
+            self._builder.add(self._sentence_start, end)
         else:
-            # Chunk is full! Save it.
-            if current_chunk_sentences:
-                chunks.append(" ".join(current_chunk_sentences))
-            
-            # Create the overlap for the next chunk using FULL SENTENCES
-            overlap_sentences = []
-            overlap_words = 0
-            
-            # Work backwards through the current chunk to grab sentences for overlap
-            for s in reversed(current_chunk_sentences):
-                s_words = len(s.split())
-                if overlap_words + s_words <= overlap:
-                    overlap_sentences.insert(0, s)
-                    overlap_words += s_words
-                else:
-                    break
-            
-            # If a single sentence was larger than the overlap, just keep that last sentence
-            if not overlap_sentences and current_chunk_sentences:
-                overlap_sentences = [current_chunk_sentences[-1]]
-                
-            # Start the new chunk with the overlap + the new sentence
-            current_chunk_sentences = overlap_sentences + [sentence]
-            current_word_count = sum(len(s.split()) for s in current_chunk_sentences)
-                
-    # Append the final chunk if anything is leftover
-    if current_chunk_sentences:
-        final_chunk = " ".join(current_chunk_sentences)
-        # Avoid appending a duplicate if the text ended perfectly on a chunk boundary
-        if not chunks or final_chunk != chunks[-1]:
-            chunks.append(final_chunk)
-            
-    return chunks
\ No newline at end of file
+            self._builder.finish_long(self._slice_pos, end)
+            self._slice_pos = None
+        self._sentence_start = end
+
+    def _advance_long(self):
+        builder = self._builder
+        end = self._base + len(self._words)
+        if end - self._sentence_start <= builder.max_words:
+            return
+        if self._slice_pos is None:
+            builder.start_long()
+            self._slice_pos = self._sentence_start
+        self._slice_pos = builder.slice_long(self._slice_pos, end)
+
+    def _render(self, start, end):
+        return " ".join(self._words[start - self._base:end - self._base])
+
+    def _drain(self):
+        builder = self._builder
+        chunks = [self._render(start, end) for start, end in builder.drain()]
+
+        # Keep only words a future chunk (or the duplicate check) can still refer to
+        keep_from = self._sentence_start
+        if builder.sentences:
+            keep_from = min(keep_from, builder.sentences[0][0])
+        if builder.last_chunk is not None:
+            keep_from = min(keep_from, builder.last_chunk[0])
+        if keep_from - self._base > 4096:
+            del self._words[:keep_from - self._base]
+            self._base = keep_from
+        return chunks
+
+
+def split_spans(text, max_words=200, overlap=40):
+    """
+    Same chunking as `split_text`, but returns `TextSpan` character ranges
+    into `text` instead of new strings.
+
+    Every chunk is a contiguous run of the text's words, so each one maps back
+    to a range of the original text. For whitespace-normalised text (e.g. a
+    `Transcript`) `str(span)` equals the chunk exactly.
+    """
+    return list(iter_chunks(text, max_words=max_words, overlap=overlap))
+
+
+def iter_chunks(source, max_words=200, overlap=40):
+    """
+    Lazily yield the chunks `split_text` would build, one at a time.
+
+    Args:
+        source: A text, or an iterable of text pieces or (start, end, text)
+            segments (e.g. a transcription stream), joined with single spaces
+        max_words: Maximum words per chunk
+        overlap: Sentence overlap between chunks, in words
+
+    Yields:
+        TextSpan: for a text source, character ranges into it (no chunk text
+        is copied until a consumer reads it)
+        str: for a piece/segment stream, chunk text as soon as it is final;
+        only the words a later chunk can still include are kept in memory
+    """
+    if isinstance(source, str):
+        if not source or source.isspace():
+            return
+        starts, ends, sentence_ends, normalized = _index_words(source)
+        render = _renderer(source, starts, ends, normalized)
+        for start, end in _iter_chunk_ranges(sentence_ends, len(starts), max_words, overlap, render):
+            yield TextSpan(source, int(starts[start]), int(ends[end - 1]))
+        return
+
+    chunker = StreamingChunker(max_words=max_words, overlap=overlap)
+    for piece in source:
+        yield from chunker.feed(piece if isinstance(piece, str) else piece[2])
+    yield from chunker.finish()
+
+
+def windows(items, size):
+    """Group an iterable into lists of at most `size` items, consuming it lazily."""
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _token_costs(text, starts, ends, tokenizer, words_per_piece=2048, pieces_per_batch=64):
+    """
+    Cumulative model-token counts per word: `costs[i]` is the number of tokens
+    in `words[:i]`.
+
+    The text is tokenized once with a fast tokenizer in word-aligned pieces
+    (batched, so the Rust backend parallelises them) and every token is
+    assigned to the word its character offset falls in.
+    """
+    n = len(starts)
+    piece_bounds = [(a, min(a + words_per_piece, n)) for a in range(0, n, words_per_piece)]
+    owners = []
+    for b in range(0, len(piece_bounds), pieces_per_batch):
+        batch = piece_bounds[b:b + pieces_per_batch]
+        encoded = tokenizer([text[starts[a]:ends[z - 1]] for a, z in batch],
+                            add_special_tokens=False, return_offsets_mapping=True)
+        for (a, _), offsets in zip(batch, encoded["offset_mapping"]):
+            offsets = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+            if not len(offsets):
+                continue
+            # A token belongs to the first word ending after its start, so byte-level
+            # tokens that begin on the preceding space ("Ġword") count for their word
+            char_starts = starts[a] + offsets[:, 0]
+            owners.append(np.minimum(np.searchsorted(ends, char_starts, side="right"), n - 1))
+    counts = np.bincount(np.concatenate(owners), minlength=n) if owners else np.zeros(n, dtype=np.int64)
+    return [0] + np.cumsum(counts).tolist()
+
+
+def split_spans_by_tokens(text, tokenizer, max_tokens, overlap_tokens=0):
+    """
+    Chunk like `split_spans`, but measure sentences in real model tokens.
+
+    Sentences are packed until the next one would push the chunk past
+    `max_tokens`, so chunks fill the model's context window instead of
+    stopping at a conservative word count. Over-long sentences are sliced at
+    word boundaries to at most `max_tokens` tokens (a single word longer than
+    that is kept whole).
+
+    Args:
+        text: Text to chunk
+        tokenizer: Hugging Face fast tokenizer (needs `return_offsets_mapping`)
+        max_tokens: Token budget per chunk, excluding special tokens and prompt prefixes
+        overlap_tokens: Token budget for the sentence overlap between chunks
+
+    Returns:
+        tuple: (list of TextSpan, list of token counts per chunk)
+    """
+    if not text or text.isspace():
+        return [], []
+
+    starts, ends, sentence_ends, normalized = _index_words(text)
+    costs = _token_costs(text, starts, ends, tokenizer)
+    render = _renderer(text, starts, ends, normalized)
+    ranges = _chunk_ranges(sentence_ends, len(starts), max_tokens, overlap_tokens, render, costs)
+    spans = [TextSpan(text, int(starts[start]), int(ends[end - 1])) for start, end in ranges]
+    return spans, [costs[end] - costs[start] for start, end in ranges]
@@ -0,0 +1,124 @@
+"""
+Near-duplicate chunk detection with MinHash and locality-sensitive hashing.
+
+Each chunk is reduced to a MinHash signature of its 5-word shingles (one
+vectorised NumPy pass), and signatures are bucketed by bands so a new chunk
+is only compared with earlier chunks that share a band. Intros, ads and
+repeated segments then cost one model call instead of one per repeat.
+
+The index is incremental, so chunks can be checked as a stream arrives.
+"""
+import zlib
+import numpy as np
+from config import DEDUPE_THRESHOLD, DEDUPE_NUM_PERM
+
+SHINGLE_WORDS = 5
+
+# Mersenne prime for the universal hashes; a * crc32 + b stays below 2**64
+_PRIME = (1 << 31) - 1
+
+
+def _lsh_rows(num_perm, threshold):
+    """
+    Most rows per band whose LSH cut-off, (1 / bands) ** (1 / rows), stays
+    below `threshold`: pairs at the threshold are very likely to share a
+    band, and signatures are compared exactly before anything is dropped.
+    """
+    divisors = [r for r in range(1, num_perm + 1) if num_perm % r == 0]
+    return max([r for r in divisors if (r / num_perm) ** (1 / r) <= threshold], default=1)
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index of texts.
+
+    `match(text)` returns the id of an earlier text whose estimated Jaccard
+    similarity is at least `threshold`, or adds `text` under the next id
+    (0, 1, ...) and returns None.
+    """
+
+    def __init__(self, threshold=None, num_perm=None):
+        self.threshold = DEDUPE_THRESHOLD if threshold is None else threshold
+        num_perm = num_perm or DEDUPE_NUM_PERM
+        # Fixed seed: signatures are comparable across runs and processes
+        rng = np.random.default_rng(0)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self.rows = _lsh_rows(num_perm, self.threshold)
+        self._bands = [{} for _ in range(num_perm // self.rows)]
+        self._signatures = []
+
+    def signature(self, text):
+        """MinHash signature of the lowercased word shingles of `text`."""
+        words = text.lower().split()
+        n = max(1, len(words) - SHINGLE_WORDS + 1)
+        hashes = np.unique(np.fromiter(
+            (zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode()) for i in range(n)),
+            dtype=np.uint64, count=n))
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def match(self, text):
+        signature = self.signature(text)
+        keys = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(len(self._bands))]
+        checked = set()
+        for band, key in zip(self._bands, keys):
+            for candidate in band.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                    return candidate
+
+        new_id = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(new_id)
+        return None
+
+
+def skip_duplicates(chunks, stats=None, threshold=None):
+    """
+    Yield the chunks that do not repeat an earlier one, lazily and in order.
+
+    Args:
+        chunks: Iterable of chunks (str or TextSpan)
+        stats: Optional dict whose "skipped" count is incremented per dropped chunk
+        threshold: Jaccard cut-off (default DEDUPE_THRESHOLD; 0 keeps every chunk)
+    """
+    threshold = DEDUPE_THRESHOLD if threshold is None else threshold
+    index = NearDuplicateIndex(threshold) if threshold else None
+    for chunk in chunks:
+        if index is None or index.match(str(chunk)) is None:
+            yield chunk
+        elif stats is not None:
+            stats["skipped"] += 1
+
+
+class DedupedChunks(list):
+    """
+    Representative chunks, one per group of near-duplicates, in first-seen
+    order (so they line up with vectors added to an index in the same
+    order). `positions[i]` lists every chunk in the transcript that item i
+    stands for, itself first.
+    """
+
+    def __init__(self, threshold=None):
+        super().__init__()
+        threshold = DEDUPE_THRESHOLD if threshold is None else threshold
+        self.positions = []
+        self._index = NearDuplicateIndex(threshold) if threshold else None
+
+    def add(self, chunk):
+        """Add `chunk`; True if it is a new representative, False if it joined an earlier one's positions."""
+        match = self._index.match(str(chunk)) if self._index is not None else None
+        if match is not None:
+            self.positions[match].append(chunk)
+            return False
+        self.append(chunk)
+        self.positions.append([chunk])
+        return True
+
+    @property
+    def skipped(self):
+        """Chunks folded into an earlier representative."""
+        return sum(len(p) - 1 for p in self.positions)
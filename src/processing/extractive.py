@@ -0,0 +1,130 @@
+"""
+Extractive pre-filter: keep the most central sentences of a long transcript
+so the abstractive pass reads fewer tokens.
+
+Sentences are embedded with the sentence-transformer used for RAG and scored
+in bulk with NumPy, either by cosine similarity to the transcript's mean
+embedding ("centrality") or by TextRank over the sentence-similarity graph.
+The top EXTRACTIVE_RATIO of sentences are kept in their original order.
+"""
+import time
+import numpy as np
+from src.processing.chunking import _index_words
+from config import EXTRACTIVE_RATIO, EXTRACTIVE_MIN_WORDS, EXTRACTIVE_METHOD
+
+# Unpunctuated stretches (e.g. auto-generated captions) are cut into pseudo-sentences of this many words
+MAX_SENTENCE_WORDS = 40
+
+_DAMPING = 0.85
+_TEXTRANK_ITERATIONS = 50
+
+
+def split_sentences(text):
+    """Sentences of `text` as (start, end) character ranges, none longer than MAX_SENTENCE_WORDS words."""
+    starts, ends, sentence_ends, _ = _index_words(text)
+    n_words = len(starts)
+    spans = []
+    first = 0
+    for last in sentence_ends + [n_words]:
+        for lo in range(first, last, MAX_SENTENCE_WORDS):
+            hi = min(lo + MAX_SENTENCE_WORDS, last)
+            spans.append((int(starts[lo]), int(ends[hi - 1])))
+        first = last
+    return spans
+
+
+def centrality_scores(embeddings):
+    """Cosine similarity of each (unit-normalised) embedding to their mean direction."""
+    centroid = embeddings.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return embeddings @ (centroid / norm) if norm else np.zeros(len(embeddings), dtype=embeddings.dtype)
+
+
+def textrank_scores(embeddings, damping=_DAMPING, iterations=_TEXTRANK_ITERATIONS):
+    """PageRank over the graph of non-negative cosine similarities between (unit-normalised) embeddings."""
+    n = len(embeddings)
+    weights = np.clip(embeddings @ embeddings.T, 0, None)
+    np.fill_diagonal(weights, 0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # Sentences similar to nothing spread their rank uniformly
+    transition = np.divide(weights, out_degree, out=np.full_like(weights, 1 / n), where=out_degree > 0)
+    scores = np.full(n, 1 / n, dtype=weights.dtype)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+SCORERS = {
+    "centrality": centrality_scores,
+    "textrank": textrank_scores,
+}
+
+
+def select_sentences(scores, word_counts, ratio):
+    """Indices, in order, of the highest-scoring sentences covering about `ratio` of the words."""
+    order = np.argsort(-scores, kind="stable")
+    covered = np.cumsum(np.asarray(word_counts)[order])
+    keep = int(np.searchsorted(covered, round(ratio * covered[-1]))) + 1
+    return np.sort(order[:keep])
+
+
+def prefilter(text, ratio=None, method=None, min_words=None):
+    """
+    Keep the most representative sentences of `text`.
+
+    Args:
+        text: Transcript text
+        ratio: Share of the words to keep (default EXTRACTIVE_RATIO; 1 = no filtering)
+        method: Key in SCORERS (default EXTRACTIVE_METHOD)
+        min_words: Shorter inputs are returned unchanged (default EXTRACTIVE_MIN_WORDS)
+
+    Returns:
+        tuple: (text of the kept sentences in their original order, stats
+        dict), or (text, None) when nothing was filtered
+    """
+    ratio = EXTRACTIVE_RATIO if ratio is None else ratio
+    method = method or EXTRACTIVE_METHOD
+    min_words = EXTRACTIVE_MIN_WORDS if min_words is None else min_words
+    if method not in SCORERS:
+        raise ValueError(f"Unknown extractive method '{method}'. Choose from: {', '.join(SCORERS)}")
+    if not 0 < ratio < 1:
+        return text, None
+    start_time = time.time()
+    spans = split_sentences(text)
+    sentences = [text[start:end] for start, end in spans]
+    word_counts = [len(s.split()) for s in sentences]
+    total_words = sum(word_counts)
+    if total_words < min_words or len(sentences) < 2:
+        return text, None
+
+    from src.retrieval.rag import get_embedding_model
+    embeddings = get_embedding_model().encode(sentences, convert_to_numpy=True, normalize_embeddings=True,
+                                              show_progress_bar=False)
+    kept = select_sentences(SCORERS[method](embeddings), word_counts, ratio)
+    kept_words = sum(word_counts[i] for i in kept)
+    return " ".join(sentences[i] for i in kept), {
+        "extractive_method": method,
+        "extractive_sentences_kept": len(kept),
+        "extractive_sentences_total": len(sentences),
+        "extractive_kept_ratio": kept_words / total_words,
+        "extractive_dropped_ratio": 1 - kept_words / total_words,
+        "extractive_time": time.time() - start_time,
+    }
+
+
+def add_savings(metrics, stats):
+    """
+    Merge prefilter `stats` into summary `metrics`, with the estimated time
+    saved: the dropped words at the observed per-word summarization rate,
+    less the time spent filtering.
+    """
+    if not stats:
+        return metrics
+    summarize_time = max(0.0, metrics["processing_time"] - stats["extractive_time"])
+    metrics.update(stats)
+    metrics["extractive_time_saved"] = (summarize_time * stats["extractive_dropped_ratio"]
+                                        / stats["extractive_kept_ratio"] - stats["extractive_time"])
+    return metrics
@@ -0,0 +1,116 @@
+"""
+Pick a summarization model and decoding profile that fits a latency budget.
+
+Routes are listed best quality first. For a request with `words` of input,
+each route's time is predicted as words x its seconds-per-word cost; the
+first route predicted to finish within the budget wins, and when none does
+the fastest one is used. Costs start from rough CPU priors and are replaced
+by a moving average of what completed requests actually took on this host.
+
+    route = choose_route(len(text.split()), slo_tier="interactive")
+    summary, metrics = summarize_text(text, model_name=route["model_name"],
+                                      generation_kwargs=route["generation_kwargs"], return_metrics=True)
+    record_route(route, metrics)
+"""
+from src.cache import DiskCache
+from config import SUMMARY_LATENCY_BUDGET, SLO_TIERS, ROUTER_STATS_DIR
+
+# Seconds per input word are CPU priors for a 4-core host, used until a route has been measured
+ROUTES = [
+    {"name": "bart-large-cnn/beam", "model_name": "bart-large-cnn", "generation_kwargs": {}, "prior": 0.010},
+    {"name": "bart-large-cnn/greedy", "model_name": "bart-large-cnn", "generation_kwargs": {"num_beams": 1},
+     "prior": 0.004},
+    {"name": "distilbart-cnn/beam", "model_name": "distilbart-cnn", "generation_kwargs": {}, "prior": 0.006},
+    {"name": "distilbart-cnn/greedy", "model_name": "distilbart-cnn", "generation_kwargs": {"num_beams": 1},
+     "prior": 0.0025},
+    {"name": "t5-base/greedy", "model_name": "t5-base", "generation_kwargs": {"num_beams": 1}, "prior": 0.002},
+    {"name": "distilbart-cnn/greedy-short", "model_name": "distilbart-cnn",
+     "generation_kwargs": {"num_beams": 1, "max_length": 80}, "prior": 0.0015},
+]
+
+# Average speaking rate, for routing audio before its transcript exists
+SPEECH_WORDS_PER_SECOND = 2.5
+
+# Weight of the newest measurement in a route's moving-average cost
+_SMOOTHING = 0.3
+
+_stats = None
+
+
+def _get_stats():
+    global _stats
+    if _stats is None:
+        _stats = DiskCache(ROUTER_STATS_DIR, 0)
+    return _stats
+
+
+def route_cost(route):
+    """Seconds per input word for `route`: measured on this host if available, else the prior."""
+    entry = _get_stats().get(f"route:{route['name']}")
+    return entry["seconds_per_word"] if entry else route["prior"]
+
+
+def resolve_budget(latency_budget=None, slo_tier=None):
+    """Budget in seconds from an explicit value, an SLO tier name, or SUMMARY_LATENCY_BUDGET (None = unbounded)."""
+    if latency_budget is None and slo_tier is not None:
+        if slo_tier not in SLO_TIERS:
+            raise ValueError(f"Unknown SLO tier '{slo_tier}'. Choose from: {', '.join(SLO_TIERS)}")
+        latency_budget = SLO_TIERS[slo_tier]
+    if latency_budget is None:
+        latency_budget = SUMMARY_LATENCY_BUDGET
+    return latency_budget or None
+
+
+def choose_route(words, latency_budget=None, slo_tier=None):
+    """
+    Choose the best route predicted to summarize `words` within the budget.
+
+    Returns:
+        dict: {"route", "model_name", "generation_kwargs", "predicted_time", "latency_budget"}
+    """
+    budget = resolve_budget(latency_budget, slo_tier)
+    predictions = [(route, route_cost(route) * words) for route in ROUTES]
+    if budget is None:
+        chosen, predicted = predictions[0]
+    else:
+        fitting = [p for p in predictions if p[1] <= budget]
+        chosen, predicted = fitting[0] if fitting else min(predictions, key=lambda p: p[1])
+    return {
+        "route": chosen["name"],
+        "model_name": chosen["model_name"],
+        "generation_kwargs": dict(chosen["generation_kwargs"]),
+        "predicted_time": predicted,
+        "latency_budget": budget,
+    }
+
+
+def record_route(choice, metrics, learn=True):
+    """
+    Add the route and predicted vs. actual time to `metrics`, and fold the
+    actual cost into the route's moving average.
+
+    Runs answered partly from the summary cache, or that included loading
+    the model (`learn=False`), are reported but not learned from.
+    """
+    # Streamed runs also wait on transcription; only summarization is what the route predicts
+    actual = metrics.get("summarize_time", metrics["processing_time"])
+    budget = choice["latency_budget"]
+    metrics.update({
+        "route": choice["route"],
+        "latency_budget": budget,
+        "predicted_time": choice["predicted_time"],
+        "actual_time": actual,
+        "within_budget": actual <= budget if budget else None,
+    })
+
+    words = metrics.get("original_words") or 0
+    if not learn or not words or metrics.get("summary_cache_hits"):
+        return metrics
+    stats = _get_stats()
+    key = f"route:{choice['route']}"
+    entry = stats.get(key)
+    measured = actual / words
+    if entry:
+        measured = (1 - _SMOOTHING) * entry["seconds_per_word"] + _SMOOTHING * measured
+    stats.set(key, {"seconds_per_word": measured, "samples": (entry["samples"] if entry else 0) + 1})
+    return metrics
@@ -1,30 +1,55 @@
-from transformers import pipeline
-from src.processing.chunking import split_text
-from config import DEVICE
+import threading
+from collections import deque
+from src.processing.chunking import split_text, iter_chunks, split_spans_by_tokens, windows
+from src.model_registry import registry, available_memory_bytes, worker_pool
+from src import model_host
+from src.processing import summary_cache
+from src.processing.extractive import prefilter, add_savings
+from src.processing.dedupe import skip_duplicates
+from src.processing.summary_engines import summarizer_engine, load_summarizer
+from config import (DEVICE, CHUNK_PACKING, TOKEN_PACK_FILL, BART_MAX_INPUT_TOKENS, T5_MAX_INPUT_TOKENS, CHUNK_WINDOW,
+                    SUMMARY_BATCH_SIZE, SUMMARY_MAX_BATCH_SIZE, SUMMARIZE_WORKERS)
 import time
 
-_summarizers = {}
+MODEL_MAP = {
+    "bart-large-cnn": "facebook/bart-large-cnn",
+    "distilbart-cnn": "sshleifer/distilbart-cnn-12-6",
+    "t5-base": "t5-base",
+}
+
+MAX_INPUT_TOKENS = {
+    "bart-large-cnn": BART_MAX_INPUT_TOKENS,
+    "distilbart-cnn": BART_MAX_INPUT_TOKENS,
+    "t5-base": T5_MAX_INPUT_TOKENS,
+}
+
+def _load_summarizer(model_name, engine):
+    full_model_name = MODEL_MAP.get(model_name, model_name)
+    print(f"Loading model: {full_model_name} ({engine})...")
+
+    device_id = -1 if DEVICE.lower() == "cpu" else 0
+    summarizer = load_summarizer(engine, full_model_name, device_id)
+    print(f"Model {model_name} loaded successfully on device {device_id}")
+    return summarizer
 
 def get_summarizer(model_name="bart-large-cnn"):
-    """Get or create summarizer with caching"""
-    if model_name not in _summarizers:
-        model_map = {
-            "bart-large-cnn": "facebook/bart-large-cnn",
-            "t5-base": "t5-base",
-        }
-        
-        full_model_name = model_map.get(model_name, model_name)
-        print(f"Loading model: {full_model_name}...")
-        
-        
-        device_id = -1 if DEVICE.lower() == "cpu" else 0
-        _summarizers[model_name] = pipeline(
-            "summarization",
-            model=full_model_name,
-            device=device_id
-        )
-        print(f"Model {model_name} loaded successfully on device {device_id}")
-    return _summarizers[model_name]
+    """
+    Get or create summarizer (on the engine configured for the model) through the shared model registry,
+    or a client of the shared model host when MODEL_HOST is set
+    """
+    if model_host.use_model_host():
+        return model_host.remote_summarizer(model_name)
+    engine = summarizer_engine(model_name)
+    key = f"summarizer:{model_name}:{engine}"
+    if not registry.is_registered(key):
+        registry.register(key, lambda: _load_summarizer(model_name, engine))
+    return registry.get(key)
+
+def is_summarizer_loaded(model_name):
+    """Whether `get_summarizer(model_name)` would return without loading a model"""
+    if model_host.use_model_host():
+        return model_host.request("summarizer_loaded", model_name)
+    return registry.is_loaded(f"summarizer:{model_name}:{summarizer_engine(model_name)}")
 
 # Detail configs balanced for token limits (BART: 1024 tokens = ~750 words max)
 DETAIL_CONFIGS = {
@@ -39,6 +64,11 @@ DETAIL_CONFIGS = {
         "detailed": {"chunk_size": 120, "chunk_overlap": 30, "chunk_max_length": 150, "chunk_min_length": 80, "second_level_threshold": 9999}
     }
 }
+# DistilBART shares BART's tokenizer and 1024-token window
+DETAIL_CONFIGS["distilbart-cnn"] = DETAIL_CONFIGS["bart-large-cnn"]
+
+# Finest first: in multi-level mode each level is reduced from the one before it
+DETAIL_LEVELS = ("detailed", "medium", "brief")
 
 def cleanup_summary(text):
     """Smooths out stitched text into a cohesive essay."""
@@ -48,38 +78,296 @@ def cleanup_summary(text):
     if not sentences: return text
     return ". ".join(sentences) + "."
 
-def summarize_chunks(chunks, summarizer, max_length, min_length, model_name):
-    summaries = []
+def _input_overhead(summarizer):
+    """Tokens the pipeline adds to every input: special tokens plus any task prefix (T5's "summarize: ")."""
+    prefix = getattr(summarizer.model.config, "prefix", None) or ""
+    tokenizer = summarizer.tokenizer
+    return len(tokenizer(prefix + "x")["input_ids"]) - len(tokenizer("x", add_special_tokens=False)["input_ids"])
+
+def pack_chunks(text, summarizer, model_name, max_words, overlap, packing=None):
+    """
+    Chunk `text` for the summarizer.
+
+    "words" packing uses `max_words`/`overlap` as given. "tokens" packing
+    measures sentences with the summarizer's own tokenizer and fills each
+    chunk to TOKEN_PACK_FILL of the model's input window, so fewer, fuller
+    chunks are summarized and none is truncated by the model.
+
+    Returns:
+        tuple: (TextSpan chunks, fill ratio). Word-packed chunks are a lazy
+        iterator; the fill ratio is the mean share of the input window each
+        chunk uses ("tokens" only, else None)
+
+    `packing` defaults to CHUNK_PACKING.
+    """
+    if (packing or CHUNK_PACKING) != "tokens":
+        return iter_chunks(text, max_words=max_words, overlap=overlap), None
+
+    limit = MAX_INPUT_TOKENS.get(model_name) or summarizer.tokenizer.model_max_length
+    overhead = _input_overhead(summarizer)
+    # One token of slack: a chunk's first word can encode one token longer without its leading space
+    budget = min(int(limit * TOKEN_PACK_FILL), limit) - overhead - 1
+    chunks, token_counts = split_spans_by_tokens(text, summarizer.tokenizer, budget, int(overlap * 1.3))
+    if not chunks:
+        return chunks, 0.0
+    return chunks, sum(n + overhead for n in token_counts) / (len(chunks) * limit)
+
+def _second_level_chunks(combined, summarizer, model_name):
+    if CHUNK_PACKING == "tokens":
+        return pack_chunks(combined, summarizer, model_name, max_words=400, overlap=50)[0]
+    return split_text(combined, max_words=400, overlap=50)
+
+# Processes generating at once on this machine (set in summarization pool workers)
+_ram_share = 1
+
+def _config_int(config, names, default):
+    for name in names:
+        value = getattr(config, name, None)
+        if isinstance(value, int) and value > 0:
+            return value
+    return default
+
+def _generation_bytes(summarizer, input_tokens, num_beams=None):
+    """
+    Rough peak memory of generating one summary: the cross-attention keys and
+    values cached for every beam and decoder layer, plus one layer's encoder
+    attention scores. Defaults are BART-large's.
+    """
+    config = getattr(getattr(summarizer, "model", None), "config", None)
+    d_model = _config_int(config, ("d_model",), 1024)
+    layers = _config_int(config, ("decoder_layers", "num_decoder_layers"), 12)
+    heads = _config_int(config, ("encoder_attention_heads", "num_heads"), 16)
+    beams = num_beams or _config_int(config, ("num_beams",), 4)
+    cross_cache = beams * layers * 2 * input_tokens * d_model * 4
+    attention = 2 * heads * input_tokens * input_tokens * 4
+    return cross_cache + attention
+
+def summary_batch_size(summarizer, input_tokens, num_beams=None):
+    """
+    Chunks to summarize per generate() call.
+
+    SUMMARY_BATCH_SIZE when set; otherwise as many `input_tokens`-long inputs
+    as fit in half the available RAM, between 1 and SUMMARY_MAX_BATCH_SIZE
+    (1 where available RAM cannot be read). `num_beams` overrides the
+    model's default beam count.
+    """
+    if SUMMARY_BATCH_SIZE > 0:
+        return SUMMARY_BATCH_SIZE
+    # Pool workers generate side by side, so each sizes its batches from its share of the RAM
+    available = available_memory_bytes() // _ram_share
+    if not available:
+        return 1
+    fits = int(available * 0.5 // _generation_bytes(summarizer, max(1, input_tokens), num_beams))
+    return max(1, min(SUMMARY_MAX_BATCH_SIZE, fits))
+
+def _decoding_settings(summarizer, generation_kwargs=None):
+    """Decoding settings from the model's generation config plus per-call overrides (part of the cache key)."""
+    config = getattr(getattr(summarizer, "model", None), "generation_config", None)
+    settings = {"do_sample": False}
+    for name in ("num_beams", "length_penalty", "no_repeat_ngram_size", "early_stopping", "repetition_penalty"):
+        value = getattr(config, name, None)
+        if isinstance(value, (bool, int, float, str)):
+            settings[name] = value
+    settings.update(generation_kwargs or {})
+    return settings
+
+def summarize_chunks(chunks, summarizer, max_length, min_length, model_name, batch_size=None, cache_stats=None,
+                     generation_kwargs=None):
+    """
+    Summarize each chunk of at least 20 words, in batches.
+
+    Chunks already in the summary cache (same text, model, effective
+    max/min length and decoding settings) are not regenerated. The rest are
+    bucketed by their length limits (which depend on chunk length) and
+    sorted by length inside each bucket, so every batch shares one
+    max_length/min_length and pads little. Summaries come back in chunk order.
+
+    `batch_size` defaults to `summary_batch_size` for the longest uncached
+    chunk. Cache hits and misses are added to `cache_stats` ("hits"/"misses")
+    when given. `generation_kwargs` (e.g. {"num_beams": 1}) are passed to
+    every generate() call; a "max_length" among them caps each chunk's limit.
+    """
+    generation_kwargs = dict(generation_kwargs or {})
+    max_length = min(max_length, generation_kwargs.pop("max_length", max_length))
+    jobs = []
     for chunk in chunks:
+        chunk = str(chunk)  # TextSpan chunks are materialised one window at a time
         chunk_words = len(chunk.split())
         if chunk_words < 20: continue
             
         estimated_tokens = int(chunk_words * 1.3)
         safe_max = min(max_length, max(30, estimated_tokens - 5))
         safe_min = min(min_length, max(10, safe_max - 20))
-            
-        result = summarizer(chunk, max_length=safe_max, min_length=safe_min, do_sample=False)
-        summaries.append(result[0]["summary_text"])
+        jobs.append((safe_max, safe_min, chunk_words, len(jobs), chunk))
+
+    summaries = [None] * len(jobs)
+    cache = summary_cache.get_summary_cache()
+    keys = {}
+    if cache is not None and jobs:
+        # Quantized engines generate slightly different text, so they are cached separately
+        model_id = f"{MODEL_MAP.get(model_name, model_name)}:{summarizer_engine(model_name)}"
+        decoding = _decoding_settings(summarizer, generation_kwargs)
+        pending = []
+        for job in jobs:
+            key = summary_cache.summary_key(job[4], model_id, job[0], job[1], decoding)
+            summaries[job[3]] = summary_cache.get_summary(key)
+            if summaries[job[3]] is None:
+                keys[job[3]] = key
+                pending.append(job)
+        if cache_stats is not None:
+            cache_stats["hits"] += len(jobs) - len(pending)
+            cache_stats["misses"] += len(pending)
+        jobs = pending
+
+    if not jobs:
+        return summaries
+    if batch_size is None:
+        batch_size = summary_batch_size(summarizer, int(max(job[2] for job in jobs) * 1.3),
+                                        num_beams=generation_kwargs.get("num_beams"))
+
+    jobs.sort()
+    start = 0
+    while start < len(jobs):
+        safe_max, safe_min = jobs[start][:2]
+        end = start + 1
+        while end < len(jobs) and end - start < batch_size and jobs[end][:2] == (safe_max, safe_min):
+            end += 1
+        batch = jobs[start:end]
+        if len(batch) == 1:
+            results = summarizer(batch[0][4], max_length=safe_max, min_length=safe_min, do_sample=False,
+                                 **generation_kwargs)
+        else:
+            results = summarizer([job[4] for job in batch], max_length=safe_max, min_length=safe_min,
+                                 do_sample=False, batch_size=len(batch), **generation_kwargs)
+        for job, result in zip(batch, results):
+            summaries[job[3]] = result["summary_text"]
+            if job[3] in keys:
+                summary_cache.put_summary(keys[job[3]], result["summary_text"])
+        start = end
     return summaries
 
-def summarize_text(text, detail_level="medium", model_name="bart-large-cnn", return_metrics=False):
-    start_time = time.time()
-    summarizer = get_summarizer(model_name)
-    
-    config = DETAIL_CONFIGS.get(model_name, DETAIL_CONFIGS["bart-large-cnn"])[detail_level]
-    original_words = len(text.split())
-    
-    # LEVEL 1: Linear Chunking
-    chunks = split_text(text, max_words=config["chunk_size"], overlap=config["chunk_overlap"])
-    num_chunks = len(chunks)
+def _init_worker(ram_share):
+    # Workers size their batches from their share of the free RAM
+    global _ram_share
+    _ram_share = ram_share
+
+def _summarize_task(args):
+    model_name, chunks, max_length, min_length, generation_kwargs = args
+    cache_stats = {"hits": 0, "misses": 0}
+    summaries = summarize_chunks(chunks, get_summarizer(model_name), max_length, min_length, model_name,
+                                 cache_stats=cache_stats, generation_kwargs=generation_kwargs)
+    return summaries, cache_stats
+
+_pool = None
+_pool_lock = threading.Lock()
 
-    level1_summaries = summarize_chunks(
-        chunks, summarizer,
-        max_length=config["chunk_max_length"],
-        min_length=config["chunk_min_length"],
-        model_name=model_name
-    )
+def get_summary_pool():
+    """
+    Shared process pool for map-reduce summarization, or None when
+    SUMMARIZE_WORKERS <= 1. Workers load their own summarizer on first use
+    and keep it for later requests.
+    """
+    global _pool
+    if SUMMARIZE_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = worker_pool(SUMMARIZE_WORKERS, initializer=_init_worker, initargs=(SUMMARIZE_WORKERS,))
+        return _pool
 
+def _ordered_map(pool, fn, tasks, max_pending):
+    """`pool.map` that submits lazily, keeping at most `max_pending` tasks in flight."""
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def iter_map_summaries(chunks, summarizer, model_name, max_length, min_length, window=CHUNK_WINDOW,
+                       cache_stats=None, generation_kwargs=None):
+    """
+    Summarize chunks from any iterable, in order, `window` chunks at a time.
+
+    With SUMMARIZE_WORKERS > 1 each window is split across the summary pool
+    and the next window is submitted while the current one runs; otherwise
+    windows are summarized in this process with `summarizer`. Summary cache
+    hits and misses from every process are added to `cache_stats`.
+    `generation_kwargs` are passed on to `summarize_chunks`.
+
+    Yields:
+        tuple: (chunks consumed, their summaries) as each batch finishes,
+        in chunk order. Chunks under 20 words have no summary.
+    """
+    pool = get_summary_pool()
+    if pool is None:
+        for batch in windows(chunks, window):
+            yield len(batch), summarize_chunks(batch, summarizer, max_length, min_length, model_name,
+                                               cache_stats=cache_stats, generation_kwargs=generation_kwargs)
+        return
+
+    sizes = deque()
+
+    def tasks():
+        per_task = max(1, -(-window // SUMMARIZE_WORKERS))
+        for batch in windows(chunks, per_task):
+            sizes.append(len(batch))
+            yield model_name, [str(chunk) for chunk in batch], max_length, min_length, generation_kwargs
+
+    for result, task_stats in _ordered_map(pool, _summarize_task, tasks(), max_pending=2 * SUMMARIZE_WORKERS):
+        if cache_stats is not None:
+            for name in ("hits", "misses"):
+                cache_stats[name] += task_stats[name]
+        yield sizes.popleft(), result
+
+def map_summaries(chunks, summarizer, model_name, max_length, min_length, window=CHUNK_WINDOW, cache_stats=None,
+                  generation_kwargs=None):
+    """
+    `iter_map_summaries`, collected.
+
+    Returns:
+        tuple: (list of chunk summaries, number of chunks consumed)
+    """
+    summaries = []
+    num_chunks = 0
+    for consumed, batch in iter_map_summaries(chunks, summarizer, model_name, max_length, min_length,
+                                              window=window, cache_stats=cache_stats,
+                                              generation_kwargs=generation_kwargs):
+        num_chunks += consumed
+        summaries.extend(batch)
+    return summaries, num_chunks
+
+def reduce_tree(text, summarizer, model_name, token_limit, max_length, min_length, cache_stats=None,
+                generation_kwargs=None):
+    """
+    Summarize `text` level by level until it fits `token_limit` (estimated
+    at 1.3 tokens per word).
+
+    Each level re-chunks the previous level's output and summarizes the
+    chunks through `map_summaries`, so levels run in parallel on the summary
+    pool. Should a level stop shrinking the text, it is cut to the limit so
+    the caller's final pass always runs.
+    """
+    words = len(text.split())
+    while int(words * 1.3) > token_limit:
+        level = map_summaries(_second_level_chunks(text, summarizer, model_name), summarizer, model_name,
+                              max_length, min_length, cache_stats=cache_stats,
+                              generation_kwargs=generation_kwargs)[0]
+        reduced = " ".join(level)
+        reduced_words = len(reduced.split())
+        if not reduced_words or reduced_words >= words:
+            return " ".join(text.split()[:int(token_limit / 1.3)])
+        text, words = reduced, reduced_words
+    return text
+
+def reduce_summaries(level1_summaries, summarizer, config, detail_level, model_name, cache_stats=None,
+                     generation_kwargs=None):
+    """Combine level-1 chunk summaries into the final summary for `detail_level`."""
     combined_linear = " ".join(level1_summaries)
     combined_words = len(combined_linear.split())
 
@@ -89,41 +377,289 @@ def summarize_text(text, detail_level="medium", model_name="bart-large-cnn", ret
         
     elif detail_level == "medium":
         if combined_words > config["second_level_threshold"]:
-            second_chunks = split_text(combined_linear, max_words=400, overlap=50)
-            level2 = summarize_chunks(second_chunks, summarizer, max_length=150, min_length=60, model_name=model_name)
+            second_chunks = _second_level_chunks(combined_linear, summarizer, model_name)
+            level2, _ = map_summaries(second_chunks, summarizer, model_name, max_length=150, min_length=60,
+                                       cache_stats=cache_stats, generation_kwargs=generation_kwargs)
             summary = cleanup_summary(" ".join(level2))
         else:
             summary = cleanup_summary(combined_linear)
             
     else:
-        # Brief
+        # Brief: reduce level by level until one pass can summarize the whole
+        token_limit = 1000 if "bart" in model_name.lower() else 450
         if combined_words > config["second_level_threshold"]:
-            second_chunks = split_text(combined_linear, max_words=400, overlap=50)
-            level2 = summarize_chunks(second_chunks, summarizer, max_length=100, min_length=40, model_name=model_name)
+            second_chunks = _second_level_chunks(combined_linear, summarizer, model_name)
+            level2, _ = map_summaries(second_chunks, summarizer, model_name, max_length=100, min_length=40,
+                                       cache_stats=cache_stats, generation_kwargs=generation_kwargs)
             combined_linear = " ".join(level2)
-            
+        combined_linear = reduce_tree(combined_linear, summarizer, model_name, token_limit,
+                                      max_length=100, min_length=40, cache_stats=cache_stats,
+                                      generation_kwargs=generation_kwargs)
+
         estimated_tokens = int(len(combined_linear.split()) * 1.3)
-        token_limit = 1000 if "bart" in model_name.lower() else 450
-        
-        if estimated_tokens > token_limit:
-            summary = cleanup_summary(combined_linear)
-        else:
-            safe_max = min(200 if "bart" in model_name else 120, max(30, estimated_tokens - 10))
-            safe_min = min(80 if "bart" in model_name else 50, max(10, safe_max - 20))
-            final_result = summarizer(combined_linear, max_length=safe_max, min_length=safe_min, do_sample=False)
-            summary = cleanup_summary(final_result[0]["summary_text"])
-    
+        safe_max = min(200 if "bart" in model_name else 120, max(30, estimated_tokens - 10))
+        safe_min = min(80 if "bart" in model_name else 50, max(10, safe_max - 20))
+        generation_kwargs = dict(generation_kwargs or {})
+        safe_max = min(safe_max, generation_kwargs.pop("max_length", safe_max))
+        safe_min = min(safe_min, max(10, safe_max - 20))
+        final_result = summarizer(combined_linear, max_length=safe_max, min_length=safe_min, do_sample=False,
+                                  **generation_kwargs)
+        summary = cleanup_summary(final_result[0]["summary_text"])
+
+    return summary
+
+def _summary_metrics(summary, model_name, detail_level, original_words, original_chars, start_time, num_chunks,
+                     chunk_packing="words", token_fill_ratio=None, cache_stats=None, dedupe_stats=None):
     summary_words = len(summary.split())
-    metrics = {
+    return {
         "model": model_name,
         "detail_level": detail_level,
         "original_words": original_words,
-        "original_chars": len(text),
+        "original_chars": original_chars,
         "summary_words": summary_words,
         "summary_chars": len(summary),
         "compression_ratio": (1 - summary_words / original_words) * 100 if original_words > 0 else 0,
         "processing_time": time.time() - start_time,
-        "num_chunks": num_chunks
+        "num_chunks": num_chunks,
+        "chunk_packing": chunk_packing,
+        "token_fill_ratio": token_fill_ratio,
+        "summary_cache_hits": cache_stats["hits"] if cache_stats else 0,
+        "summary_cache_misses": cache_stats["misses"] if cache_stats else 0,
+        "duplicate_chunks_skipped": dedupe_stats["skipped"] if dedupe_stats else 0,
     }
+
+def _summary_events(chunks, summarizer, config, detail_level, model_name, window, total=None, cache_stats=None,
+                    generation_kwargs=None):
+    """
+    Summarize `chunks` for `detail_level`, yielding progress as it goes.
+
+    Yields one "chunk" event per finished batch of level-1 summaries, one
+    "reduce" event when reduction starts, and finally
+    {"stage": "final", "summary": str, "num_chunks": int}. ETAs extrapolate
+    the level-1 rate over the remaining chunks and need `total`.
+    """
+    level1_start = time.time()
+    level1_summaries = []
+    done = 0
+    for consumed, summaries in iter_map_summaries(chunks, summarizer, model_name, config["chunk_max_length"],
+                                                  config["chunk_min_length"], window=window, cache_stats=cache_stats,
+                                                  generation_kwargs=generation_kwargs):
+        done += consumed
+        level1_summaries.extend(summaries)
+        elapsed = time.time() - level1_start
+        yield {
+            "stage": "chunk",
+            "summaries": summaries,
+            "chunks_done": done,
+            "chunks_total": total,
+            "elapsed": elapsed,
+            "eta": elapsed / done * (total - done) if total and done else None,
+        }
+
+    yield {"stage": "reduce", "chunks_done": done, "chunks_total": done, "elapsed": time.time() - level1_start,
+           "eta": None}
+    summary = reduce_summaries(level1_summaries, summarizer, config, detail_level, model_name, cache_stats=cache_stats,
+                               generation_kwargs=generation_kwargs)
+    yield {"stage": "final", "summary": summary, "num_chunks": done}
+
+def summarize_all_levels(text, model_name="bart-large-cnn", return_metrics=False, generation_kwargs=None,
+                         extractive_ratio=None):
+    """
+    Summarize `text` at every detail level from one shared level-1 pass.
+
+    The transcript is chunked and summarized once with the "detailed"
+    config; "medium" is a second-level reduction of those chunk summaries
+    and "brief" is reduced from "medium". Only the reductions run per
+    level, over text already a fraction of the transcript's length, so all
+    three cost little more than "detailed" alone.
+
+    Returns:
+        dict or (dict, dict): {level: summary}, plus {level: metrics} if
+        requested. A level's processing_time and cache counts cover
+        everything it was derived from, and `derived_from` names its input.
+    """
+    start_time = time.time()
+    summarizer = get_summarizer(model_name)
+
+    configs = DETAIL_CONFIGS.get(model_name, DETAIL_CONFIGS["bart-large-cnn"])
+    original_words, original_chars = len(text.split()), len(text)
+    text, extractive_stats = prefilter(text, extractive_ratio)
+    cache_stats = {"hits": 0, "misses": 0}
+    dedupe_stats = {"skipped": 0}
+    finest = configs["detailed"]
+    chunks, fill_ratio = pack_chunks(text, summarizer, model_name, finest["chunk_size"], finest["chunk_overlap"])
+    level1_summaries, num_chunks = map_summaries(skip_duplicates(chunks, dedupe_stats), summarizer, model_name,
+                                                 finest["chunk_max_length"], finest["chunk_min_length"],
+                                                 cache_stats=cache_stats,
+                                                 generation_kwargs=generation_kwargs)
+
+    summaries, metrics = {}, {}
+
+    def finish(level, summary, derived_from):
+        summaries[level] = summary
+        metrics[level] = add_savings(_summary_metrics(summary, model_name, level, original_words, original_chars,
+                                                      start_time, num_chunks, chunk_packing=CHUNK_PACKING,
+                                                      token_fill_ratio=fill_ratio, cache_stats=cache_stats,
+                                                      dedupe_stats=dedupe_stats),
+                                     extractive_stats)
+        metrics[level]["derived_from"] = derived_from
+
+    finish("detailed", reduce_summaries(level1_summaries, summarizer, finest, "detailed", model_name), "level1")
+    # Always take medium's second-level pass: the detailed chunk summaries are what it compresses
+    medium = reduce_summaries(level1_summaries, summarizer, dict(configs["medium"], second_level_threshold=0),
+                              "medium", model_name, cache_stats=cache_stats, generation_kwargs=generation_kwargs)
+    finish("medium", medium or summaries["detailed"], "detailed")
+    finish("brief", reduce_summaries([summaries["medium"]], summarizer, configs["brief"], "brief", model_name,
+                                     cache_stats=cache_stats, generation_kwargs=generation_kwargs), "medium")
+
+    return (summaries, metrics) if return_metrics else summaries
+
+def summarize_text(text, detail_level="medium", model_name="bart-large-cnn", return_metrics=False,
+                   generation_kwargs=None, extractive_ratio=None):
+    """
+    Summarize `text` at `detail_level` ("brief", "medium", "detailed", or
+    "all" for every level from one shared pass; see `summarize_all_levels`).
+    Long inputs are first cut to their most central sentences when
+    `extractive_ratio` (default EXTRACTIVE_RATIO) is below 1; see
+    `extractive.prefilter`. Level-1 chunks that nearly repeat an earlier
+    chunk are skipped (see `dedupe.skip_duplicates`), so `num_chunks` counts
+    the chunks summarized and `duplicate_chunks_skipped` the rest.
+    """
+    if detail_level == "all":
+        return summarize_all_levels(text, model_name, return_metrics, generation_kwargs, extractive_ratio)
+    start_time = time.time()
+    summarizer = get_summarizer(model_name)
     
-    return (summary, metrics) if return_metrics else summary
\ No newline at end of file
+    config = DETAIL_CONFIGS.get(model_name, DETAIL_CONFIGS["bart-large-cnn"])[detail_level]
+    original_words, original_chars = len(text.split()), len(text)
+    text, extractive_stats = prefilter(text, extractive_ratio)
+    
+    # LEVEL 1: Linear Chunking
+    cache_stats = {"hits": 0, "misses": 0}
+    dedupe_stats = {"skipped": 0}
+    chunks, fill_ratio = pack_chunks(text, summarizer, model_name, config["chunk_size"], config["chunk_overlap"])
+    for event in _summary_events(skip_duplicates(chunks, dedupe_stats), summarizer, config, detail_level, model_name,
+                                 CHUNK_WINDOW, cache_stats=cache_stats, generation_kwargs=generation_kwargs):
+        pass
+
+    summary = event["summary"]
+    metrics = add_savings(_summary_metrics(summary, model_name, detail_level, original_words, original_chars,
+                                           start_time, event["num_chunks"], chunk_packing=CHUNK_PACKING,
+                                           token_fill_ratio=fill_ratio, cache_stats=cache_stats,
+                                           dedupe_stats=dedupe_stats),
+                          extractive_stats)
+    
+    return (summary, metrics) if return_metrics else summary
+
+def summarize_progressive(text, detail_level="medium", model_name="bart-large-cnn", generation_kwargs=None,
+                          extractive_ratio=None):
+    """
+    Summarize `text`, yielding level-1 chunk summaries as they complete.
+
+    Same result as `summarize_text`, delivered as a stream of events:
+
+        {"stage": "chunk", "summaries": [str, ...], "chunks_done": int,
+         "chunks_total": int, "elapsed": float, "eta": float}
+        {"stage": "reduce", ...}             # level 1 done, reducing
+        {"stage": "final", "summary": str, "metrics": dict}
+
+    Chunks are summarized one batch at a time (see `summary_batch_size`), so
+    the first partial summary arrives after a single batch rather than after
+    the whole input. `elapsed` and `eta` are seconds of level-1 work.
+    `generation_kwargs` are passed to every generate() call (see
+    `summarize_chunks`); `extractive_ratio` works as in `summarize_text`.
+    """
+    start_time = time.time()
+    summarizer = get_summarizer(model_name)
+
+    config = DETAIL_CONFIGS.get(model_name, DETAIL_CONFIGS["bart-large-cnn"])[detail_level]
+    original_words, original_chars = len(text.split()), len(text)
+    text, extractive_stats = prefilter(text, extractive_ratio)
+    cache_stats = {"hits": 0, "misses": 0}
+    dedupe_stats = {"skipped": 0}
+    chunks, fill_ratio = pack_chunks(text, summarizer, model_name, config["chunk_size"], config["chunk_overlap"])
+    # Spans only hold offsets into `text`, so listing them up front is cheap and gives the progress total
+    chunks = list(skip_duplicates(chunks, dedupe_stats))
+    window = summary_batch_size(summarizer, int(config["chunk_size"] * 1.3),
+                                num_beams=(generation_kwargs or {}).get("num_beams"))
+
+    for event in _summary_events(chunks, summarizer, config, detail_level, model_name, window, total=len(chunks),
+                                 cache_stats=cache_stats, generation_kwargs=generation_kwargs):
+        if event["stage"] == "final":
+            metrics = add_savings(_summary_metrics(event["summary"], model_name, detail_level, original_words,
+                                                   original_chars, start_time, event["num_chunks"],
+                                                   chunk_packing=CHUNK_PACKING, token_fill_ratio=fill_ratio,
+                                                   cache_stats=cache_stats, dedupe_stats=dedupe_stats),
+                                  extractive_stats)
+            event = {"stage": "final", "summary": event["summary"], "metrics": metrics}
+        yield event
+
+def summarize_stream(pieces, detail_level="medium", model_name="bart-large-cnn", return_metrics=False,
+                     progress_cb=None, generation_kwargs=None):
+    """
+    Summarize text while it is still being produced (e.g. by a transcriber).
+
+    Pieces are chunked incrementally by `iter_chunks`; every chunk is
+    summarized as soon as it is final, so level-1 summarization overlaps with whatever
+    produces the pieces and only the final reduce waits for the end. For the
+    same text the result matches `summarize_text` with word packing (the
+    streaming chunker always packs by word count) and no extractive
+    pre-filter, which needs the whole transcript to score sentences (so the
+    audio pipelines do not stream with either token packing or the pre-filter on).
+
+    Args:
+        pieces: Iterable of text fragments in order (joined with single spaces)
+        detail_level: "brief", "medium" or "detailed"
+        model_name: Key in MODEL_MAP
+        return_metrics: Also return the metrics dict; `processing_time` spans
+            the whole stream and `summarize_time` excludes the time spent
+            waiting for pieces
+        progress_cb: Called with each "chunk" and "reduce" event (see
+            `summarize_progressive`); totals and ETAs are None since the
+            input length is not known up front
+        generation_kwargs: Passed to every generate() call (see `summarize_chunks`)
+
+    Returns:
+        str or (str, dict): The summary, plus metrics if requested
+    """
+    start_time = time.time()
+    summarizer = get_summarizer(model_name)
+
+    config = DETAIL_CONFIGS.get(model_name, DETAIL_CONFIGS["bart-large-cnn"])[detail_level]
+    original_words = original_chars = 0
+    waiting_time = 0.0
+    cache_stats = {"hits": 0, "misses": 0}
+    dedupe_stats = {"skipped": 0}
+
+    def counted(pieces):
+        nonlocal original_words, original_chars, waiting_time
+        pieces = iter(pieces)
+        while True:
+            # Time blocked on the producer is not summarization time
+            wait_start = time.time()
+            piece = next(pieces, None)
+            waiting_time += time.time() - wait_start
+            if piece is None:
+                return
+            words = piece.split()
+            if not words:
+                continue
+            # Matches len() of the space-joined, whitespace-normalised text
+            original_chars += len(" ".join(words)) + (1 if original_words else 0)
+            original_words += len(words)
+            yield piece
+
+    chunks = skip_duplicates(iter_chunks(counted(pieces), max_words=config["chunk_size"],
+                                         overlap=config["chunk_overlap"]), dedupe_stats)
+    # Each chunk is summarized as soon as it is final, overlapping with whatever produces the pieces
+    for event in _summary_events(chunks, summarizer, config, detail_level, model_name, 1, cache_stats=cache_stats,
+                                 generation_kwargs=generation_kwargs):
+        if event["stage"] != "final" and progress_cb:
+            progress_cb(event)
+
+    summary = event["summary"]
+    metrics = _summary_metrics(summary, model_name, detail_level, original_words, original_chars, start_time,
+                               event["num_chunks"], cache_stats=cache_stats, dedupe_stats=dedupe_stats)
+    metrics["summarize_time"] = metrics["processing_time"] - waiting_time
+
+    return (summary, metrics) if return_metrics else summary
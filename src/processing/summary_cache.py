@@ -0,0 +1,40 @@
+import hashlib
+import json
+from src.cache import DiskCache
+from config import SUMMARY_CACHE, SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_MB
+
+_cache = None
+
+
+def get_summary_cache():
+    """Lazily open the on-disk chunk-summary cache (None when SUMMARY_CACHE is off)"""
+    global _cache
+    if not SUMMARY_CACHE:
+        return None
+    if _cache is None:
+        _cache = DiskCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def summary_key(chunk, model_id, max_length, min_length, decoding):
+    """
+    Cache key for one chunk summary.
+
+    Args:
+        chunk: Chunk text exactly as passed to the model
+        model_id: Resolved model (e.g. "facebook/bart-large-cnn")
+        max_length, min_length: Effective generation limits for this chunk
+        decoding: Dict of the remaining decoding settings (beams, penalties, ...)
+    """
+    digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+    settings = json.dumps(decoding, sort_keys=True)
+    return f"summary:{model_id}:{max_length}:{min_length}:{settings}:{digest}"
+
+
+def get_summary(key):
+    entry = get_summary_cache().get(key)
+    return entry["summary_text"] if entry is not None else None
+
+
+def put_summary(key, summary_text):
+    get_summary_cache().set(key, {"summary_text": summary_text})
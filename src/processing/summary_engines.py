@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import warnings
+from transformers import pipeline
+from config import SUMMARIZER_ENGINE, SUMMARIZER_ENGINES, ONNX_EXPORT_DIR
+
+
+def _load_torch(model_id, device_id):
+    """fp32 PyTorch (the original engine)."""
+    return pipeline("summarization", model=model_id, device=device_id)
+
+
+def _load_torch_int8(model_id, device_id):
+    """PyTorch with every Linear layer dynamically quantized to int8 (CPU only)."""
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_id).eval()
+    with warnings.catch_warnings():
+        # Eager-mode dynamic quantization still works; newer torch only warns that it is deprecated
+        warnings.filterwarnings("ignore", message=".*torch.ao.quantization.*")
+        warnings.filterwarnings("ignore", message=".*quantize_per_tensor.*")
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if device_id != -1:
+        print("torch-int8 summarization runs on CPU; ignoring DEVICE")
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_id), device=-1)
+
+
+def _load_onnx(model_id, device_id):
+    """
+    ONNX Runtime export of the encoder and decoder (with past key/values, so
+    each generated token only runs the new position). The export is saved
+    under ONNX_EXPORT_DIR on first load. Requires `optimum[onnxruntime]`.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError(
+            "The onnx summarizer engine requires optimum with ONNX Runtime "
+            "(pip install \"optimum[onnxruntime]\")"
+        ) from e
+    from transformers import AutoTokenizer
+
+    export_dir = os.path.join(ONNX_EXPORT_DIR, model_id.replace("/", "--"))
+    if not os.path.isdir(export_dir):
+        print(f"Exporting {model_id} to ONNX (first run only)...")
+        os.makedirs(ONNX_EXPORT_DIR, exist_ok=True)
+        # Export into a scratch directory and move it into place, so a crash never leaves a partial export
+        tmp_dir = tempfile.mkdtemp(dir=ONNX_EXPORT_DIR, suffix=".tmp")
+        try:
+            ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True, use_cache=True).save_pretrained(tmp_dir)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+            os.replace(tmp_dir, export_dir)
+        except OSError:
+            # Another process finished the same export first
+            if not os.path.isdir(export_dir):
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+    if device_id != -1:
+        print("onnx summarization runs on CPU; ignoring DEVICE")
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(export_dir))
+
+
+ENGINES = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+}
+
+
+def summarizer_engine(model_name):
+    """Engine configured for `model_name` (SUMMARIZER_ENGINES, else SUMMARIZER_ENGINE)."""
+    engine = SUMMARIZER_ENGINES.get(model_name, SUMMARIZER_ENGINE)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown summarizer engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+    return engine
+
+
+def load_summarizer(engine, model_id, device_id):
+    """
+    Build a summarization pipeline for `model_id` on `engine`.
+
+    Every engine returns a transformers summarization pipeline, so callers
+    use the same call signature, `.tokenizer` and `.model.config`.
+    """
+    return ENGINES[engine](model_id, device_id)
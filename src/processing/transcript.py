@@ -0,0 +1,130 @@
+from array import array
+from bisect import bisect_right
+
+
+class Transcript(str):
+    """
+    Transcript text with segment timing kept in compact parallel columns.
+
+    Subclassing `str` keeps every existing consumer working unchanged while
+    the text itself is stored exactly once. For segment i, `offsets[i]` is the
+    character offset where its text starts, and `starts[i]` / `ends[i]` are
+    its times in seconds. Chunks are `TextSpan` offset ranges into the text.
+    """
+
+    def __new__(cls, text="", starts=(), ends=(), offsets=()):
+        obj = super().__new__(cls, text)
+        obj.starts = array("d", starts)
+        obj.ends = array("d", ends)
+        obj.offsets = array("q", offsets)
+        return obj
+
+    @classmethod
+    def from_segments(cls, segments):
+        """
+        Build a transcript from (start, end, text) segments.
+        Segment text is whitespace-normalised and joined with single spaces.
+        """
+        starts, ends, offsets = array("d"), array("d"), array("q")
+        parts = []
+        pos = 0
+        for start, end, text in segments:
+            text = " ".join(text.split())
+            if not text:
+                continue
+            if parts:
+                pos += 1  # joining space
+            starts.append(start)
+            ends.append(end)
+            offsets.append(pos)
+            parts.append(text)
+            pos += len(text)
+        return cls(" ".join(parts), starts, ends, offsets)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["text"], data.get("starts", ()), data.get("ends", ()), data.get("offsets", ()))
+
+    def to_dict(self):
+        return {
+            "text": str(self),
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "offsets": self.offsets.tolist(),
+        }
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.starts, self.ends, self.offsets))
+
+    @property
+    def has_timing(self):
+        return len(self.offsets) > 0
+
+    def segment_at(self, char_offset):
+        """Index of the segment containing `char_offset`, or None without timing."""
+        if not self.has_timing:
+            return None
+        return max(0, bisect_right(self.offsets, char_offset) - 1)
+
+    def time_range(self, start_char, end_char):
+        """
+        Time span (start_seconds, end_seconds) covered by text[start_char:end_char].
+
+        Returns:
+            tuple: (start, end), or (None, None) if the transcript has no timing
+        """
+        if not self.has_timing:
+            return None, None
+        first = self.segment_at(start_char)
+        last = self.segment_at(max(start_char, end_char - 1))
+        return self.starts[first], self.ends[last]
+
+    def span(self, start, end):
+        return TextSpan(self, start, end)
+
+
+class TextSpan:
+    """
+    A chunk of a transcript stored as a character range, not a copy.
+    The text is only materialised when `.text` / `str()` is used.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self):
+        return str.__getitem__(self.source, slice(self.start, self.end))
+
+    def __str__(self):
+        return self.text
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, TextSpan):
+            return self.source is other.source and (self.start, self.end) == (other.start, other.end)
+        if isinstance(other, str):
+            return self.text == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self.source), self.start, self.end))
+
+    def __repr__(self):
+        return f"TextSpan({self.start}, {self.end}, {self.text[:40]!r})"
+
+    def split(self, *args):
+        return self.text.split(*args)
+
+    @property
+    def time_range(self):
+        """(start_seconds, end_seconds) of this chunk, or (None, None) without timing."""
+        if isinstance(self.source, Transcript):
+            return self.source.time_range(self.start, self.end)
+        return None, None
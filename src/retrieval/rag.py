@@ -3,21 +3,28 @@ import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
-from src.processing.chunking import split_text
-from config import EMBEDDING_MODEL, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP, RAG_TOP_K
+from src.processing.chunking import iter_chunks, windows
+from src.processing.dedupe import DedupedChunks
+from src.model_registry import registry
+from src import model_host
+from config import EMBEDDING_MODEL, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP, RAG_TOP_K, CHUNK_WINDOW
 
 
-_embedding_model = None
+def _load_embedding_model():
+    print("Loading embedding model...")
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    print("Embedding model loaded successfully")
+    return model
+
+
+registry.register(f"embedding:{EMBEDDING_MODEL}", _load_embedding_model)
 
 
 def get_embedding_model():
-    """Lazy load the embedding model"""
-    global _embedding_model
-    if _embedding_model is None:
-        print("Loading embedding model...")
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-        print("Embedding model loaded successfully")
-    return _embedding_model
+    """Lazy load the embedding model through the shared registry, or use the shared model host when MODEL_HOST is set"""
+    if model_host.use_model_host():
+        return model_host.remote_embedder()
+    return registry.get(f"embedding:{EMBEDDING_MODEL}")
 
 
 def build_vector_store(transcript, chunk_size=None, overlap=None):
@@ -31,7 +38,10 @@ def build_vector_store(transcript, chunk_size=None, overlap=None):
     
     Returns:
         index: FAISS index
-        chunks: list of text chunks
+        chunks: DedupedChunks, a list of TextSpan chunks (character ranges
+            into the transcript) aligned with the index vectors. Chunks that
+            nearly repeat an earlier one are not embedded again; they are
+            kept in `chunks.positions` under the chunk they repeat.
     """
     model = get_embedding_model()
 
@@ -39,21 +49,23 @@ def build_vector_store(transcript, chunk_size=None, overlap=None):
     current_chunk_size = chunk_size or RAG_CHUNK_SIZE
     current_overlap = overlap or RAG_CHUNK_OVERLAP
 
-    # Split transcript into chunks
-    chunks = split_text(transcript, max_words=current_chunk_size, overlap=current_overlap)
+    # Chunks are generated lazily and embedded CHUNK_WINDOW at a time, so only
+    # one window of chunk text and embeddings is materialised at once
+    chunks = DedupedChunks()
+    index = None
+    for window in windows(iter_chunks(transcript, max_words=current_chunk_size, overlap=current_overlap), CHUNK_WINDOW):
+        fresh = [chunk for chunk in window if chunks.add(chunk)]
+        if not fresh:
+            continue
+        embeddings = model.encode([chunk.text for chunk in fresh], convert_to_numpy=True, show_progress_bar=False)
+        if index is None:
+            index = faiss.IndexFlatL2(embeddings.shape[1])
+        index.add(embeddings)
+
     if not chunks:
         return None, []
 
-    print(f"Created {len(chunks)} chunks for RAG")
-
-    # Generate embeddings
-    embeddings = model.encode(chunks, convert_to_numpy=True, show_progress_bar=False)
-
-    # Build FAISS index
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
-
+    print(f"Created {len(chunks)} chunks for RAG ({chunks.skipped} near-duplicates not embedded)")
     print(f"FAISS index built with {index.ntotal} vectors")
 
     return index, chunks
@@ -70,7 +82,10 @@ def retrieve_chunks(question, index, chunks, top_k=None):
         top_k: Number of top chunks to retrieve
     
     Returns:
-        List of retrieved text chunks
+        List of retrieved chunks; chunks from a timed transcript also carry
+        'start_time' / 'end_time' in seconds. 'occurrences' lists the
+        (start_time, end_time) of every place the chunk's text occurs when
+        `chunks` groups near-duplicates (see `build_vector_store`)
     """
     if index is None or not chunks:
         return []
@@ -85,13 +100,20 @@ def retrieve_chunks(question, index, chunks, top_k=None):
     distances, indices = index.search(question_embedding, min(current_top_k, len(chunks)))
 
     # Retrieve chunks
+    positions = getattr(chunks, 'positions', None)
     retrieved = []
     for i, dist in zip(indices[0], distances[0]):
         if i < len(chunks):
+            chunk = chunks[i]
+            start_time, end_time = getattr(chunk, 'time_range', (None, None))
             retrieved.append({
-                'text': chunks[i],
+                'text': str(chunk),
                 'distance': float(dist),
-                'index': int(i)
+                'index': int(i),
+                'start_time': start_time,
+                'end_time': end_time,
+                'occurrences': [getattr(c, 'time_range', (None, None)) for c in positions[i]] if positions else
+                               [(start_time, end_time)]
             })
 
     return retrieved
@@ -169,7 +191,9 @@ def search_transcript(query, index, chunks, top_k=5):
     for chunk_data in retrieved:
         results.append({
             'text': chunk_data['text'],
-            'relevance': 1 / (1 + chunk_data['distance'])  # Convert distance to relevance score
+            'relevance': 1 / (1 + chunk_data['distance']),  # Convert distance to relevance score
+            'start_time': chunk_data.get('start_time'),
+            'end_time': chunk_data.get('end_time')
         })
     
     return results
\ No newline at end of file
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from src.bulk import expand_urls, load_manifest, ingest
+
+
+def _thread_pool(max_workers, **kwargs):
+    # Stand-in for the process pool so the test needs no model weights
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+@patch('src.bulk.yt_dlp.YoutubeDL')
+def test_expand_urls_flattens_channel_tabs(mock_ytdl):
+    mock_instance = MagicMock()
+    mock_ytdl.return_value.__enter__.return_value = mock_instance
+    mock_instance.extract_info.side_effect = [
+        {'entries': [{'_type': 'url', 'ie_key': 'YoutubeTab', 'url': 'https://www.youtube.com/@c/videos'}]},
+        {'entries': [{'id': 'aaaaaaaaaaa', 'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa', 'title': 'A'},
+                     {'id': 'bbbbbbbbbbb', 'url': 'bbbbbbbbbbb', 'title': 'B'}]},
+    ]
+
+    videos = expand_urls('https://www.youtube.com/@c')
+    assert [v['video_id'] for v in videos] == ['aaaaaaaaaaa', 'bbbbbbbbbbb']
+    assert videos[1]['url'] == 'https://www.youtube.com/watch?v=bbbbbbbbbbb'
+
+
+def test_ingest_writes_manifest_and_resumes(tmp_path):
+    manifest = tmp_path / 'manifest.jsonl'
+    videos = [{'video_id': f'video{i:06d}', 'url': f'https://youtu.be/video{i:06d}', 'title': str(i)} for i in range(5)]
+
+    def fetch(video):
+        if video['video_id'] == 'video000003':
+            raise RuntimeError('no audio')
+        return {'video': video, 'text': 'words', 'source_type': 'manual', 'audio_path': None, 'fetch_time': 0.0}
+
+    def process(payload, detail_level, model_name):
+        return {'video_id': payload['video']['video_id'], 'url': payload['video']['url'], 'status': 'ok'}
+
+    with patch('src.bulk.expand_urls', return_value=videos), \
+         patch('src.bulk._fetch_video', side_effect=fetch) as mock_fetch, \
+         patch('src.bulk._process_video', side_effect=process), \
+         patch('src.bulk.worker_pool', side_effect=_thread_pool):
+        counts = ingest(['playlist'], manifest_path=str(manifest), io_workers=3, cpu_workers=1, max_pending=1)
+        assert counts == {'ok': 4, 'error': 1, 'skipped': 0}
+
+        records = load_manifest(str(manifest))
+        assert records['video000003']['status'] == 'error'
+        assert records['video000003']['stage'] == 'fetch'
+
+        # A crash can leave a truncated last line; resume must tolerate it
+        with open(manifest, 'a') as f:
+            f.write('{"video_id": "vid')
+
+        mock_fetch.reset_mock()
+        counts = ingest(['playlist'], manifest_path=str(manifest), io_workers=3, cpu_workers=1, max_pending=1)
+        assert counts == {'ok': 0, 'error': 1, 'skipped': 4}
+        assert [c.args[0]['video_id'] for c in mock_fetch.call_args_list] == ['video000003']
+
+
+def test_ingest_keeps_every_cpu_worker_busy(tmp_path):
+    videos = [{'video_id': f'video{i:06d}', 'url': f'https://youtu.be/video{i:06d}', 'title': str(i)} for i in range(12)]
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    def fetch(video):
+        with lock:
+            state['in_flight'] += 1
+            state['peak_in_flight'] = max(state['peak_in_flight'], state['in_flight'])
+        return {'video': video, 'text': 'words', 'source_type': 'manual', 'audio_path': None, 'fetch_time': 0.0}
+
+    def process(payload, detail_level, model_name):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.1)
+        with lock:
+            state['running'] -= 1
+            state['in_flight'] -= 1
+        return {'video_id': payload['video']['video_id'], 'url': payload['video']['url'], 'status': 'ok'}
+
+    with patch('src.bulk.expand_urls', return_value=videos), \
+         patch('src.bulk._fetch_video', side_effect=fetch), \
+         patch('src.bulk._process_video', side_effect=process), \
+         patch('src.bulk.worker_pool', side_effect=_thread_pool):
+        counts = ingest(['playlist'], manifest_path=str(tmp_path / 'manifest.jsonl'),
+                        io_workers=12, cpu_workers=4, max_pending=2)
+
+    assert counts == {'ok': 12, 'error': 0, 'skipped': 0}
+    assert state['peak'] == 4
+    assert state['peak_in_flight'] <= 4 + 2
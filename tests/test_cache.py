@@ -0,0 +1,53 @@
+import os
+import time
+from unittest.mock import patch
+from src.cache import DiskCache, hash_file
+
+
+def test_disk_cache_roundtrip_and_counters(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=0)
+    assert cache.get("missing") is None
+    cache.set("key", {"text": "hello"})
+    assert cache.get("key") == {"text": "hello"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    # Atomic writes leave no temp files behind
+    assert all(name.endswith(".json") for name in os.listdir(tmp_path))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.set("a", "x" * 40)
+    cache.set("b", "y" * 40)
+    # Make "a" the most recently used entry
+    past = time.time() - 60
+    os.utime(cache._path("b"), (past, past))
+    cache.get("a")
+
+    cache.set("c", "z" * 40)
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get("b") is None
+
+
+def test_full_disk_cache_does_not_rescan_on_every_set(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10_000)
+    for i in range(100):
+        cache.set(f"fill{i}", "x" * 100)
+    assert cache.stats()["bytes"] <= 10_000
+
+    with patch.object(DiskCache, "_entries", autospec=True, side_effect=DiskCache._entries) as scans:
+        for i in range(20):
+            cache.set(f"more{i}", "y" * 100)
+    # Each eviction frees ~10% of the cache, i.e. room for several more entries
+    assert scans.call_count <= 3
+    assert cache.stats()["bytes"] <= 10_000
+
+
+def test_hash_file_depends_on_content(tmp_path):
+    one, two = tmp_path / "one.wav", tmp_path / "two.wav"
+    one.write_bytes(b"abc")
+    two.write_bytes(b"abc")
+    assert hash_file(one) == hash_file(two)
+    two.write_bytes(b"abd")
+    assert hash_file(one) != hash_file(two)
@@ -24,3 +24,87 @@ def test_split_text_long_sentence_fallback():
     assert sum(len(c.split()) for c in chunks) >= len(text.split())
     for chunk in chunks:
         assert len(chunk.split()) <= 10
+
+def test_split_spans_match_split_text():
+    from src.processing.chunking import split_spans
+    text = "Hello world. This is a test. We should split this well. " * 20
+    text += "and then a long unpunctuated tail " * 10
+    for max_words, overlap in [(6, 2), (12, 4), (25, 0)]:
+        chunks = split_text(text, max_words=max_words, overlap=overlap)
+        spans = split_spans(text, max_words=max_words, overlap=overlap)
+        assert [str(s) for s in spans] == chunks
+
+def test_transcript_spans_report_time_ranges():
+    import pickle
+    from src.processing.chunking import split_spans
+    from src.processing.transcript import Transcript
+    transcript = Transcript.from_segments([
+        (0.0, 2.0, "  First segment here. "),
+        (2.0, 4.5, "Second segment follows."),
+        (4.5, 7.0, "Third and final segment."),
+    ])
+    assert transcript == "First segment here. Second segment follows. Third and final segment."
+    spans = split_spans(transcript, max_words=6, overlap=0)
+    assert [s.time_range for s in spans] == [(0.0, 4.5), (2.0, 7.0)]
+
+    restored = pickle.loads(pickle.dumps(transcript))
+    assert restored == transcript
+    assert list(restored.offsets) == list(transcript.offsets)
+
+def test_streaming_chunker_matches_split_text():
+    from src.processing.chunking import StreamingChunker
+    words = ("Hello world. This is a test. We should split this well. " * 15
+             + "and then a long unpunctuated tail " * 12 + "that finally ends. Short one.").split()
+    text = " ".join(words)
+    for max_words, overlap in [(6, 2), (12, 4), (25, 0)]:
+        for piece in (1, 7, 50):
+            chunker = StreamingChunker(max_words=max_words, overlap=overlap)
+            chunks = []
+            for i in range(0, len(words), piece):
+                chunks += chunker.feed(" ".join(words[i:i + piece]))
+            chunks += chunker.finish()
+            assert chunks == split_text(text, max_words=max_words, overlap=overlap)
+
+def test_split_text_unicode_and_irregular_whitespace():
+    from src.processing.chunking import split_spans
+    text = "  Café déjà vu.\nNext line here!  Then\tthe end?  "
+    chunks = split_text(text, max_words=4, overlap=0)
+    # Same packing as before; whitespace runs inside a chunk collapse to one space
+    assert chunks == ["Café déjà vu.", "Café déjà vu. Next line here!", "Next line here! Then the end?"]
+    # Spans still point into the original, unnormalised text
+    assert [str(s).split() for s in split_spans(text, max_words=4, overlap=0)] == [c.split() for c in chunks]
+
+def test_split_spans_by_tokens_fills_budget(bpe_tokenizer):
+    from src.processing.chunking import split_spans_by_tokens
+    text = "The quick brown fox jumps over the lazy dog. " * 40 + "unpunctuated zebra words keep flowing " * 60
+    spans, counts = split_spans_by_tokens(text, bpe_tokenizer, max_tokens=64, overlap_tokens=12)
+
+    assert len(spans) == len(counts) > 1
+    for span, count in zip(spans, counts):
+        actual = len(bpe_tokenizer(str(span), add_special_tokens=False)["input_ids"])
+        # Exact up to the chunk's first word losing its leading space
+        assert abs(actual - count) <= 1
+        assert count <= 64
+    # Packing by real tokens keeps chunks close to the budget
+    assert sum(counts[:-1]) / (len(counts) - 1) > 0.75 * 64
+
+def test_iter_chunks_is_lazy_for_text_and_segment_streams():
+    from src.processing.chunking import iter_chunks, split_spans
+    text = "Hello world. This is a test. We should split this well. " * 30
+
+    first = next(iter_chunks(text, max_words=6, overlap=2))
+    assert first == split_spans(text, max_words=6, overlap=2)[0]
+
+    pulled = []
+
+    def segments():
+        for i, sentence in enumerate(text.replace(". ", ".\n").splitlines()):
+            pulled.append(i)
+            yield (float(i), float(i + 1), sentence)
+
+    stream = iter_chunks(segments(), max_words=6, overlap=2)
+    chunks = [next(stream)]
+    # Only a few segments are read before the first chunk is final
+    assert len(pulled) < 5
+    chunks += list(stream)
+    assert chunks == split_text(text, max_words=6, overlap=2)
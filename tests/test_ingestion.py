@@ -1,6 +1,12 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.ingestion.youtube import fetch_youtube_transcript, get_video_info
+from src.ingestion.youtube import fetch_youtube_transcript, get_video_info, clear_video_metadata_cache
+
+@pytest.fixture(autouse=True)
+def fresh_metadata_cache():
+    clear_video_metadata_cache()
+    yield
+    clear_video_metadata_cache()
 
 @patch('src.ingestion.youtube.yt_dlp.YoutubeDL')
 def test_get_video_info(mock_ytdl):
@@ -20,9 +26,8 @@ def test_get_video_info(mock_ytdl):
     assert info['has_manual_subs'] == True
     assert info['has_auto_subs'] == False
 
-@patch('src.ingestion.youtube.tempfile.TemporaryDirectory')
 @patch('src.ingestion.youtube.yt_dlp.YoutubeDL')
-def test_fetch_youtube_transcript_no_subs(mock_ytdl, mock_temp):
+def test_fetch_youtube_transcript_no_subs(mock_ytdl):
     mock_instance = MagicMock()
     mock_ytdl.return_value.__enter__.return_value = mock_instance
     mock_instance.extract_info.return_value = {
@@ -33,3 +38,353 @@ def test_fetch_youtube_transcript_no_subs(mock_ytdl, mock_temp):
     transcript, source = fetch_youtube_transcript('http://test.url')
     assert transcript is None
     assert source is None
+
+@patch('src.ingestion.youtube.yt_dlp.YoutubeDL')
+def test_fetch_youtube_transcript_single_extraction(mock_ytdl):
+    mock_instance = MagicMock()
+    mock_ytdl.return_value.__enter__.return_value = mock_instance
+    mock_instance.extract_info.return_value = {
+        'title': 'Test Video',
+        'subtitles': {},
+        'automatic_captions': {'en': [{'ext': 'json3', 'url': 'http://subs/json3'},
+                                      {'ext': 'vtt', 'url': 'http://subs/vtt'}]},
+    }
+    mock_instance.urlopen.return_value.__enter__.return_value.read.side_effect = [
+        b"WEBVTT\nKind: captions\n\n00:00:00.000 --> 00:00:02.000\nhello <c>world</c>\n", b""
+    ]
+
+    assert get_video_info('https://youtu.be/dQw4w9WgXcQ')['has_auto_subs'] is True
+    transcript, source = fetch_youtube_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    assert transcript == 'hello world'
+    assert source == 'auto-generated'
+    mock_instance.extract_info.assert_called_once()
+    mock_instance.urlopen.assert_called_once_with('http://subs/vtt')
+    mock_instance.urlopen.return_value.__exit__.assert_called_once()
+
+@patch('src.ingestion.youtube.get_or_download', side_effect=lambda video_id, download: download())
+@patch('src.ingestion.youtube.yt_dlp.YoutubeDL')
+def test_download_audio_reuses_shared_metadata(mock_ytdl, mock_store):
+    from src.ingestion.youtube import download_audio
+    mock_instance = MagicMock()
+    mock_ytdl.return_value.__enter__.return_value = mock_instance
+    info = {'id': 'dQw4w9WgXcQ', 'title': 'Test Video', 'subtitles': {}, 'automatic_captions': {}}
+    mock_instance.extract_info.return_value = info
+    mock_instance.sanitize_info.side_effect = dict
+    mock_instance.process_ie_result.side_effect = lambda info, download: dict(info, ext='m4a')
+    mock_instance.prepare_filename.side_effect = lambda info: f"{info['id']}.{info['ext']}"
+
+    assert get_video_info('https://youtu.be/dQw4w9WgXcQ')['title'] == 'Test Video'
+    assert download_audio('https://www.youtube.com/watch?v=dQw4w9WgXcQ') == 'dQw4w9WgXcQ.m4a'
+
+    mock_instance.extract_info.assert_called_once_with('https://youtu.be/dQw4w9WgXcQ', download=False)
+    mock_instance.process_ie_result.assert_called_once_with(info, download=True)
+    assert 'ext' not in info
+
+def test_plan_windows_cuts_at_silence():
+    from src.ingestion.audio import plan_windows
+    windows = plan_windows(700, [(280, 290)], window_seconds=300, overlap_seconds=2)
+    assert windows[0] == (0.0, 285.0)
+    assert windows[1][0] == 285.0
+    assert windows[-1][1] == 700
+
+def test_plan_windows_overlaps_without_silence():
+    from src.ingestion.audio import plan_windows
+    windows = plan_windows(650, [], window_seconds=300, overlap_seconds=2)
+    assert windows == [(0.0, 300.0), (298.0, 598.0), (596.0, 650)]
+
+def test_overlap_length_matches_case_and_punctuation_insensitively():
+    from src.ingestion.audio import overlap_length
+    assert overlap_length("the quick brown fox".split(), "Brown fox, jumps over".split()) == 2
+    assert overlap_length("the quick brown fox".split(), "the lazy dog".split()) == 0
+
+def test_extract_video_id():
+    from src.ingestion.youtube import extract_video_id
+    assert extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://youtu.be/dQw4w9WgXcQ?si=abc") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://www.youtube.com/shorts/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://example.com/video") is None
+
+def test_audio_store_reuses_and_coalesces_downloads(tmp_path):
+    import threading
+    from src.ingestion.audio_store import get_or_download
+    calls = []
+    release = threading.Event()
+
+    def download():
+        calls.append(1)
+        release.wait(5)
+        path = tmp_path / "abcdefghijk.m4a"
+        path.write_bytes(b"audio")
+        return str(path)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_or_download("abcdefghijk", download, str(tmp_path))))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [str(tmp_path / "abcdefghijk.m4a")] * 4
+    # A complete file on disk is reused without downloading again
+    assert get_or_download("abcdefghijk", download, str(tmp_path)) == results[0]
+    assert len(calls) == 1
+
+def test_audio_store_cleans_partials_on_failure(tmp_path):
+    from src.ingestion.audio_store import get_or_download
+
+    def download():
+        (tmp_path / "abcdefghijk.webm.part").write_bytes(b"half")
+        raise RuntimeError("network down")
+
+    with pytest.raises(RuntimeError):
+        get_or_download("abcdefghijk", download, str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+def test_prune_audio_store_by_age_and_size(tmp_path):
+    import os
+    import time
+    from src.ingestion.audio_store import prune_audio_store
+    now = time.time()
+    for name, age in [("old.m4a", 10 * 3600), ("mid.m4a", 60), ("new.m4a", 0)]:
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age, now - age))
+
+    removed = prune_audio_store(str(tmp_path), max_bytes=150, max_age_seconds=3600)
+    assert sorted(os.path.basename(p) for p in removed) == ["mid.m4a", "old.m4a"]
+    assert [p.name for p in tmp_path.iterdir()] == ["new.m4a"]
+
+def test_fresh_download_larger_than_the_store_limit_survives(tmp_path):
+    from src.ingestion import audio_store
+    (tmp_path / "older.m4a").write_bytes(b"x" * 100)
+
+    def download():
+        path = tmp_path / "abcdefghijk.m4a"
+        path.write_bytes(b"x" * 4096)
+        return str(path)
+
+    # The new file alone is over the limit: older files go, the caller's file stays
+    real_prune = audio_store.prune_audio_store
+    prune = lambda directory, keep=(): real_prune(directory, max_bytes=1024, max_age_seconds=0, keep=keep)
+    with patch("src.ingestion.audio_store.prune_audio_store", side_effect=prune):
+        path = audio_store.get_or_download("abcdefghijk", download, str(tmp_path))
+    assert path == str(tmp_path / "abcdefghijk.m4a")
+    assert [p.name for p in tmp_path.iterdir()] == ["abcdefghijk.m4a"]
+
+def test_parse_vtt_rolling_dedupe_and_timestamps():
+    from src.ingestion.vtt import parse_vtt
+    vtt = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:01.000 --> 00:00:03.500 align:start position:0%
+welcome<00:00:01.500><c> to</c><c> the</c><c> show</c>
+
+00:00:03.500 --> 00:00:05.000 align:start position:0%
+welcome to the show
+today we talk about caching
+
+1
+01:00:00.000 --> 01:00:02.000
+welcome to the show
+"""
+    text, segments = parse_vtt(vtt.splitlines(), window=1)
+    assert text == "welcome to the show today we talk about caching welcome to the show"
+    assert segments[0] == (1.0, 3.5, "welcome to the show")
+    assert segments[1] == (3.5, 5.0, "today we talk about caching")
+    # Far outside the rolling window, a repeated line is genuine speech and is kept
+    assert segments[2] == (3600.0, 3602.0, "welcome to the show")
+
+def test_detect_silences_on_pcm():
+    import numpy as np
+    from src.ingestion.audio import detect_silences
+    sr = 16000
+    tone = 0.5 * np.sin(np.linspace(0, 2000 * np.pi, 2 * sr)).astype(np.float32)
+    samples = np.concatenate([tone, np.zeros(sr, dtype=np.float32), tone])
+    silences = detect_silences(samples, sr=sr, block_seconds=0.5)
+    assert len(silences) == 1
+    start, end = silences[0]
+    assert abs(start - 2.0) < 0.1 and abs(end - 3.0) < 0.1
+
+def test_decode_to_pcm_runs_ffmpeg_once(tmp_path):
+    import numpy as np
+    from src.ingestion import pcm
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"fake mp3 bytes")
+    decoded = np.arange(8, dtype=np.float32)
+
+    def fake_ffmpeg(cmd, **kwargs):
+        with open(cmd[-1], "wb") as f:
+            f.write(decoded.tobytes())
+        return MagicMock()
+
+    with patch('src.ingestion.pcm.PCM_CACHE_DIR', str(tmp_path / "pcm")), \
+         patch('src.ingestion.pcm.subprocess.run', side_effect=fake_ffmpeg) as mock_run:
+        first = pcm.decode_to_pcm(str(source))
+        second = pcm.decode_to_pcm(str(source))
+
+    assert first == second
+    mock_run.assert_called_once()
+    assert np.array_equal(pcm.load_pcm(first), decoded)
+    assert [p.suffix for p in (tmp_path / "pcm").iterdir()] == [".f32"]
+
+def test_decode_to_pcm_survives_a_concurrent_prune(tmp_path):
+    import os
+    import numpy as np
+    from src.ingestion import pcm
+    from src.ingestion.audio_store import prune_audio_store
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"fake mp3 bytes")
+    decoded = np.arange(8, dtype=np.float32)
+    pcm_dir = tmp_path / "pcm"
+    calls = []
+
+    def fake_ffmpeg(cmd, **kwargs):
+        calls.append(cmd[-1])
+        with open(cmd[-1], "wb") as f:
+            f.write(decoded.tobytes())
+        # Another process prunes the cache mid-decode: in-progress files are left alone
+        assert prune_audio_store(str(pcm_dir), max_bytes=1, max_age_seconds=0) == []
+        if len(calls) == 1:
+            # ...but if the temp file goes anyway, the decode is retried
+            os.unlink(cmd[-1])
+        return MagicMock()
+
+    with patch('src.ingestion.pcm.PCM_CACHE_DIR', str(pcm_dir)), \
+         patch('src.ingestion.pcm.subprocess.run', side_effect=fake_ffmpeg):
+        path = pcm.decode_to_pcm(str(source))
+
+    assert len(calls) == 2
+    assert np.array_equal(pcm.load_pcm(path), decoded)
+
+def test_faster_whisper_backend_contract():
+    import sys
+    import numpy as np
+    from src.ingestion.backends import FasterWhisperBackend, get_backend
+    from src.model_registry import registry
+
+    segment = MagicMock(start=0.0, end=1.5, text=" hello there")
+    fake_module = MagicMock()
+    fake_module.WhisperModel.return_value.transcribe.return_value = (iter([segment]), MagicMock())
+
+    backend = FasterWhisperBackend(model_size="tiny", compute_type="int8")
+    try:
+        with patch.dict(sys.modules, {"faster_whisper": fake_module}):
+            result = backend.transcribe(np.zeros(16000, dtype=np.float32))
+    finally:
+        registry.evict(backend.key)
+
+    assert result == {"text": "hello there", "segments": [(0.0, 1.5, " hello there")]}
+    assert fake_module.WhisperModel.call_args.kwargs["compute_type"] == "int8"
+    with pytest.raises(ValueError):
+        get_backend("not-an-engine")
+
+def test_iter_transcript_segments_streams_windows_in_order(tmp_path):
+    import numpy as np
+    from src.ingestion import transcribe
+    pcm_file = tmp_path / "audio.f32"
+    np.zeros(25 * 16000, dtype=np.float32).tofile(pcm_file)
+
+    calls = []
+
+    def fake_window(args):
+        _, start, end, _ = args
+        calls.append(start)
+        # Each window starts on the previous window's last word to exercise overlap dedupe
+        words = [f"w{int(start)}", f"w{int(end) - 1}"]
+        return {"text": " ".join(words), "segments": [(start, end, " ".join(words))]}
+
+    with patch('src.ingestion.transcribe.decode_to_pcm', return_value=str(pcm_file)), \
+         patch('src.ingestion.transcribe.plan_windows', return_value=[(0.0, 10.0), (9.0, 20.0), (19.0, 25.0)]), \
+         patch('src.ingestion.transcribe._transcribe_window', side_effect=fake_window):
+        stream = transcribe.iter_transcript_segments("talk.mp3", workers=1, audio_hash="abc")
+        first = next(stream)
+        # Only the first window has run when its segments come out
+        assert calls == [0.0]
+        rest = list(stream)
+
+    assert first == (0.0, 10.0, "w0 w9")
+    assert [text for _, _, text in rest] == ["w19", "w24"]
+    assert calls == [0.0, 9.0, 19.0]
+
+def test_windowed_transcription_reuses_one_pool(tmp_path):
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from src.ingestion import transcribe
+    pcm_file = tmp_path / "audio.f32"
+    np.zeros(25 * 16000, dtype=np.float32).tofile(pcm_file)
+
+    def fake_window(args):
+        _, start, end, _ = args
+        return {"text": f"w{int(start)}", "segments": [(start, end, f"w{int(start)}")]}
+
+    pools = []
+
+    def thread_pool(max_workers, **kwargs):
+        # Stand-in for the process pool so the test needs no model weights
+        pools.append(ThreadPoolExecutor(max_workers=max_workers))
+        return pools[-1]
+
+    with patch('src.ingestion.transcribe._pool', None), \
+         patch('src.ingestion.transcribe.worker_pool', side_effect=thread_pool), \
+         patch('src.ingestion.transcribe.decode_to_pcm', return_value=str(pcm_file)), \
+         patch('src.ingestion.transcribe.plan_windows', return_value=[(0.0, 10.0), (10.0, 25.0)]), \
+         patch('src.ingestion.transcribe._transcribe_window', side_effect=fake_window):
+        for _ in range(2):
+            segments = list(transcribe.iter_transcript_segments("talk.mp3", workers=2, audio_hash="abc"))
+            assert [text for _, _, text in segments] == ["w0", "w10"]
+        transcribe.get_transcribe_pool(2).shutdown()
+
+    assert len(pools) == 1
+
+
+def test_async_ingestion_bounds_concurrency_and_preserves_order():
+    import asyncio
+    import threading
+    import time
+    from src.ingestion import async_youtube
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_info(url):
+        with lock:
+            active.append(url)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(url)
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return {"title": url}
+
+    urls = [f"https://youtu.be/{i:011d}" for i in range(6)] + ["https://youtu.be/bad"]
+    with patch('src.ingestion.async_youtube.ASYNC_INGEST_CONCURRENCY', 2), \
+         patch('src.ingestion.youtube.get_video_info', side_effect=slow_info):
+        results = asyncio.run(async_youtube.gather_urls(async_youtube.get_video_info, urls))
+
+    assert [r["title"] for r in results[:-1]] == urls[:-1]
+    assert isinstance(results[-1], RuntimeError)
+    assert max(peak) <= 2
+
+def test_async_download_timeout_cancels_download():
+    import asyncio
+    from src.ingestion import async_youtube
+    seen = {}
+
+    def blocking_download(url, cancel_event=None):
+        seen["event"] = cancel_event
+        # Stands in for yt-dlp's progress hook noticing the cancellation
+        if cancel_event.wait(5):
+            raise RuntimeError("Download cancelled")
+        return "/tmp/never.m4a"
+
+    with patch('src.ingestion.youtube.download_audio', side_effect=blocking_download):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(async_youtube.download_audio("https://youtu.be/dQw4w9WgXcQ", timeout=0.05))
+
+    assert seen["event"].is_set()
@@ -0,0 +1,103 @@
+import threading
+import time
+import pytest
+from multiprocessing import Pipe
+from types import SimpleNamespace
+from unittest.mock import patch
+from src import model_host
+from src.processing import summarize
+from tests.test_summarize import FakePipeline, fake_summarizer
+
+
+def test_batcher_coalesces_concurrent_requests_by_settings():
+    batches = []
+
+    def run(inputs, kwargs):
+        batches.append((len(inputs), kwargs["n"]))
+        time.sleep(0.01)
+        return [f"{text}:{kwargs['n']}" for text in inputs]
+
+    batcher = model_host.DynamicBatcher(run, max_batch=8, max_wait=0.2)
+    results = {}
+
+    def client(i):
+        n = i % 2
+        results[i] = batcher.submit([f"a{i}", f"b{i}"], {"n": n})
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Six requests of two inputs each, in two settings groups: far fewer model calls than requests
+    assert results == {i: [f"a{i}:{i % 2}", f"b{i}:{i % 2}"] for i in range(6)}
+    assert len(batches) <= 4
+    assert all(size <= 8 for size, _ in batches)
+    assert sum(size for size, _ in batches) == 12
+
+
+def test_batcher_reports_errors_to_every_request_in_the_batch():
+    def run(inputs, kwargs):
+        raise ValueError("out of memory")
+
+    batcher = model_host.DynamicBatcher(run, max_batch=4, max_wait=0)
+    with pytest.raises(ValueError, match="out of memory"):
+        batcher.submit(["x"])
+
+
+def test_remote_summarizer_matches_local_summarization(bpe_tokenizer):
+    from transformers import BartConfig
+    pipe = FakePipeline(bpe_tokenizer)
+    pipe.model = SimpleNamespace(config=BartConfig(d_model=16, encoder_layers=1, decoder_layers=1), generation_config=None)
+    client_end, host_end = Pipe()
+    threading.Thread(target=model_host._handle, args=(host_end,), daemon=True).start()
+    chunks = [" ".join(f"word{i}" for i in range(30 + n)) for n in range(5)]
+
+    with patch("src.processing.summarize.get_summarizer", return_value=pipe), \
+         patch("src.processing.summary_cache.get_summary_cache", return_value=None), \
+         patch("src.model_host._connect", return_value=client_end), \
+         patch("src.model_host._local", threading.local()), \
+         patch("src.model_host._batchers", {}):
+        remote = model_host.RemoteSummarizer("bart-large-cnn")
+        summaries = summarize.summarize_chunks(chunks, remote, 60, 20, "bart-large-cnn")
+        assert model_host.request("summarizer_loaded", "bart-large-cnn") is False
+
+    assert remote.tokenizer.get_vocab() == bpe_tokenizer.get_vocab()
+    assert summaries == [fake_summarizer(chunk, 60, 20)[0]["summary_text"] for chunk in chunks]
+    assert pipe.calls == len(chunks)
+    client_end.close()
+
+
+def test_host_run_as_module_serves_locally_even_with_model_host_set(tmp_path):
+    import os
+    import socket
+    import subprocess
+    import sys
+    from multiprocessing.connection import Client
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    key_path = tmp_path / "model_host.key"
+    # MODEL_HOST=1 as it would come from .env: the host must still answer from its own registry
+    env = {**os.environ, "MODEL_HOST": "1", "MODEL_HOST_AUTOSTART": "0",
+           "MODEL_HOST_ADDRESS": f"127.0.0.1:{port}", "MODEL_HOST_KEY_PATH": str(key_path)}
+    host = subprocess.Popen([sys.executable, "-m", "src.model_host"], cwd=model_host.ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                conn = Client(("127.0.0.1", port), authkey=key_path.read_bytes())
+                break
+            except OSError:
+                assert host.poll() is None and time.monotonic() < deadline
+                time.sleep(0.2)
+        with conn:
+            conn.send(("summarizer_loaded", ("bart-large-cnn",)))
+            assert conn.poll(30)
+            assert conn.recv() == ("ok", False)
+    finally:
+        host.kill()
+        host.wait()
@@ -0,0 +1,74 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.model_registry import ModelRegistry
+
+
+def _sized(size):
+    return lambda model: size
+
+
+def test_registry_loads_lazily_and_caches():
+    loader = MagicMock(return_value="model-a")
+    registry = ModelRegistry(budget_mb=0)
+    registry.register("a", loader, size_fn=_sized(10))
+
+    assert not registry.is_loaded("a")
+    loader.assert_not_called()
+
+    assert registry.get("a") == "model-a"
+    assert registry.get("a") == "model-a"
+    loader.assert_called_once()
+
+
+def test_registry_evicts_least_recently_used_over_budget():
+    mb = 1024 * 1024
+    registry = ModelRegistry(budget_mb=2)
+    registry.register("a", lambda: "A", size_fn=_sized(mb))
+    registry.register("b", lambda: "B", size_fn=_sized(mb))
+    registry.register("c", lambda: "C", size_fn=_sized(mb))
+
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # "b" is now least recently used
+    registry.get("c")
+
+    assert registry.is_loaded("a")
+    assert registry.is_loaded("c")
+    assert not registry.is_loaded("b")
+    assert registry.resident_bytes() == 2 * mb
+
+
+def test_registry_keeps_single_model_larger_than_budget():
+    registry = ModelRegistry(budget_mb=1)
+    registry.register("big", lambda: "BIG", size_fn=_sized(10 * 1024 * 1024))
+
+    assert registry.get("big") == "BIG"
+    assert registry.is_loaded("big")
+
+
+def test_registry_unknown_model():
+    with pytest.raises(KeyError):
+        ModelRegistry().get("missing")
+
+
+def test_registry_sweeps_idle_models_in_background():
+    registry = ModelRegistry(budget_mb=0, idle_timeout=1)
+    registry.register("a", lambda: "A", size_fn=_sized(10))
+
+    registry.get("a")
+    assert registry.is_loaded("a")
+
+    deadline = time.time() + 5
+    while registry.is_loaded("a") and time.time() < deadline:
+        time.sleep(0.1)
+    assert not registry.is_loaded("a")
+
+
+def test_registry_without_idle_timeout_keeps_models():
+    registry = ModelRegistry(budget_mb=0, idle_timeout=0)
+    registry.register("a", lambda: "A", size_fn=_sized(10))
+
+    registry.get("a")
+    assert registry._sweeper is None
+    assert registry.is_loaded("a")
@@ -53,3 +53,46 @@ def test_generate_answer_api_error():
             answer = generate_answer("Question?", None, mock_chunks)
             
             assert "Error generating answer using Groq API: API rate limit exceeded" in answer
+
+def test_build_vector_store_embeds_in_bounded_windows():
+    import numpy as np
+    from src.processing.chunking import split_spans
+    from src.retrieval import rag
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 4), dtype=np.float32)
+    transcript = " ".join(f"Sentence number {i} is here." for i in range(40))
+
+    with patch('src.retrieval.rag.get_embedding_model', return_value=model), \
+         patch('src.retrieval.rag.CHUNK_WINDOW', 3):
+        index, chunks = rag.build_vector_store(transcript, chunk_size=10, overlap=2)
+
+    assert index.ntotal == len(chunks) > 3
+    assert max(len(call.args[0]) for call in model.encode.call_args_list) == 3
+    assert chunks == split_spans(transcript, max_words=10, overlap=2)
+
+
+def test_build_vector_store_embeds_near_duplicates_once_and_keeps_positions():
+    import numpy as np
+    from src.processing.transcript import Transcript
+    from src.retrieval import rag
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 4), dtype=np.float32)
+    intro = "Welcome to the show where we talk about audio models and how to run them on small servers every week."
+    segments = [(0, 10, intro)] + [(10 + i, 11 + i, f"Topic {i} gets a long explanation with detail {i * 7}.")
+                                   for i in range(4)] + [(60, 70, intro)]
+    transcript = Transcript.from_segments(segments)
+    # One chunk per segment, so the intro's two occurrences are identical chunks
+    bounds = list(transcript.offsets) + [len(transcript) + 1]
+    spans = [transcript.span(start, end - 1) for start, end in zip(bounds, bounds[1:])]
+
+    with patch('src.retrieval.rag.get_embedding_model', return_value=model), \
+         patch('src.retrieval.rag.iter_chunks', return_value=iter(spans)):
+        index, chunks = rag.build_vector_store(transcript)
+        embedded = sum(len(call.args[0]) for call in model.encode.call_args_list)
+        results = rag.retrieve_chunks("intro", index, chunks, top_k=len(chunks))
+
+    assert chunks.skipped == 1
+    assert index.ntotal == len(chunks) == len(spans) - 1
+    assert embedded == len(chunks)
+    intro_hit = next(r for r in results if r['text'] == intro)
+    assert intro_hit['occurrences'] == [(0.0, 10.0), (60.0, 70.0)]
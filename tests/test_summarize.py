@@ -0,0 +1,409 @@
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+from src.cache import DiskCache
+from src.processing import summarize
+
+
+@pytest.fixture(autouse=True)
+def summary_cache(tmp_path):
+    cache = DiskCache(tmp_path / "summaries", max_bytes=0)
+    with patch("src.processing.summary_cache._cache", cache), \
+         patch("src.processing.router._stats", DiskCache(tmp_path / "router", max_bytes=0)):
+        yield cache
+
+
+def fake_summarizer(text, max_length, min_length, do_sample=False, batch_size=None):
+    # Deterministic stand-in: keep the first few words of each input
+    if isinstance(text, list):
+        return [fake_summarizer(t, max_length, min_length)[0] for t in text]
+    return [{"summary_text": " ".join(text.split()[:12]) + "."}]
+
+
+class FakePipeline:
+    """Summarization-pipeline stand-in with a real tokenizer, counting inputs and batches."""
+
+    def __init__(self, tokenizer=None, prefix=None):
+        self.tokenizer = tokenizer
+        self.model = MagicMock()
+        self.model.config.prefix = prefix
+        self.calls = 0
+        self.batches = []
+
+    def __call__(self, text, max_length, min_length, do_sample=False, batch_size=None):
+        texts = text if isinstance(text, list) else [text]
+        self.calls += len(texts)
+        self.batches.append((len(texts), max_length, min_length))
+        return fake_summarizer(text, max_length, min_length)
+
+
+TEXT = " ".join(f"Sentence number {i} talks about topic {i % 7} at some length here." for i in range(400))
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_summarize_stream_matches_summarize_text(mock_get):
+    words = TEXT.split()
+    for level in ("brief", "medium", "detailed"):
+        expected, expected_metrics = summarize.summarize_text(TEXT, detail_level=level, return_metrics=True)
+        pieces = (" ".join(words[i:i + 37]) for i in range(0, len(words), 37))
+        summary, metrics = summarize.summarize_stream(pieces, detail_level=level, return_metrics=True)
+        assert summary == expected
+        for key in ("original_words", "original_chars", "num_chunks", "summary_words"):
+            assert metrics[key] == expected_metrics[key]
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_transcribe_and_summarize_overlaps_stages(mock_get):
+    from src import pipeline
+    words = TEXT.split()
+    segments = [(i / 10, (i + 37) / 10, " ".join(words[i:i + 37])) for i in range(0, len(words), 37)]
+
+    with patch("src.pipeline.iter_transcript_segments", return_value=iter(segments)):
+        transcript, summary, metrics = pipeline.transcribe_and_summarize("talk.mp3", "medium", audio_hash="abc")
+
+    assert transcript == TEXT
+    assert transcript.time_range(0, 5) == (0.0, 3.7)
+    assert summary == summarize.summarize_text(TEXT, detail_level="medium")
+    assert metrics["num_chunks"] > 1
+
+
+def test_token_packing_uses_fewer_fuller_chunks(bpe_tokenizer):
+    # Words the test tokenizer knows, so tokens per word is realistic (~1.3)
+    text = "The quick brown fox jumps over the lazy dog. Summarization models read long transcripts! " * 300
+    pipe = FakePipeline(bpe_tokenizer)
+    # The repeated text makes identical chunks; count model inputs without the cache or dedupe
+    with patch("src.processing.summarize.get_summarizer", return_value=pipe), \
+         patch("src.processing.summary_cache.get_summary_cache", return_value=None), \
+         patch("src.processing.dedupe.DEDUPE_THRESHOLD", 0), \
+         patch("src.processing.summarize.MAX_INPUT_TOKENS", {"bart-large-cnn": 1024}):
+        _, word_metrics = summarize.summarize_text(text, detail_level="detailed", return_metrics=True)
+        word_calls, pipe.calls = pipe.calls, 0
+        with patch("src.processing.summarize.CHUNK_PACKING", "tokens"):
+            _, token_metrics = summarize.summarize_text(text, detail_level="detailed", return_metrics=True)
+
+    assert word_metrics["token_fill_ratio"] is None
+    assert token_metrics["chunk_packing"] == "tokens"
+    assert 0.8 < token_metrics["token_fill_ratio"] <= 0.9
+    assert pipe.calls == token_metrics["num_chunks"] < word_calls
+
+
+def test_summarize_chunks_batches_by_length_limits_in_order():
+    # Ten full-length chunks share one max/min length; the two short ones share tighter limits
+    chunks = [" ".join(f"c{i}w{j}" for j in range(30 if i in (3, 8) else 200)) for i in range(12)]
+    pipe = FakePipeline()
+    summaries = summarize.summarize_chunks(chunks, pipe, max_length=150, min_length=50,
+                                           model_name="bart-large-cnn", batch_size=4)
+
+    assert summaries == [fake_summarizer(c, 150, 50)[0]["summary_text"] for c in chunks]
+    assert sorted(pipe.batches) == [(2, 34, 14), (2, 150, 50), (4, 150, 50), (4, 150, 50)]
+
+
+def test_summary_batch_size_follows_available_ram():
+    pipe = FakePipeline()
+    with patch("src.processing.summarize.available_memory_bytes", return_value=8 * 1024 ** 3):
+        roomy = summarize.summary_batch_size(pipe, 1024)
+    with patch("src.processing.summarize.available_memory_bytes", return_value=512 * 1024 ** 2):
+        tight = summarize.summary_batch_size(pipe, 1024)
+    with patch("src.processing.summarize.SUMMARY_BATCH_SIZE", 3):
+        fixed = summarize.summary_batch_size(pipe, 1024)
+
+    assert 1 < roomy <= 16
+    assert tight == 1
+    assert fixed == 3
+
+
+def test_brief_reduces_recursively_and_never_skips_final_pass():
+    calls = []
+
+    def wordy_summarizer(text, max_length, min_length, do_sample=False, batch_size=None):
+        texts = text if isinstance(text, list) else [text]
+        calls.extend(texts)
+        # Summaries a third as long as their input shrink slowly, forcing several reduce levels
+        return [{"summary_text": " ".join(t.split()[:max(20, len(t.split()) // 3)])} for t in texts]
+
+    with patch("src.processing.summarize.get_summarizer", return_value=wordy_summarizer):
+        summary = summarize.summarize_text(TEXT * 4, detail_level="brief")
+
+    final_input = calls[-1]
+    assert len(final_input.split()) * 1.3 <= 1000
+    assert summary == summarize.cleanup_summary(" ".join(final_input.split()[:max(20, len(final_input.split()) // 3)]))
+
+
+def test_map_summaries_fans_out_in_order():
+    from concurrent.futures import ThreadPoolExecutor
+    chunks = [f"Chunk {i} " + " ".join(f"w{j}" for j in range(30)) for i in range(11)]
+    expected = [fake_summarizer(c, 150, 50)[0]["summary_text"] for c in chunks]
+
+    with ThreadPoolExecutor(3) as pool, \
+         patch("src.processing.summarize.SUMMARIZE_WORKERS", 3), \
+         patch("src.processing.summarize.get_summary_pool", return_value=pool), \
+         patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer):
+        summaries, num_chunks = summarize.map_summaries(iter(chunks), None, "bart-large-cnn", 150, 50, window=4)
+
+    assert summaries == expected
+    assert num_chunks == 11
+
+
+def test_summary_cache_skips_repeated_chunks():
+    pipe = FakePipeline()
+    with patch("src.processing.summarize.get_summarizer", return_value=pipe):
+        first, first_metrics = summarize.summarize_text(TEXT, detail_level="detailed", return_metrics=True)
+        calls = pipe.calls
+        again, again_metrics = summarize.summarize_text(TEXT, detail_level="detailed", return_metrics=True)
+        assert pipe.calls == calls
+        # Other models and generation limits are cached separately
+        summarize.summarize_text(TEXT, detail_level="medium", model_name="t5-base")
+
+    assert again == first
+    assert first_metrics["summary_cache_hits"] == 0
+    assert first_metrics["summary_cache_misses"] == calls == first_metrics["num_chunks"]
+    assert again_metrics["summary_cache_hits"] == calls
+    assert again_metrics["summary_cache_misses"] == 0
+    assert pipe.calls > calls
+
+
+def test_int8_engine_quantizes_linear_layers(tmp_path, bpe_tokenizer):
+    import torch
+    from transformers import BartConfig, BartForConditionalGeneration
+    from src.processing.summary_engines import load_summarizer, summarizer_engine
+
+    config = BartConfig(vocab_size=len(bpe_tokenizer), d_model=16, encoder_layers=1, decoder_layers=1,
+                        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=32,
+                        decoder_ffn_dim=32, max_position_embeddings=64, bos_token_id=0, eos_token_id=1,
+                        pad_token_id=1, decoder_start_token_id=1)
+    BartForConditionalGeneration(config).save_pretrained(tmp_path)
+    bpe_tokenizer.save_pretrained(tmp_path)
+
+    summarizer = load_summarizer("torch-int8", str(tmp_path), -1)
+    result = summarizer("The quick brown fox jumps over the lazy dog.", max_length=8, min_length=2, do_sample=False)
+
+    assert isinstance(summarizer.model.model.encoder.layers[0].fc1, torch.ao.nn.quantized.dynamic.Linear)
+    assert isinstance(result[0]["summary_text"], str)
+    with patch("src.processing.summary_engines.SUMMARIZER_ENGINES", {"bart-large-cnn": "fp8"}):
+        with pytest.raises(ValueError):
+            summarizer_engine("bart-large-cnn")
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_summarize_progressive_yields_partials_then_final(mock_get):
+    with patch("src.processing.summarize.SUMMARY_BATCH_SIZE", 2):
+        events = list(summarize.summarize_progressive(TEXT, detail_level="medium"))
+    expected, expected_metrics = summarize.summarize_text(TEXT, detail_level="medium", return_metrics=True)
+
+    chunk_events = [e for e in events if e["stage"] == "chunk"]
+    total = expected_metrics["num_chunks"]
+    assert [e["chunks_done"] for e in chunk_events] == list(range(2, total, 2)) + [total]
+    assert all(e["chunks_total"] == total and e["eta"] >= 0 for e in chunk_events)
+    assert chunk_events[-1]["eta"] == 0
+    assert [e["stage"] for e in events[-2:]] == ["reduce", "final"]
+    assert events[-1]["summary"] == expected
+    assert events[-1]["metrics"]["num_chunks"] == total
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_pipeline_forwards_partial_summaries(mock_get, tmp_path):
+    from src import pipeline
+    audio = tmp_path / "talk.mp3"
+    audio.write_bytes(b"audio")
+    events, statuses = [], []
+
+    with patch("src.pipeline.transcript_cache.get_audio_transcript", return_value=TEXT):
+        _, _, summary, _ = pipeline.process_audio_pipeline(str(audio), "medium", statuses.append, events.append)
+
+    assert summary == summarize.summarize_text(TEXT, detail_level="medium")
+    assert events[0]["stage"] == "chunk" and events[0]["summaries"]
+    assert events[-1]["stage"] == "reduce"
+    assert any("chunks" in s and "left" in s for s in statuses)
+
+
+def test_generation_kwargs_reach_the_model_and_cache_key():
+    calls = []
+
+    def recording_summarizer(text, max_length, min_length, do_sample=False, batch_size=None, **kwargs):
+        calls.append((max_length, kwargs))
+        return fake_summarizer(text, max_length, min_length)
+
+    chunks = [" ".join(f"w{i}" for i in range(200))]
+    summarize.summarize_chunks(chunks, recording_summarizer, 150, 50, "bart-large-cnn")
+    summarize.summarize_chunks(chunks, recording_summarizer, 150, 50, "bart-large-cnn",
+                               generation_kwargs={"num_beams": 1, "max_length": 80})
+
+    # The greedy, length-capped call is not answered from the beam-search entry
+    assert calls == [(150, {}), (80, {"num_beams": 1})]
+
+
+def test_router_fits_budget_and_learns_host_cost():
+    from src.processing import router
+    assert router.choose_route(500)["route"] == "bart-large-cnn/beam"
+    assert router.choose_route(500, latency_budget=60)["route"] == "bart-large-cnn/beam"
+
+    # 5,000 words is ~50s with beams at the prior cost; greedy decoding fits 20s
+    fast = router.choose_route(5000, slo_tier="interactive")
+    assert fast["route"] == "bart-large-cnn/greedy"
+    assert fast["generation_kwargs"] == {"num_beams": 1}
+    assert fast["predicted_time"] <= 20
+    # Nothing fits: take the fastest route rather than run unbounded
+    assert router.choose_route(10 ** 7, latency_budget=1)["route"] == "distilbart-cnn/greedy-short"
+    with pytest.raises(ValueError):
+        router.choose_route(500, slo_tier="urgent")
+
+    route = router.choose_route(1000, latency_budget=60)
+    metrics = router.record_route(route, {"processing_time": 30.0, "original_words": 1000,
+                                          "summary_cache_hits": 0})
+    assert metrics["route"] == "bart-large-cnn/beam"
+    assert metrics["predicted_time"] == pytest.approx(10.0)
+    assert metrics["actual_time"] == 30.0 and metrics["within_budget"] is True
+    # The first measurement replaces the prior; later ones are averaged in
+    assert router.choose_route(1000)["predicted_time"] == pytest.approx(30.0)
+    router.record_route(route, {"processing_time": 10.0, "original_words": 1000, "summary_cache_hits": 0})
+    assert router.choose_route(1000)["predicted_time"] == pytest.approx(0.7 * 30 + 0.3 * 10)
+    # Runs helped by the summary cache say nothing about model speed
+    router.record_route(route, {"processing_time": 1.0, "original_words": 1000, "summary_cache_hits": 3})
+    assert router.choose_route(1000)["predicted_time"] == pytest.approx(0.7 * 30 + 0.3 * 10)
+
+
+def test_all_levels_share_one_level1_pass():
+    detailed_only, pipe = FakePipeline(), FakePipeline()
+    with patch("src.processing.summary_cache.get_summary_cache", return_value=None):
+        with patch("src.processing.summarize.get_summarizer", return_value=detailed_only):
+            expected_detailed = summarize.summarize_text(TEXT, detail_level="detailed")
+        with patch("src.processing.summarize.get_summarizer", return_value=pipe):
+            summaries, metrics = summarize.summarize_text(TEXT, detail_level="all", return_metrics=True)
+
+    assert set(summaries) == set(summarize.DETAIL_LEVELS)
+    assert summaries["detailed"] == expected_detailed
+    # Level 1 ran once with the detailed limits; the rest reduces already-short summaries
+    assert pipe.batches[:len(detailed_only.batches)] == detailed_only.batches
+    assert detailed_only.calls == metrics["detailed"]["num_chunks"]
+    assert pipe.calls - detailed_only.calls < detailed_only.calls
+    assert len(summaries["brief"].split()) <= len(summaries["medium"].split()) <= len(summaries["detailed"].split())
+    assert [metrics[level]["derived_from"] for level in summarize.DETAIL_LEVELS] == ["level1", "detailed", "medium"]
+
+
+def test_extractive_prefilter_keeps_central_sentences_in_order():
+    from src.processing import extractive
+    on_topic = [f"The guest explains model quantization detail number {i} for servers." for i in range(30)]
+    chatter = [f"Anyway ha ha number {i} okay right." for i in range(10)]
+    text = " ".join(on_topic[:15] + chatter + on_topic[15:])
+
+    class Embedder:
+        def encode(self, sentences, **kwargs):
+            # Two directions: on-topic sentences mention quantization
+            vectors = np.array([[1.0, 0.1] if "quantization" in s else [0.0, 1.0] for s in sentences])
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    with patch("src.retrieval.rag.get_embedding_model", return_value=Embedder()):
+        for method in extractive.SCORERS:
+            # Exactly the on-topic share of the words
+            ratio = len(" ".join(on_topic).split()) / len(text.split())
+            kept, stats = extractive.prefilter(text, ratio=ratio, method=method, min_words=0)
+            assert "Anyway" not in kept
+            assert kept == " ".join(on_topic)
+            assert stats["extractive_sentences_kept"] == 30
+            assert stats["extractive_kept_ratio"] + stats["extractive_dropped_ratio"] == pytest.approx(1)
+        assert extractive.prefilter(text, ratio=1.0) == (text, None)
+        assert extractive.prefilter(text, ratio=0.5, min_words=10_000) == (text, None)
+
+        with patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer):
+            _, metrics = summarize.summarize_text(TEXT, detail_level="detailed", return_metrics=True,
+                                                  extractive_ratio=0.5)
+    assert metrics["original_words"] == len(TEXT.split())
+    assert metrics["extractive_kept_ratio"] == pytest.approx(0.5, abs=0.05)
+    assert "extractive_time_saved" in metrics
+
+
+def test_split_sentences_bounds_unpunctuated_runs():
+    from src.processing import extractive
+    text = "Short one. " + " ".join(f"w{i}" for i in range(100)) + " end."
+    spans = extractive.split_sentences(text)
+    assert text[spans[0][0]:spans[0][1]] == "Short one."
+    assert [len(text[a:b].split()) for a, b in spans[1:]] == [40, 40, 21]
+
+
+def test_near_duplicate_chunks_are_summarized_once():
+    # Long enough that each repeat holds whole chunks, whatever the chunk boundaries' phase
+    ad = " ".join(f"This episode is brought to you by sponsor word{i}." for i in range(150))
+    talk = [" ".join(f"Part {p} sentence {i} covers subject {p * 100 + i} in depth." for i in range(60))
+            for p in range(3)]
+    # The ad recurs with a couple of words changed (live reads drift slightly)
+    text = " ".join([ad, talk[0], ad.replace("word5.", "words five."), talk[1], ad, talk[2]])
+    pipe = FakePipeline()
+    with patch("src.processing.summarize.get_summarizer", return_value=pipe), \
+         patch("src.processing.summary_cache.get_summary_cache", return_value=None):
+        _, metrics = summarize.summarize_text(text, detail_level="medium", return_metrics=True)
+        with patch("src.processing.dedupe.DEDUPE_THRESHOLD", 0):
+            _, all_metrics = summarize.summarize_text(text, detail_level="medium", return_metrics=True)
+
+    assert metrics["duplicate_chunks_skipped"] >= 2
+    assert metrics["num_chunks"] + metrics["duplicate_chunks_skipped"] == all_metrics["num_chunks"]
+    assert all_metrics["duplicate_chunks_skipped"] == 0
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_streamed_route_learns_summarization_time_only(mock_get):
+    import time
+    from src.processing import router
+    words = TEXT.split()
+
+    def slow_pieces():
+        # Stands in for Whisper: most of the wall time is spent waiting for text
+        for i in range(0, len(words), 440):
+            time.sleep(0.05)
+            yield " ".join(words[i:i + 440])
+
+    route = router.choose_route(len(words))
+    _, metrics = summarize.summarize_stream(slow_pieces(), detail_level="medium", return_metrics=True)
+    router.record_route(route, metrics)
+
+    assert metrics["processing_time"] >= 0.5
+    assert metrics["summarize_time"] < metrics["processing_time"] - 0.4
+    assert metrics["actual_time"] == metrics["summarize_time"]
+    assert router.route_cost(router.ROUTES[0]) == pytest.approx(metrics["summarize_time"] / len(words))
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_pipeline_returns_all_levels(mock_get, tmp_path):
+    from src import pipeline
+    audio = tmp_path / "talk.mp3"
+    audio.write_bytes(b"audio")
+
+    with patch("src.pipeline.transcript_cache.get_audio_transcript", return_value=TEXT):
+        _, _, summaries, metrics = pipeline.process_audio_pipeline(str(audio), "all")
+
+    assert summaries == summarize.summarize_text(TEXT, detail_level="all")
+    assert all(metrics[level]["route"] == "bart-large-cnn/beam" for level in summarize.DETAIL_LEVELS)
+
+
+@patch("src.processing.summarize.get_summarizer", return_value=fake_summarizer)
+def test_pipeline_prefilters_audio_transcripts(mock_get, tmp_path):
+    from src import pipeline
+    audio = tmp_path / "talk.mp3"
+    audio.write_bytes(b"audio")
+
+    with patch("src.pipeline.PIPELINE_STREAMING", True), patch("src.pipeline.EXTRACTIVE_RATIO", 0.5), \
+         patch("src.pipeline.transcript_cache.get_audio_transcript", return_value=None), \
+         patch("src.pipeline.transcript_cache.put_audio_transcript"), \
+         patch("src.pipeline.transcribe_audio", return_value=TEXT), \
+         patch("src.pipeline.transcribe_and_summarize") as streamed, \
+         patch("src.processing.summarize.prefilter", side_effect=lambda text, ratio: (text, None)) as prefilter:
+        pipeline.process_audio_pipeline(str(audio), "medium")
+
+    streamed.assert_not_called()
+    prefilter.assert_called_once()
+
+
+def test_pipeline_packs_audio_transcripts_by_tokens(tmp_path):
+    from src import pipeline
+    audio = tmp_path / "talk.mp3"
+    audio.write_bytes(b"audio")
+
+    with patch("src.pipeline.PIPELINE_STREAMING", True), patch("src.pipeline.CHUNK_PACKING", "tokens"), \
+         patch("src.pipeline.transcript_cache.get_audio_transcript", return_value=None), \
+         patch("src.pipeline.transcript_cache.put_audio_transcript"), \
+         patch("src.pipeline.transcribe_audio", return_value=TEXT), \
+         patch("src.pipeline.transcribe_and_summarize") as streamed, \
+         patch("src.pipeline._summarize", return_value=("summary", {})) as summarized:
+        pipeline.process_audio_pipeline(str(audio), "medium")
+
+    streamed.assert_not_called()
+    assert summarized.call_args.args[:2] == (TEXT, "medium")